@@ -0,0 +1,88 @@
+"""Benchmark loading a file store dataset: column files vs. per-chunk models."""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Annotated
+
+import numpy as np
+import typer
+
+from llm_lab.vector_store.file.file_store import FileStoreClient
+from llm_lab.vector_store.file.types import IndexFile, ManifestFile
+from llm_lab.vector_store.types import IndexedChunk
+
+app = typer.Typer()
+
+
+def _chunks(num_chunks: int, dim: int, text_chars: int) -> Iterator[IndexedChunk]:
+    rng = np.random.default_rng(0)
+    for row in range(num_chunks):
+        doc_path = f"docs/doc_{row // 20}.md"
+        yield IndexedChunk(
+            text="x" * text_chars,
+            doc_path=doc_path,
+            source=f"{doc_path}#chunk-{row % 20}",
+            embedding=rng.standard_normal(dim, dtype=np.float32).tolist(),
+            chunk_id=row % 20,
+        )
+
+
+def _measure(load: Callable[[], object]) -> tuple[float, int, object]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = load()
+    seconds = time.perf_counter() - start
+    # Memory still held once loaded; mapped files are not Python allocations.
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, retained, loaded
+
+
+@app.command()
+def bench(
+    num_chunks: Annotated[int, typer.Option(help="Number of stored chunks")] = 20_000,
+    dim: Annotated[int, typer.Option(help="Vector dimension")] = 768,
+    text_chars: Annotated[int, typer.Option(help="Characters per chunk")] = 1000,
+) -> None:
+    with tempfile.TemporaryDirectory() as dest_dir:
+        client = FileStoreClient(dest_dir=Path(dest_dir))
+        client.store(_chunks(num_chunks, dim, text_chars), "bench", "bench-model", 0)
+        dataset_dir = Path(dest_dir) / "bench"
+        manifest = ManifestFile.model_validate_json(
+            (dataset_dir / "manifest.json").read_text(encoding="utf-8")
+        )
+
+        def load_models() -> list[IndexedChunk]:
+            chunks = []
+            for index_file in manifest.index_files:
+                path = dataset_dir / manifest.index_dir / index_file.path
+                chunks.extend(IndexFile.model_validate_json(path.read_bytes()).chunks)
+            return chunks
+
+        typer.echo(f"Loading {num_chunks} chunks of {text_chars} characters")
+        for name, load in (
+            ("models", load_models),
+            ("columns", lambda: client.datasets.reload(dataset_dir)),
+        ):
+            seconds, memory, _ = _measure(load)
+            typer.echo(
+                f"{name:<8} load={seconds * 1000:9.1f}ms "
+                f"memory={memory / num_chunks:9.0f} bytes/chunk"
+            )
+
+
+def main() -> int:
+    try:
+        app()
+    except (ValueError, OSError, RuntimeError) as err:
+        typer.echo(f"Error: {err}", err=True)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
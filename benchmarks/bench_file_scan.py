@@ -0,0 +1,63 @@
+"""Benchmark the file store's parallel embedding scan across worker counts."""
+
+import statistics
+import sys
+import time
+from typing import Annotated
+
+import numpy as np
+import typer
+
+from llm_lab.vector_store.file.scan import ParallelScanner, normalize_rows
+
+app = typer.Typer()
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+    return statistics.quantiles(values, n=100)[percentile - 1]
+
+
+@app.command()
+def bench(
+    num_rows: Annotated[int, typer.Option(help="Number of stored vectors")] = 1_000_000,
+    dim: Annotated[int, typer.Option(help="Vector dimension")] = 768,
+    num_queries: Annotated[int, typer.Option(help="Number of queries")] = 20,
+    top_k: Annotated[int, typer.Option(help="Results per query")] = 10,
+    workers: Annotated[
+        list[int] | None, typer.Option(help="Worker counts to run (default: 1 2 4 8)")
+    ] = None,
+) -> None:
+    rng = np.random.default_rng(0)
+    vectors = normalize_rows(rng.standard_normal((num_rows, dim), dtype=np.float32))
+    queries = rng.standard_normal((num_queries, dim), dtype=np.float32)
+    typer.echo(f"Scanning {num_rows} x {dim} vectors, top_k={top_k}")
+    baseline_ms = None
+    for worker_count in workers or [1, 2, 4, 8]:
+        scanner = ParallelScanner(workers=worker_count)
+        scanner.top_k(vectors, queries[0].tolist(), top_k)  # warm up the pool
+        latencies_ms = []
+        for query in queries:
+            start = time.perf_counter()
+            scanner.top_k(vectors, query.tolist(), top_k)
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+        p50 = _percentile(latencies_ms, 50)
+        baseline_ms = baseline_ms or p50
+        typer.echo(
+            f"workers={worker_count:<3} "
+            f"p50={p50:8.2f}ms "
+            f"p95={_percentile(latencies_ms, 95):8.2f}ms "
+            f"speedup={baseline_ms / p50:5.2f}x"
+        )
+
+
+def main() -> int:
+    try:
+        app()
+    except (ValueError, OSError, RuntimeError) as err:
+        typer.echo(f"Error: {err}", err=True)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Benchmark Qdrant collection and search settings on synthetic embeddings."""
+
+import statistics
+import sys
+import time
+from collections.abc import Iterator
+from typing import Annotated
+
+import numpy as np
+import typer
+from qdrant_client import QdrantClient
+
+from llm_lab.config.settings import QdrantQuantization
+from llm_lab.vector_store.qdrant import (
+    QdrantCollectionConfig,
+    QdrantSearchConfig,
+    QdrantStoreClient,
+)
+from llm_lab.vector_store.types import IndexedChunk
+
+DATASET = "bench"
+
+VARIANTS: dict[str, tuple[QdrantCollectionConfig, QdrantSearchConfig]] = {
+    "default": (QdrantCollectionConfig(), QdrantSearchConfig()),
+    "scalar": (
+        QdrantCollectionConfig(quantization=QdrantQuantization.SCALAR),
+        QdrantSearchConfig(oversampling=2.0, rescore=True),
+    ),
+    "binary": (
+        QdrantCollectionConfig(quantization=QdrantQuantization.BINARY),
+        QdrantSearchConfig(oversampling=3.0, rescore=True),
+    ),
+    "on-disk": (QdrantCollectionConfig(on_disk_vectors=True), QdrantSearchConfig()),
+    "hnsw-m32": (
+        QdrantCollectionConfig(hnsw_m=32, hnsw_ef_construct=200),
+        QdrantSearchConfig(hnsw_ef=128),
+    ),
+}
+
+app = typer.Typer()
+
+
+def _random_unit_vectors(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _chunks(vectors: np.ndarray) -> Iterator[IndexedChunk]:
+    for row, vector in enumerate(vectors):
+        yield IndexedChunk(
+            text=f"chunk {row}",
+            doc_path=f"doc-{row // 10}.md",
+            source=f"doc-{row // 10}.md#chunk-{row % 10}",
+            embedding=vector.tolist(),
+            chunk_id=row % 10,
+        )
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+    return statistics.quantiles(values, n=100)[percentile - 1]
+
+
+def run_variant(
+    client: QdrantClient,
+    name: str,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    top_k: int,
+) -> None:
+    collection_config, search_config = VARIANTS[name]
+    embedding_model = f"bench-{name}"
+    if client.collection_exists(embedding_model):
+        client.delete_collection(embedding_model)
+    store = QdrantStoreClient(
+        client,
+        collection_config=collection_config,
+        search_config=search_config,
+    )
+    start = time.perf_counter()
+    store.store(_chunks(vectors), DATASET, embedding_model, docs_count=0)
+    upload_s = time.perf_counter() - start
+
+    exact_top_k = np.argsort(-(queries @ vectors.T), axis=1)[:, :top_k]
+    latencies_ms = []
+    hits = 0
+    for query, expected_rows in zip(queries, exact_top_k, strict=True):
+        start = time.perf_counter()
+        results = store.query(DATASET, embedding_model, query.tolist(), top_k)
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+        expected_sources = {
+            f"doc-{row // 10}.md#chunk-{row % 10}" for row in expected_rows
+        }
+        hits += sum(sc.indexed_chunk.source in expected_sources for sc in results)
+    recall = hits / (len(queries) * top_k)
+    typer.echo(
+        f"{name:<10} upload={upload_s:8.2f}s "
+        f"p50={_percentile(latencies_ms, 50):8.2f}ms "
+        f"p95={_percentile(latencies_ms, 95):8.2f}ms "
+        f"recall@{top_k}={recall:.3f}"
+    )
+    client.delete_collection(embedding_model)
+
+
+@app.command()
+def bench(
+    location: Annotated[
+        str, typer.Option(help="Qdrant location: ':memory:' or a server URL")
+    ] = ":memory:",
+    num_points: Annotated[int, typer.Option(help="Number of stored vectors")] = 5000,
+    dim: Annotated[int, typer.Option(help="Vector dimension")] = 768,
+    num_queries: Annotated[int, typer.Option(help="Number of queries")] = 50,
+    top_k: Annotated[int, typer.Option(help="Results per query")] = 10,
+    variant: Annotated[
+        list[str] | None, typer.Option(help="Variants to run (default: all)")
+    ] = None,
+) -> None:
+    unknown = set(variant or []) - VARIANTS.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown variants {sorted(unknown)}, choose from {list(VARIANTS)}"
+        )
+    rng = np.random.default_rng(0)
+    vectors = _random_unit_vectors(rng, num_points, dim)
+    queries = _random_unit_vectors(rng, num_queries, dim)
+    client = QdrantClient(location=location)
+    typer.echo(f"Benchmarking {num_points} x {dim} vectors against {location}")
+    for name in variant or VARIANTS:
+        run_variant(client, name, vectors, queries, top_k)
+
+
+def main() -> int:
+    try:
+        app()
+    except (ValueError, OSError, RuntimeError) as err:
+        typer.echo(f"Error: {err}", err=True)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
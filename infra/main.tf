@@ -26,6 +26,17 @@ resource "google_cloud_run_v2_service" "llm_lab" {
         name  = "LLM_API_KEY"
         value = var.llm_api_key
       }
+      env {
+        name  = "WEB_CONCURRENCY"
+        value = tostring(var.workers)
+      }
+      startup_probe {
+        period_seconds    = 2
+        failure_threshold = 60
+        http_get {
+          path = "/ready"
+        }
+      }
     }
   }
 }
\ No newline at end of file
@@ -14,4 +14,9 @@ variable "app_name" {
   description = "Name of the application"
   type        = string
   default     = "llm-lab"
-}
\ No newline at end of file
+}
+variable "workers" {
+  description = "Number of uvicorn worker processes per instance"
+  type        = number
+  default     = 1
+}
@@ -0,0 +1,261 @@
+import asyncio
+import contextlib
+import contextvars
+import enum
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+
+from llm_lab.config.variables import (
+    ADMISSION_BATCH_QUEUE_SHARE,
+    DEFAULT_ADMISSION_MAX_CONCURRENCY,
+    DEFAULT_ADMISSION_MAX_QUEUE,
+    DEFAULT_ADMISSION_MAX_WAIT_SECONDS,
+)
+from llm_lab.observability.context import (
+    admission_queue_depth_context_var,
+    admission_wait_ms_context_var,
+    request_coalesced_context_var,
+)
+from llm_lab.observability.deadline import (
+    ADMISSION_STAGE,
+    COALESCE_STAGE,
+    DeadlineExceededError,
+    deadline_exceeded,
+    is_expired,
+    remaining_seconds,
+)
+from llm_lab.observability.metrics import (
+    admission_admitted_counter,
+    admission_in_flight_gauge,
+    admission_queue_depth_gauge,
+    admission_rejected_counter,
+    admission_wait_seconds_counter,
+    coalesced_requests_counter,
+)
+
+_MISSING = object()
+
+
+def _copy_back(ctx: contextvars.Context) -> None:
+    """Set context vars changed in ctx to the same values in the current context."""
+    for var, value in ctx.items():
+        if var.get(_MISSING) is not value:
+            var.set(value)
+
+
+async def run_in_worker_thread[T](
+    func: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Run a blocking function in the threadpool without blocking the event loop.
+
+    The function runs in a copy of the current context. Context vars it sets (the
+    per-stage timings read by the logging middleware, for example) are copied back
+    into the caller's context once it returns.
+    """
+    ctx = contextvars.copy_context()
+    try:
+        return await run_in_threadpool(ctx.run, func, *args, **kwargs)
+    finally:
+        _copy_back(ctx)
+
+
+class SingleFlight[T]:
+    """Coalesce concurrent calls for the same key into one computation.
+
+    The first caller for a key starts the computation; callers arriving while it
+    is in flight await the same result (or exception) instead of starting their
+    own. The computation runs as a separate task, so a caller that is cancelled
+    does not cancel it for the others.
+
+    Each caller waits no longer than its own deadline. The computation runs under
+    the deadline of the caller that started it: when that runs out, callers that
+    joined it and still have time left start or join a new computation instead of
+    failing with it.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[str, asyncio.Task[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def run(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of func, shared with concurrent callers of the same key.
+
+        Context vars set by the computation are copied back to the caller that
+        started it; callers that joined it are marked as coalesced instead.
+        """
+        while True:
+            task = self._in_flight.get(key)
+            if task is None or task.done():
+                return await self._lead(key, func)
+            coalesced_requests_counter.inc()
+            request_coalesced_context_var.set(True)
+            try:
+                return await asyncio.wait_for(asyncio.shield(task), remaining_seconds())
+            except DeadlineExceededError:
+                if is_expired():
+                    raise
+            except TimeoutError as err:
+                if not is_expired():
+                    raise
+                raise deadline_exceeded(COALESCE_STAGE) from err
+
+    async def _lead(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        async def call() -> T:
+            return await func()
+
+        ctx = contextvars.copy_context()
+        task = asyncio.get_running_loop().create_task(call(), context=ctx)
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._forget(key, task))
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done():
+                _copy_back(ctx)
+
+    def _forget(self, key: str, task: asyncio.Task[T]) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+
+class Priority(enum.StrEnum):
+    """Admission lanes; queued interactive requests are always admitted first."""
+
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+class AdmissionRejectedError(Exception):
+    """Error raised when a request is shed instead of queued or admitted."""
+
+    def __init__(self, message: str, retry_after_seconds: int) -> None:
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionController:
+    """Bound the number of requests processed at once, shedding the excess.
+
+    Up to max_concurrency requests run concurrently; further requests wait in a
+    queue of at most max_queue entries across both lanes, of which batch requests
+    may only take ADMISSION_BATCH_QUEUE_SHARE. A request that finds the queue
+    full, or that waits longer than max_wait_seconds, is rejected with
+    AdmissionRejectedError instead of piling up. A request whose deadline passes
+    before it is admitted fails with DeadlineExceededError instead.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_ADMISSION_MAX_CONCURRENCY,
+        max_queue: int = DEFAULT_ADMISSION_MAX_QUEUE,
+        max_wait_seconds: float = DEFAULT_ADMISSION_MAX_WAIT_SECONDS,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self._in_flight = 0
+        self._waiters: dict[Priority, deque[asyncio.Future[None]]] = {
+            priority: deque() for priority in Priority
+        }
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @property
+    def _batch_queue_capacity(self) -> int:
+        return int(self.max_queue * ADMISSION_BATCH_QUEUE_SHARE)
+
+    def _reject(self, reason: str) -> AdmissionRejectedError:
+        admission_rejected_counter.inc()
+        return AdmissionRejectedError(
+            f"Server is overloaded ({reason}), retry later",
+            retry_after_seconds=max(1, math.ceil(self.max_wait_seconds)),
+        )
+
+    def _publish(self) -> None:
+        admission_in_flight_gauge.set(self._in_flight)
+        admission_queue_depth_gauge.set(self.queue_depth)
+
+    @contextlib.asynccontextmanager
+    async def admit(
+        self, priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[None]:
+        """Hold one of the concurrency slots for the duration of the block."""
+        start = time.perf_counter()
+        admission_queue_depth_context_var.set(self.queue_depth)
+        if is_expired():
+            raise deadline_exceeded(ADMISSION_STAGE)
+        if self._in_flight < self.max_concurrency and not self.queue_depth:
+            self._in_flight += 1
+        else:
+            await self._wait_for_slot(priority)
+        wait_seconds = time.perf_counter() - start
+        admission_admitted_counter.inc()
+        admission_wait_seconds_counter.inc(wait_seconds)
+        admission_wait_ms_context_var.set(round(wait_seconds * 1000, 3))
+        self._publish()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _wait_for_slot(self, priority: Priority) -> None:
+        """Queue until a finishing request hands over its slot."""
+        waiters = self._waiters[priority]
+        if self.queue_depth >= self.max_queue:
+            raise self._reject("queue is full")
+        if priority == Priority.BATCH and len(waiters) >= self._batch_queue_capacity:
+            raise self._reject(f"{priority} queue is full")
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        self._publish()
+        timeout = self.max_wait_seconds
+        remaining = remaining_seconds()
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except TimeoutError:
+            if waiter.done():
+                # Handed a slot just as the wait ran out, pass it on.
+                self._release()
+            else:
+                waiters.remove(waiter)
+            self._publish()
+            if is_expired():
+                raise deadline_exceeded(ADMISSION_STAGE) from None
+            raise self._reject("queue wait budget exceeded") from None
+        except asyncio.CancelledError:
+            if waiter.done():
+                self._release()
+            else:
+                waiters.remove(waiter)
+            self._publish()
+            raise
+
+    def _release(self) -> None:
+        """Hand the slot to the next queued request, or free it."""
+        for priority in Priority:
+            waiters = self._waiters[priority]
+            if waiters:
+                waiters.popleft().set_result(None)
+                break
+        else:
+            self._in_flight -= 1
+        self._publish()
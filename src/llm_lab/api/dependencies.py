@@ -1,15 +1,84 @@
+import re
+import secrets
+from functools import lru_cache
+
+from fastapi import Header
 from pydantic import ValidationError
 
+from llm_lab.api.concurrency import AdmissionController
 from llm_lab.api.exceptions import CustomException
-from llm_lab.core.factories import create_llm_client, create_vector_store_client
+from llm_lab.api.response_cache import (
+    DiskResponseCache,
+    InMemoryResponseCache,
+    ResponseCacheBackend,
+)
+from llm_lab.api.warmup import WarmUp
+from llm_lab.config.settings import ResponseCacheType, get_settings
+from llm_lab.config.variables import DATASET_NAME_PATTERN
+from llm_lab.core.answer_cache import SemanticAnswerCache
+from llm_lab.core.factories import (
+    create_answer_cache,
+    create_embedding_batcher,
+    create_vector_store_client,
+    shared_llm_client,
+)
 from llm_lab.llm.types import LlmClient
+from llm_lab.retrieval.embedding_batcher import EmbeddingBatcher
 from llm_lab.retrieval.retriever import Retriever
 from llm_lab.vector_store.types import VectorStoreClient
 
+_DATASET_NAME = re.compile(DATASET_NAME_PATTERN)
+
+
+def validate_dataset_name(dataset: str) -> None:
+    """Reject dataset names that are empty or could escape the store's directory."""
+    if not dataset:
+        raise CustomException(
+            status_code=400, message="Dataset name must be a non-empty string"
+        )
+    if not _DATASET_NAME.fullmatch(dataset):
+        raise CustomException(
+            status_code=400,
+            message=(
+                f"Invalid dataset name {dataset!r}: use letters, digits, '.', '_' "
+                "and '-', starting with a letter or digit"
+            ),
+        )
+
+
+def get_dataset_name(dataset: str) -> str:
+    """The dataset path parameter, once checked with validate_dataset_name."""
+    validate_dataset_name(dataset)
+    return dataset
+
+
+def require_admin_token(authorization: str | None = Header(default=None)) -> None:
+    """Only let through requests bearing the configured ADMIN_TOKEN.
+
+    Without a configured token the admin endpoints are disabled.
+    """
+    try:
+        admin_token = get_settings().admin_token
+    except ValidationError as err:
+        raise CustomException(
+            status_code=500,
+            message="Admin configuration error: missing or invalid environment variables",
+        ) from err
+    if admin_token is None:
+        raise CustomException(
+            status_code=403, message="Admin endpoints are disabled: set ADMIN_TOKEN"
+        )
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        token.encode(), admin_token.encode()
+    ):
+        raise CustomException(status_code=401, message="Invalid or missing admin token")
+
 
 def get_llm_client() -> LlmClient:
+    """Process-wide LLM client, shared with the embedding batcher and the warm-up."""
     try:
-        return create_llm_client()
+        return shared_llm_client()
     except ValidationError as err:
         raise CustomException(
             status_code=500,
@@ -27,5 +96,80 @@ def get_vector_store_client() -> VectorStoreClient:
         ) from err
 
 
+@lru_cache
+def get_embedding_batcher() -> EmbeddingBatcher | None:
+    """Process-wide query embedding batcher, shared by every request."""
+    try:
+        return create_embedding_batcher()
+    except ValidationError as err:
+        raise CustomException(
+            status_code=500,
+            message="LLM configuration error: missing or invalid environment variables",
+        ) from err
+
+
 def get_retriever_client() -> Retriever:
-    return Retriever(get_llm_client(), get_vector_store_client())
+    return Retriever(
+        get_llm_client(),
+        get_vector_store_client(),
+        get_embedding_batcher(),
+        fan_out_workers=get_settings().query_fan_out_workers,
+        default_embedding_model=get_settings().llm_embedding_model,
+    )
+
+
+@lru_cache
+def get_answer_cache() -> SemanticAnswerCache | None:
+    """Process-wide answer cache, shared by every request."""
+    try:
+        return create_answer_cache()
+    except ValidationError as err:
+        raise CustomException(
+            status_code=500,
+            message="Answer cache configuration error: missing or invalid environment variables",
+        ) from err
+
+
+@lru_cache
+def get_response_cache() -> ResponseCacheBackend | None:
+    """Process-wide /query response cache, shared by every request."""
+    try:
+        settings = get_settings()
+    except ValidationError as err:
+        raise CustomException(
+            status_code=500,
+            message="Response cache configuration error: missing or invalid environment variables",
+        ) from err
+    if settings.response_cache == ResponseCacheType.MEMORY:
+        return InMemoryResponseCache(max_entries=settings.response_cache_max_entries)
+    if settings.response_cache == ResponseCacheType.DISK:
+        return DiskResponseCache(
+            cache_dir=settings.response_cache_dir,
+            max_bytes=settings.response_cache_max_bytes,
+        )
+    return None
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController | None:
+    """Process-wide /query admission controller, shared by every request."""
+    try:
+        settings = get_settings()
+    except ValidationError as err:
+        raise CustomException(
+            status_code=500,
+            message="Admission configuration error: missing or invalid environment variables",
+        ) from err
+    if settings.admission_max_concurrency is None:
+        return None
+    return AdmissionController(
+        max_concurrency=settings.admission_max_concurrency,
+        max_queue=settings.admission_max_queue,
+        max_wait_seconds=settings.admission_max_wait_seconds,
+    )
+
+
+@lru_cache
+def get_warm_up() -> WarmUp:
+    """Process-wide startup warm-up, run by the app lifespan and reported by /ready."""
+    return WarmUp()
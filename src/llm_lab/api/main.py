@@ -1,8 +1,15 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
+from llm_lab.api.concurrency import AdmissionRejectedError, run_in_worker_thread
+from llm_lab.api.dependencies import get_warm_up
 from llm_lab.api.exceptions import CustomException
-from llm_lab.api.routers import echo, health, query
+from llm_lab.api.routers import admin, datasets, echo, health, metrics, query
+from llm_lab.api.warmup import warm_up_configured_datasets
 from llm_lab.llm.errors import (
     LlmAuthenticationError,
     LlmError,
@@ -10,9 +17,20 @@ from llm_lab.llm.errors import (
     LlmRateLimitError,
     LlmUnavailableError,
 )
+from llm_lab.observability.deadline import DeadlineExceededError
 from llm_lab.observability.logging import LoggingMiddleware
 
-app = FastAPI(title="llm_lab", version="0.0.1")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Warm up the configured datasets in the background while serving /ready."""
+    app.state.warm_up_task = asyncio.create_task(
+        run_in_worker_thread(warm_up_configured_datasets, get_warm_up())
+    )
+    yield
+
+
+app = FastAPI(title="llm_lab", version="0.0.1", lifespan=lifespan)
 
 
 @app.exception_handler(CustomException)
@@ -25,6 +43,17 @@ async def custom_exception_handler(
     )
 
 
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected_exception_handler(
+    request: Request, exc: AdmissionRejectedError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after_seconds)},
+    )
+
+
 @app.exception_handler(LlmRateLimitError)
 async def llm_rate_limit_exception_handler(
     request: Request, exc: LlmRateLimitError
@@ -75,8 +104,21 @@ async def llm_generic_error_exception_handler(
     )
 
 
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded_exception_handler(
+    request: Request, exc: DeadlineExceededError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=504,
+        content={"error": str(exc), "stage": exc.stage},
+    )
+
+
 app.add_middleware(LoggingMiddleware)
 
+app.include_router(admin.router)
+app.include_router(datasets.router)
 app.include_router(echo.router)
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(query.router)
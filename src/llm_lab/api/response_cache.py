@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Protocol
+
+from pydantic import BaseModel, ValidationError
+
+from llm_lab.config.variables import DISK_RESPONSE_CACHE_EVICT_TARGET
+from llm_lab.vector_store.types import QueryFilter
+
+
+class CachedResponse(BaseModel):
+    etag: str
+    body: str
+
+
+class ResponseCacheBackend(Protocol):
+    """Protocol describing storage for cached /query responses."""
+
+    def get(self, key: str) -> CachedResponse | None:
+        """Return the response cached under key, if any."""
+        ...
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        """Cache a response under key, evicting older entries to respect the limit."""
+        ...
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.split()).casefold()
+
+
+def build_cache_key(
+    query: str,
+    dataset: str | list[str],
+    top_k: int,
+    query_filter: QueryFilter | None,
+    index_version: str | None = None,
+    model: str | None = None,
+) -> str:
+    """Hash everything that determines a /query response into a cache key.
+
+    Queries differing only in case or whitespace share a key, and so do queries
+    naming the same datasets in another order.
+    """
+    canonical = json.dumps(
+        {
+            "query": _normalize_query(query),
+            "dataset": dataset if isinstance(dataset, str) else sorted(dataset),
+            "top_k": top_k,
+            "filter": None if query_filter is None else query_filter.model_dump(),
+            "index_version": index_version,
+            "model": model,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def build_etag(body: str) -> str:
+    """Strong ETag of a response body."""
+    return f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag."""
+    if if_none_match is None:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class InMemoryResponseCache(ResponseCacheBackend):
+    """Response cache held in process memory, evicting least recently used entries."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskResponseCache(ResponseCacheBackend):
+    """Response cache stored as one JSON file per key, shared across processes.
+
+    Reads refresh the file's modification time. The size of the directory is kept
+    as a running total, counted once at startup and updated on every write, so
+    writes do not scan the directory. Once the total passes max_bytes, the least
+    recently used files are deleted down to DISK_RESPONSE_CACHE_EVICT_TARGET of it,
+    and the scan this takes resyncs the total with what other processes wrote.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total_bytes = sum(size for _, size, _ in self._scan())
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> CachedResponse | None:
+        path = self._path(key)
+        try:
+            response = CachedResponse.model_validate_json(path.read_bytes())
+            path.touch()
+        except FileNotFoundError:
+            return None
+        except ValidationError:
+            path.unlink(missing_ok=True)
+            return None
+        return response
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        path = self._path(key)
+        data = response.model_dump_json().encode()
+        try:
+            replaced_size = path.stat().st_size
+        except FileNotFoundError:
+            replaced_size = 0
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_bytes += len(data) - replaced_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self) -> list[tuple[int, int, Path]]:
+        """(modification time, size, path) of every cached file."""
+        files = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        return files
+
+    def _evict(self) -> None:
+        files = self._scan()
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * DISK_RESPONSE_CACHE_EVICT_TARGET
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
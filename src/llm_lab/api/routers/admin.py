@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+
+from llm_lab.api.dependencies import (
+    get_dataset_name,
+    get_vector_store_client,
+    require_admin_token,
+)
+from llm_lab.api.exceptions import CustomException
+from llm_lab.vector_store.file.file_store import FileStoreClient
+from llm_lab.vector_store.types import VectorStoreClient
+
+
+class ReloadResponse(BaseModel):
+    dataset: str
+    index_version: str
+
+
+router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin_token)]
+)
+
+
+@router.post("/datasets/{dataset}/reload")
+def reload_dataset(
+    dataset: str = Depends(get_dataset_name),
+    vector_store_client: VectorStoreClient = Depends(get_vector_store_client),
+) -> ReloadResponse:
+    """Swap in the published version of a file store dataset without waiting for polling."""
+    if not isinstance(vector_store_client, FileStoreClient):
+        raise CustomException(
+            status_code=400,
+            message="Only file store datasets are held in memory and can be reloaded",
+        )
+    try:
+        index_version = vector_store_client.reload(dataset)
+    except FileNotFoundError as err:
+        raise CustomException(
+            status_code=404, message=f"Dataset {dataset} not found"
+        ) from err
+    except ValueError as err:
+        raise CustomException(
+            status_code=500, message=f"Dataset {dataset} could not be loaded: {err}"
+        ) from err
+    return ReloadResponse(dataset=dataset, index_version=index_version)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+
+from llm_lab.api.dependencies import get_dataset_name, get_vector_store_client
+from llm_lab.api.exceptions import CustomException
+from llm_lab.vector_store.types import DatasetInfo, VectorStoreClient
+
+
+class DatasetsResponse(BaseModel):
+    datasets: list[DatasetInfo]
+
+
+router = APIRouter(prefix="/datasets", tags=["Datasets"])
+
+
+@router.get("")
+def list_datasets(
+    vector_store_client: VectorStoreClient = Depends(get_vector_store_client),
+) -> DatasetsResponse:
+    """Describe the datasets whose metadata the vector store records."""
+    return DatasetsResponse(datasets=vector_store_client.list_datasets())
+
+
+@router.get("/{dataset}")
+def get_dataset(
+    dataset: str = Depends(get_dataset_name),
+    vector_store_client: VectorStoreClient = Depends(get_vector_store_client),
+) -> DatasetInfo:
+    """Describe one dataset from the vector store's cached metadata."""
+    try:
+        info = vector_store_client.get_dataset_info(dataset)
+    except ValueError as err:
+        raise CustomException(
+            status_code=500, message=f"Dataset {dataset} could not be read: {err}"
+        ) from err
+    if info is None:
+        raise CustomException(status_code=404, message=f"Dataset {dataset} not found")
+    return info
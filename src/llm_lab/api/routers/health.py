@@ -1,4 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Response
+
+from llm_lab.api.dependencies import get_warm_up
+from llm_lab.api.warmup import ReadinessReport, WarmUp
 
 router = APIRouter()
 
@@ -6,3 +9,14 @@ router = APIRouter()
 @router.get("/health", tags=["Health"])
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/ready", tags=["Health"])
+async def ready(
+    response: Response, warm_up: WarmUp = Depends(get_warm_up)
+) -> ReadinessReport:
+    """Report the startup warm-up; 503 until every configured dataset is loaded."""
+    report = warm_up.report()
+    if not report.ready:
+        response.status_code = 503
+    return report
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from llm_lab.observability.metrics import metrics_registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", tags=["Metrics"], response_class=PlainTextResponse)
+async def metrics() -> str:
+    return metrics_registry.render()
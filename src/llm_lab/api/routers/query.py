@@ -1,25 +1,83 @@
-from fastapi import APIRouter, Depends
+import contextlib
+
+from fastapi import APIRouter, Depends, Header, Response
 from pydantic import BaseModel, ConfigDict, Field
 
-from llm_lab.api.dependencies import get_llm_client, get_retriever_client
+from llm_lab.api.concurrency import (
+    AdmissionController,
+    Priority,
+    SingleFlight,
+    run_in_worker_thread,
+)
+from llm_lab.api.dependencies import (
+    get_admission_controller,
+    get_answer_cache,
+    get_llm_client,
+    get_response_cache,
+    get_retriever_client,
+    validate_dataset_name,
+)
 from llm_lab.api.exceptions import CustomException
+from llm_lab.api.response_cache import (
+    CachedResponse,
+    ResponseCacheBackend,
+    build_cache_key,
+    build_etag,
+    etag_matches,
+)
+from llm_lab.config.settings import get_settings
+from llm_lab.config.variables import MAX_QUERY_DATASETS
+from llm_lab.core.answer_cache import SemanticAnswerCache
+from llm_lab.core.context_packing import ContextPacker
 from llm_lab.core.rag_service import RagService
 from llm_lab.llm.types import LlmClient
-from llm_lab.observability.context import dataset_context_var, top_k_context_var
+from llm_lab.observability.context import (
+    dataset_context_var,
+    response_cache_hit_context_var,
+    top_k_context_var,
+)
+from llm_lab.observability.deadline import deadline
 from llm_lab.retrieval.retriever import Retriever
-from llm_lab.vector_store.types import ScoredChunk
+from llm_lab.vector_store.types import (
+    DocPathFilterLimitError,
+    QueryFilter,
+    ScoredChunk,
+)
 
 
 class QueryRequest(BaseModel):
     model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
     query: str
     top_k: int = Field(default=3)
-    dataset: str = Field(description="Dataset name")
+    dataset: str | None = Field(default=None, description="Dataset name")
+    datasets: list[str] | None = Field(
+        default=None,
+        description="Names of several datasets to search together, instead of dataset",
+    )
+    filter: QueryFilter | None = Field(
+        default=None, description="Restrict retrieval to matching chunks"
+    )
+
+    @property
+    def dataset_names(self) -> list[str]:
+        """The datasets to search, whichever field named them."""
+        if self.datasets is not None:
+            return self.datasets
+        return [] if self.dataset is None else [self.dataset]
+
+    @property
+    def cache_dataset(self) -> str | list[str]:
+        """The datasets as keyed in caches, a single one by its name."""
+        names = self.dataset_names
+        return names[0] if len(names) == 1 else names
 
 
 class SourceChunk(BaseModel):
     source: str
     chunk_id: int
+    dataset: str | None = Field(
+        default=None, description="Dataset of the chunk, when several were searched"
+    )
 
 
 class QueryResponse(BaseModel):
@@ -30,6 +88,13 @@ class QueryResponse(BaseModel):
 
 router = APIRouter(prefix="", tags=["Query"])
 
+# Clients may store responses but must revalidate them with If-None-Match, since a
+# re-indexed dataset changes the answer.
+RESPONSE_CACHE_CONTROL = "private, no-cache"
+
+# Identical requests arriving while one is being answered share its answer.
+query_single_flight: SingleFlight[QueryResponse] = SingleFlight()
+
 
 def validate_query_request(request: QueryRequest) -> None:
     if not request.query:
@@ -38,10 +103,32 @@ def validate_query_request(request: QueryRequest) -> None:
         )
     if request.top_k < 1 or request.top_k > 10:
         raise CustomException(status_code=400, message="top_k must be between 1 and 10")
-    if not request.dataset:
+    if request.dataset is not None and request.datasets is not None:
+        raise CustomException(
+            status_code=400, message="Set either dataset or datasets, not both"
+        )
+    names = request.dataset_names
+    if not names:
         raise CustomException(
             status_code=400, message="Dataset name must be a non-empty string"
         )
+    for name in names:
+        validate_dataset_name(name)
+    if len(names) > MAX_QUERY_DATASETS:
+        raise CustomException(
+            status_code=400,
+            message=f"At most {MAX_QUERY_DATASETS} datasets can be searched at once",
+        )
+    if len(set(names)) != len(names):
+        raise CustomException(status_code=400, message="Datasets must be distinct")
+
+
+def request_timeout_seconds(header_timeout: float | None) -> float | None:
+    """Time budget of a request: the header's, capped by the configured timeout."""
+    configured = get_settings().request_timeout_seconds
+    if header_timeout is None or configured is None:
+        return header_timeout or configured
+    return min(header_timeout, configured)
 
 
 def build_response(
@@ -52,29 +139,147 @@ def build_response(
         answer=response,
         sources=[
             SourceChunk(
-                source=sc.indexed_chunk.source, chunk_id=sc.indexed_chunk.chunk_id
+                source=sc.indexed_chunk.source,
+                chunk_id=sc.indexed_chunk.chunk_id,
+                dataset=sc.dataset,
             )
             for sc in top_chunks
         ],
     )
 
 
-@router.post("/query")
+def _cached_json_response(
+    cached: CachedResponse, if_none_match: str | None
+) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": RESPONSE_CACHE_CONTROL}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+async def _answer(
+    body: QueryRequest,
+    rag: RagService,
+    admission: AdmissionController | None,
+    priority: Priority,
+) -> QueryResponse:
+    return await query_single_flight.run(
+        build_cache_key(body.query, body.cache_dataset, body.top_k, body.filter),
+        lambda: _run_rag(body, rag, admission, priority),
+    )
+
+
+async def _run_rag(
+    body: QueryRequest,
+    rag: RagService,
+    admission: AdmissionController | None,
+    priority: Priority,
+) -> QueryResponse:
+    # Only the computation takes an admission slot: coalesced requests and
+    # response cache hits cost next to nothing.
+    async with admission.admit(priority) if admission else contextlib.nullcontext():
+        try:
+            datasets = body.dataset_names
+            if len(datasets) == 1:
+                query_result = await run_in_worker_thread(
+                    rag.answer_question,
+                    dataset=datasets[0],
+                    query=body.query,
+                    top_k=body.top_k,
+                    query_filter=body.filter,
+                )
+            else:
+                query_result = await run_in_worker_thread(
+                    rag.answer_question_across,
+                    datasets=datasets,
+                    query=body.query,
+                    top_k=body.top_k,
+                    query_filter=body.filter,
+                )
+        except DocPathFilterLimitError as err:
+            raise CustomException(status_code=400, message=str(err)) from err
+        except (ValueError, FileNotFoundError) as err:
+            raise CustomException(status_code=500, message=str(err)) from err
+    return build_response(query_result.chunks, query_result.answer)
+
+
+@router.post("/query", response_model=QueryResponse)
 async def query(
     body: QueryRequest,
+    if_none_match: str | None = Header(default=None),
+    x_request_timeout: float | None = Header(
+        default=None, gt=0, description="Time budget of the request in seconds"
+    ),
+    x_request_priority: Priority = Header(
+        default=Priority.INTERACTIVE, description="Admission lane of the request"
+    ),
     llm_client: LlmClient = Depends(get_llm_client),
     retriever: Retriever = Depends(get_retriever_client),
-) -> QueryResponse:
+    answer_cache: SemanticAnswerCache | None = Depends(get_answer_cache),
+    response_cache: ResponseCacheBackend | None = Depends(get_response_cache),
+    admission: AdmissionController | None = Depends(get_admission_controller),
+) -> QueryResponse | Response:
     validate_query_request(body)
-    dataset_context_var.set(body.dataset)
+    dataset_context_var.set(",".join(body.dataset_names))
     top_k_context_var.set(body.top_k)
-    rag = RagService(llm_client, retriever)
+    rag = RagService(
+        llm_client,
+        retriever,
+        answer_cache,
+        ContextPacker(get_settings().context_token_budget),
+    )
+    with deadline(request_timeout_seconds(x_request_timeout)):
+        if response_cache is None:
+            return await _answer(body, rag, admission, x_request_priority)
+        return await _answer_with_response_cache(
+            body,
+            rag,
+            admission,
+            x_request_priority,
+            retriever,
+            response_cache,
+            if_none_match,
+        )
+
+
+def _index_version(retriever: Retriever, datasets: list[str]) -> str | None:
+    """Index version of the searched datasets, combined when there are several."""
+    if len(datasets) == 1:
+        return retriever.get_index_version(datasets[0])
+    return ",".join(
+        f"{dataset}={retriever.get_index_version(dataset)}"
+        for dataset in sorted(datasets)
+    )
+
+
+async def _answer_with_response_cache(
+    body: QueryRequest,
+    rag: RagService,
+    admission: AdmissionController | None,
+    priority: Priority,
+    retriever: Retriever,
+    response_cache: ResponseCacheBackend,
+    if_none_match: str | None,
+) -> Response:
     try:
-        query_result = rag.answer_question(
-            dataset=body.dataset,
-            query=body.query,
-            top_k=body.top_k,
+        index_version = await run_in_worker_thread(
+            _index_version, retriever, body.dataset_names
         )
     except (ValueError, FileNotFoundError) as err:
         raise CustomException(status_code=500, message=str(err)) from err
-    return build_response(query_result.chunks, query_result.answer)
+    cache_key = build_cache_key(
+        body.query,
+        body.cache_dataset,
+        body.top_k,
+        body.filter,
+        index_version,
+        get_settings().llm_model,
+    )
+    cached = await run_in_worker_thread(response_cache.get, cache_key)
+    response_cache_hit_context_var.set(cached is not None)
+    if cached is None:
+        query_response = await _answer(body, rag, admission, priority)
+        response_body = query_response.model_dump_json()
+        cached = CachedResponse(etag=build_etag(response_body), body=response_body)
+        await run_in_worker_thread(response_cache.set, cache_key, cached)
+    return _cached_json_response(cached, if_none_match)
@@ -0,0 +1,148 @@
+import enum
+import threading
+import time
+
+from pydantic import BaseModel, Field, ValidationError
+
+from llm_lab.config.settings import get_settings
+from llm_lab.core.factories import create_vector_store_client, shared_llm_client
+from llm_lab.llm.errors import LlmError
+from llm_lab.llm.types import LlmClient
+from llm_lab.retrieval.retriever import resolve_embedding_model
+from llm_lab.vector_store.types import VectorStoreClient
+
+
+class LoadState(enum.StrEnum):
+    """Warm-up progress of a dataset."""
+
+    PENDING = "pending"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+
+class DatasetReadiness(BaseModel):
+    dataset: str
+    state: LoadState = LoadState.PENDING
+    chunk_count: int | None = None
+    memory_bytes: int | None = Field(
+        default=None, description="Approximate memory held by the loaded dataset."
+    )
+    load_seconds: float | None = None
+    index_version: str | None = None
+    error: str | None = None
+
+
+class ReadinessReport(BaseModel):
+    ready: bool
+    error: str | None = Field(
+        default=None, description="Why the warm-up could not run at all."
+    )
+    embed_error: str | None = Field(
+        default=None,
+        description="Why the warm-up embedding failed; it does not affect readiness.",
+    )
+    datasets: list[DatasetReadiness]
+
+
+class WarmUp:
+    """Load datasets ahead of the first query and report their progress.
+
+    The instance is ready once the warm-up finished and every dataset loaded, so
+    the platform only routes traffic to it when no query pays for a cold load.
+    """
+
+    def __init__(self) -> None:
+        self._datasets: dict[str, DatasetReadiness] = {}
+        self._finished = False
+        self._error: str | None = None
+        self._embed_error: str | None = None
+        self._lock = threading.Lock()
+
+    def _update(self, dataset: str, **fields: object) -> None:
+        with self._lock:
+            self._datasets[dataset] = self._datasets[dataset].model_copy(update=fields)
+
+    def fail(self, error: str) -> None:
+        """Record that the warm-up could not run at all."""
+        with self._lock:
+            self._error = error
+            self._finished = True
+
+    def load_datasets(
+        self,
+        datasets: list[str],
+        vector_store_client: VectorStoreClient,
+        default_embedding_model: str,
+    ) -> None:
+        """Load each dataset in turn, recording how it went.
+
+        Datasets without metadata are loaded for default_embedding_model.
+        """
+        with self._lock:
+            self._datasets = {name: DatasetReadiness(dataset=name) for name in datasets}
+        for dataset in datasets:
+            self._update(dataset, state=LoadState.LOADING)
+            start = time.perf_counter()
+            try:
+                stats = vector_store_client.warm_up(
+                    dataset,
+                    resolve_embedding_model(
+                        vector_store_client, dataset, default_embedding_model
+                    ),
+                )
+            except Exception as err:
+                self._update(dataset, state=LoadState.FAILED, error=str(err))
+                continue
+            self._update(
+                dataset,
+                state=LoadState.READY,
+                chunk_count=stats.chunk_count,
+                memory_bytes=stats.memory_bytes,
+                index_version=stats.index_version,
+                load_seconds=time.perf_counter() - start,
+            )
+
+    def prime_llm(self, llm_client: LlmClient, embedding_model: str) -> None:
+        """Open the LLM connection with a dummy embedding from embedding_model."""
+        try:
+            llm_client.embed_text("warm-up", embedding_model)
+        except LlmError as err:
+            # Only an optimization: the first query connects on its own.
+            with self._lock:
+                self._embed_error = str(err)
+
+    def finish(self) -> None:
+        with self._lock:
+            self._finished = True
+
+    def report(self) -> ReadinessReport:
+        with self._lock:
+            datasets = list(self._datasets.values())
+            ready = self._finished and all(
+                status.state == LoadState.READY for status in datasets
+            )
+            return ReadinessReport(
+                ready=ready and self._error is None,
+                error=self._error,
+                embed_error=self._embed_error,
+                datasets=datasets,
+            )
+
+
+def warm_up_configured_datasets(warm_up: WarmUp) -> None:
+    """Run the warm-up described by the settings."""
+    try:
+        settings = get_settings()
+        if settings.warmup_datasets:
+            warm_up.load_datasets(
+                settings.warmup_datasets,
+                create_vector_store_client(),
+                settings.llm_embedding_model,
+            )
+        if settings.warmup_embed:
+            warm_up.prime_llm(shared_llm_client(), settings.llm_embedding_model)
+    except ValidationError:
+        warm_up.fail("Configuration error: missing or invalid environment variables")
+        return
+    warm_up.finish()
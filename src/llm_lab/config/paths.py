@@ -5,3 +5,4 @@ ASSETS_DIR = BASE_DIR / "assets"
 DEFAULT_INDEXED_CHUNKS_FILE = ASSETS_DIR / "indexed_chunks.json"
 DEFAULT_DOCS_DIR = ASSETS_DIR / "docs"
 DEFAULT_DESTINATION_DIR = BASE_DIR / "dest"
+DEFAULT_RESPONSE_CACHE_DIR = BASE_DIR / ".cache" / "responses"
@@ -1,9 +1,44 @@
 import enum
 from functools import lru_cache
+from pathlib import Path
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from llm_lab.config.paths import DEFAULT_RESPONSE_CACHE_DIR
+from llm_lab.config.variables import (
+    DEFAULT_ADMISSION_MAX_CONCURRENCY,
+    DEFAULT_ADMISSION_MAX_QUEUE,
+    DEFAULT_ADMISSION_MAX_WAIT_SECONDS,
+    DEFAULT_ANSWER_CACHE_MAX_ENTRIES,
+    DEFAULT_ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    DEFAULT_ANSWER_CACHE_TTL_SECONDS,
+    DEFAULT_CONTEXT_TOKEN_BUDGET,
+    DEFAULT_EMBEDDING_BATCH_MAX_SIZE,
+    DEFAULT_EMBEDDING_BATCH_WINDOW_MS,
+    DEFAULT_FILE_STORE_RELOAD_INTERVAL_SECONDS,
+    DEFAULT_FILE_STORE_SCAN_WORKERS,
+    DEFAULT_FILE_STORE_SHARD_MAX_BYTES,
+    DEFAULT_FILE_STORE_SHARD_MAX_CHUNKS,
+    DEFAULT_FILE_STORE_WRITE_WORKERS,
+    DEFAULT_LLM_CIRCUIT_FAILURE_THRESHOLD,
+    DEFAULT_LLM_CIRCUIT_RESET_SECONDS,
+    DEFAULT_LLM_CONTEXT_CACHE_MAX_ENTRIES,
+    DEFAULT_LLM_CONTEXT_CACHE_MIN_TOKENS,
+    DEFAULT_LLM_CONTEXT_CACHE_TTL_SECONDS,
+    DEFAULT_LLM_HEDGE_MAX_OUTSTANDING,
+    DEFAULT_LLM_HEDGE_PERCENTILE,
+    DEFAULT_LLM_MAX_RETRIES,
+    DEFAULT_LLM_RETRY_INITIAL_BACKOFF_SECONDS,
+    DEFAULT_LLM_RETRY_MAX_BACKOFF_SECONDS,
+    DEFAULT_QDRANT_UPLOAD_BATCH_SIZE,
+    DEFAULT_QDRANT_UPLOAD_WORKERS,
+    DEFAULT_QUERY_FAN_OUT_WORKERS,
+    DEFAULT_REQUEST_TIMEOUT_SECONDS,
+    DEFAULT_RESPONSE_CACHE_MAX_BYTES,
+    DEFAULT_RESPONSE_CACHE_MAX_ENTRIES,
+)
+
 DEFAULT_EMBEDDING_MODEL_NAME = "gemini-embedding-001"
 DEFAULT_MODEL_NAME = "gemini-3.1-flash-lite-preview"
 
@@ -15,6 +50,30 @@ class VectorStoreType(enum.StrEnum):
     QDRANT = "qdrant"
 
 
+class ResponseCacheType(enum.StrEnum):
+    """Storage backends for the /query response cache."""
+
+    NONE = "none"
+    MEMORY = "memory"
+    DISK = "disk"
+
+
+class QdrantQuantization(enum.StrEnum):
+    """Vector quantization applied to Qdrant collections."""
+
+    NONE = "none"
+    SCALAR = "scalar"
+    BINARY = "binary"
+
+
+class QdrantTenantMode(enum.StrEnum):
+    """How datasets are partitioned inside Qdrant."""
+
+    PAYLOAD = "payload"
+    SHARD_KEY = "shard_key"
+    COLLECTION = "collection"
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
@@ -32,11 +91,295 @@ class Settings(BaseSettings):
         validation_alias="LLM_EMBEDDING_MODEL_NAME",
         default=DEFAULT_EMBEDDING_MODEL_NAME,
     )
+    llm_max_retries: int = Field(
+        default=DEFAULT_LLM_MAX_RETRIES,
+        validation_alias="LLM_MAX_RETRIES",
+        description="Retries of LLM calls failing with a rate limit or server error.",
+        ge=0,
+    )
+    llm_retry_initial_backoff_seconds: float = Field(
+        default=DEFAULT_LLM_RETRY_INITIAL_BACKOFF_SECONDS,
+        validation_alias="LLM_RETRY_INITIAL_BACKOFF_SECONDS",
+        description="Upper bound of the jittered delay before the first retry.",
+        gt=0,
+    )
+    llm_retry_max_backoff_seconds: float = Field(
+        default=DEFAULT_LLM_RETRY_MAX_BACKOFF_SECONDS,
+        validation_alias="LLM_RETRY_MAX_BACKOFF_SECONDS",
+        description="Longest delay between retries, including server retry hints.",
+        gt=0,
+    )
+    llm_embed_requests_per_second: float | None = Field(
+        default=None,
+        validation_alias="LLM_EMBED_REQUESTS_PER_SECOND",
+        description="Process-wide pace of embedding requests, unlimited if unset.",
+        gt=0,
+    )
+    llm_generate_requests_per_second: float | None = Field(
+        default=None,
+        validation_alias="LLM_GENERATE_REQUESTS_PER_SECOND",
+        description="Process-wide pace of generation requests, unlimited if unset.",
+        gt=0,
+    )
+    llm_context_cache_enabled: bool = Field(
+        default=False,
+        validation_alias="LLM_CONTEXT_CACHE_ENABLED",
+        description="Cache repeated prompt prefixes with the provider's context cache.",
+    )
+    llm_context_cache_ttl_seconds: float = Field(
+        default=DEFAULT_LLM_CONTEXT_CACHE_TTL_SECONDS,
+        validation_alias="LLM_CONTEXT_CACHE_TTL_SECONDS",
+        description="Lifetime of a provider-side cached prefix.",
+        gt=60,
+    )
+    llm_context_cache_max_entries: int = Field(
+        default=DEFAULT_LLM_CONTEXT_CACHE_MAX_ENTRIES,
+        validation_alias="LLM_CONTEXT_CACHE_MAX_ENTRIES",
+        description="Prompt prefixes tracked locally, evicted least recently used.",
+        gt=0,
+    )
+    llm_context_cache_min_tokens: int = Field(
+        default=DEFAULT_LLM_CONTEXT_CACHE_MIN_TOKENS,
+        validation_alias="LLM_CONTEXT_CACHE_MIN_TOKENS",
+        description="Smallest prompt prefix, in estimated tokens, worth caching.",
+        gt=0,
+    )
+    llm_hedge_enabled: bool = Field(
+        default=False,
+        validation_alias="LLM_HEDGE_ENABLED",
+        description="Send a duplicate of generation calls slower than the hedge percentile.",
+    )
+    llm_hedge_percentile: int = Field(
+        default=DEFAULT_LLM_HEDGE_PERCENTILE,
+        validation_alias="LLM_HEDGE_PERCENTILE",
+        description="Latency percentile of recent generation calls after which to hedge.",
+        ge=1,
+        le=99,
+    )
+    llm_hedge_max_outstanding: int = Field(
+        default=DEFAULT_LLM_HEDGE_MAX_OUTSTANDING,
+        validation_alias="LLM_HEDGE_MAX_OUTSTANDING",
+        description="Maximum number of hedged generation calls in flight at once.",
+        gt=0,
+    )
+    llm_circuit_failure_threshold: int = Field(
+        default=DEFAULT_LLM_CIRCUIT_FAILURE_THRESHOLD,
+        validation_alias="LLM_CIRCUIT_FAILURE_THRESHOLD",
+        description="Consecutive LLM server failures that open the circuit breaker.",
+        gt=0,
+    )
+    llm_circuit_reset_seconds: float = Field(
+        default=DEFAULT_LLM_CIRCUIT_RESET_SECONDS,
+        validation_alias="LLM_CIRCUIT_RESET_SECONDS",
+        description="Seconds the circuit stays open before a probe call is allowed.",
+        gt=0,
+    )
+    embedding_batch_window_ms: float = Field(
+        default=DEFAULT_EMBEDDING_BATCH_WINDOW_MS,
+        validation_alias="EMBEDDING_BATCH_WINDOW_MS",
+        description="Milliseconds a query embedding waits for others to batch with under load.",
+        ge=0,
+    )
+    embedding_batch_max_size: int = Field(
+        default=DEFAULT_EMBEDDING_BATCH_MAX_SIZE,
+        validation_alias="EMBEDDING_BATCH_MAX_SIZE",
+        description="Maximum query embeddings per batched request, 1 disables batching.",
+        gt=0,
+        le=100,
+    )
     vector_store: VectorStoreType = Field(
         default=VectorStoreType.QDRANT,
         validation_alias="VECTOR_STORE",
         description="Vector store to use.",
     )
+    file_store_scan_workers: int = Field(
+        default=DEFAULT_FILE_STORE_SCAN_WORKERS,
+        validation_alias="FILE_STORE_SCAN_WORKERS",
+        description="Number of threads scanning file store embeddings in parallel.",
+        gt=0,
+    )
+    file_store_shard_max_chunks: int = Field(
+        default=DEFAULT_FILE_STORE_SHARD_MAX_CHUNKS,
+        validation_alias="FILE_STORE_SHARD_MAX_CHUNKS",
+        description="Maximum number of chunks per file store index file.",
+        gt=0,
+    )
+    file_store_shard_max_bytes: int | None = Field(
+        default=DEFAULT_FILE_STORE_SHARD_MAX_BYTES,
+        validation_alias="FILE_STORE_SHARD_MAX_BYTES",
+        description="Size after which a file store index file is cut, unset for no limit.",
+        gt=0,
+    )
+    file_store_write_workers: int = Field(
+        default=DEFAULT_FILE_STORE_WRITE_WORKERS,
+        validation_alias="FILE_STORE_WRITE_WORKERS",
+        description="Number of threads writing file store index files in parallel.",
+        gt=0,
+    )
+    warmup_datasets: list[str] = Field(
+        default_factory=list,
+        validation_alias="WARMUP_DATASETS",
+        description='Datasets loaded at startup, before /ready reports ready, e.g. ["ducks"].',
+    )
+    warmup_embed: bool = Field(
+        default=False,
+        validation_alias="WARMUP_EMBED",
+        description="Send a dummy embedding at startup to open the LLM connection.",
+    )
+    file_store_reload_interval_seconds: float = Field(
+        default=DEFAULT_FILE_STORE_RELOAD_INTERVAL_SECONDS,
+        validation_alias="FILE_STORE_RELOAD_INTERVAL_SECONDS",
+        description="Seconds between checks of a loaded dataset for a newly published version.",
+        ge=0,
+    )
+    admin_token: str | None = Field(
+        default=None,
+        validation_alias="ADMIN_TOKEN",
+        description="Bearer token of the /admin endpoints, which are disabled without it.",
+    )
+    qdrant_prefer_grpc: bool = Field(
+        default=False,
+        validation_alias="QDRANT_PREFER_GRPC",
+        description="Talk to Qdrant over gRPC instead of REST.",
+    )
+    qdrant_tenant_mode: QdrantTenantMode = Field(
+        default=QdrantTenantMode.PAYLOAD,
+        validation_alias="QDRANT_TENANT_MODE",
+        description="Partition datasets by tenant payload index, shard key or collection.",
+    )
+    qdrant_quantization: QdrantQuantization = Field(
+        default=QdrantQuantization.NONE,
+        validation_alias="QDRANT_QUANTIZATION",
+        description="Quantization for newly created Qdrant collections.",
+    )
+    qdrant_on_disk_vectors: bool = Field(
+        default=False,
+        validation_alias="QDRANT_ON_DISK_VECTORS",
+        description="Keep original vectors on disk instead of in RAM.",
+    )
+    qdrant_hnsw_m: int | None = Field(
+        default=None,
+        validation_alias="QDRANT_HNSW_M",
+        description="HNSW graph degree for newly created collections.",
+        gt=0,
+    )
+    qdrant_hnsw_ef_construct: int | None = Field(
+        default=None,
+        validation_alias="QDRANT_HNSW_EF_CONSTRUCT",
+        description="HNSW build-time beam size for newly created collections.",
+        gt=0,
+    )
+    qdrant_hnsw_ef: int | None = Field(
+        default=None,
+        validation_alias="QDRANT_HNSW_EF",
+        description="HNSW query-time beam size.",
+        gt=0,
+    )
+    qdrant_quantization_oversampling: float | None = Field(
+        default=None,
+        validation_alias="QDRANT_QUANTIZATION_OVERSAMPLING",
+        description="Candidates fetched per result from quantized vectors.",
+        ge=1.0,
+    )
+    qdrant_quantization_rescore: bool | None = Field(
+        default=None,
+        validation_alias="QDRANT_QUANTIZATION_RESCORE",
+        description="Rescore quantized candidates with the original vectors.",
+    )
+    qdrant_upload_batch_size: int = Field(
+        default=DEFAULT_QDRANT_UPLOAD_BATCH_SIZE,
+        validation_alias="QDRANT_UPLOAD_BATCH_SIZE",
+        description="Number of points sent per Qdrant upsert request.",
+        gt=0,
+    )
+    qdrant_upload_workers: int = Field(
+        default=DEFAULT_QDRANT_UPLOAD_WORKERS,
+        validation_alias="QDRANT_UPLOAD_WORKERS",
+        description="Number of Qdrant upsert requests sent in parallel.",
+        gt=0,
+    )
+    answer_cache_enabled: bool = Field(
+        default=False,
+        validation_alias="ANSWER_CACHE_ENABLED",
+        description="Reuse answers of previous questions with a near-identical embedding.",
+    )
+    answer_cache_similarity_threshold: float = Field(
+        default=DEFAULT_ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        validation_alias="ANSWER_CACHE_SIMILARITY_THRESHOLD",
+        description="Minimum cosine similarity between questions to reuse an answer.",
+        ge=0.0,
+        le=1.0,
+    )
+    answer_cache_max_entries: int = Field(
+        default=DEFAULT_ANSWER_CACHE_MAX_ENTRIES,
+        validation_alias="ANSWER_CACHE_MAX_ENTRIES",
+        description="Maximum number of cached answers across all datasets.",
+        gt=0,
+    )
+    answer_cache_ttl_seconds: float = Field(
+        default=DEFAULT_ANSWER_CACHE_TTL_SECONDS,
+        validation_alias="ANSWER_CACHE_TTL_SECONDS",
+        description="Seconds after which a cached answer expires.",
+        gt=0,
+    )
+    response_cache: ResponseCacheType = Field(
+        default=ResponseCacheType.NONE,
+        validation_alias="RESPONSE_CACHE",
+        description="Backend caching identical /query requests.",
+    )
+    response_cache_max_entries: int = Field(
+        default=DEFAULT_RESPONSE_CACHE_MAX_ENTRIES,
+        validation_alias="RESPONSE_CACHE_MAX_ENTRIES",
+        description="Maximum number of responses kept by the memory backend.",
+        gt=0,
+    )
+    response_cache_dir: Path = Field(
+        default=DEFAULT_RESPONSE_CACHE_DIR,
+        validation_alias="RESPONSE_CACHE_DIR",
+        description="Directory of the disk backend.",
+    )
+    response_cache_max_bytes: int = Field(
+        default=DEFAULT_RESPONSE_CACHE_MAX_BYTES,
+        validation_alias="RESPONSE_CACHE_MAX_BYTES",
+        description="Maximum total size of the disk backend.",
+        gt=0,
+    )
+    context_token_budget: int = Field(
+        default=DEFAULT_CONTEXT_TOKEN_BUDGET,
+        validation_alias="CONTEXT_TOKEN_BUDGET",
+        description="Estimated tokens of retrieved context put in a prompt.",
+        gt=0,
+    )
+    query_fan_out_workers: int = Field(
+        default=DEFAULT_QUERY_FAN_OUT_WORKERS,
+        validation_alias="QUERY_FAN_OUT_WORKERS",
+        description="Threads querying the datasets of a multi-dataset /query concurrently.",
+        gt=0,
+    )
+    request_timeout_seconds: float | None = Field(
+        default=DEFAULT_REQUEST_TIMEOUT_SECONDS,
+        validation_alias="REQUEST_TIMEOUT_SECONDS",
+        description="Time budget of a /query request, unbounded if unset.",
+        gt=0,
+    )
+    admission_max_concurrency: int | None = Field(
+        default=DEFAULT_ADMISSION_MAX_CONCURRENCY,
+        validation_alias="ADMISSION_MAX_CONCURRENCY",
+        description="/query requests processed at once, unlimited if unset.",
+        gt=0,
+    )
+    admission_max_queue: int = Field(
+        default=DEFAULT_ADMISSION_MAX_QUEUE,
+        validation_alias="ADMISSION_MAX_QUEUE",
+        description="/query requests waiting for admission before new ones are shed.",
+        ge=0,
+    )
+    admission_max_wait_seconds: float = Field(
+        default=DEFAULT_ADMISSION_MAX_WAIT_SECONDS,
+        validation_alias="ADMISSION_MAX_WAIT_SECONDS",
+        description="Time a /query request may wait for admission before it is shed.",
+        gt=0,
+    )
 
 
 @lru_cache
@@ -1,4 +1,77 @@
 SIMILARITY_SCORE_THRESHOLD = 0.70
 MAX_CANDIDATES = 10
 CANDIDATE_MULTIPLIER = 3
+# Datasets a single /query may search at once.
+MAX_QUERY_DATASETS = 8
+# Dataset names the API accepts. They name directories of the file store, so path
+# separators and names starting with a dot are excluded.
+DATASET_NAME_PATTERN = r"[A-Za-z0-9][A-Za-z0-9._-]*"
+DEFAULT_QUERY_FAN_OUT_WORKERS = 8
+DEFAULT_ANSWER_CACHE_SIMILARITY_THRESHOLD = 0.95
+DEFAULT_ANSWER_CACHE_MAX_ENTRIES = 1024
+DEFAULT_ANSWER_CACHE_TTL_SECONDS = 3600.0
+DEFAULT_RESPONSE_CACHE_MAX_ENTRIES = 1024
+DEFAULT_RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Share of its max_bytes the disk response cache evicts down to, so the directory
+# scan of an eviction is paid once per many writes rather than on every one.
+DISK_RESPONSE_CACHE_EVICT_TARGET = 0.9
+DEFAULT_EMBEDDING_BATCH_WINDOW_MS = 5.0
+DEFAULT_EMBEDDING_BATCH_MAX_SIZE = 16
+DEFAULT_LLM_MAX_RETRIES = 3
+DEFAULT_LLM_RETRY_INITIAL_BACKOFF_SECONDS = 1.0
+DEFAULT_LLM_RETRY_MAX_BACKOFF_SECONDS = 30.0
+DEFAULT_LLM_CIRCUIT_FAILURE_THRESHOLD = 5
+DEFAULT_LLM_CIRCUIT_RESET_SECONDS = 30.0
+DEFAULT_LLM_HEDGE_PERCENTILE = 95
+DEFAULT_LLM_HEDGE_MAX_OUTSTANDING = 4
+# Number of recent generation latencies the hedge delay is computed from, and how
+# many are needed before hedging starts.
+LLM_HEDGE_LATENCY_WINDOW = 200
+LLM_HEDGE_MIN_SAMPLES = 20
+DEFAULT_CONTEXT_TOKEN_BUDGET = 8000
+# Rough characters per token of English text, used to estimate prompt sizes.
+CHARS_PER_TOKEN = 4
+# Smallest part of a chunk worth trimming it to when packing the prompt context.
+MIN_TRIMMED_PASSAGE_TOKENS = 100
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 30.0
+DEFAULT_ADMISSION_MAX_CONCURRENCY = 32
+DEFAULT_ADMISSION_MAX_QUEUE = 64
+DEFAULT_ADMISSION_MAX_WAIT_SECONDS = 5.0
+# Fraction of the admission queue batch requests may occupy, keeping room for
+# interactive ones.
+ADMISSION_BATCH_QUEUE_SHARE = 0.5
+DEFAULT_LLM_CONTEXT_CACHE_TTL_SECONDS = 600.0
+DEFAULT_LLM_CONTEXT_CACHE_MAX_ENTRIES = 64
+# Gemini refuses to cache prompt prefixes shorter than this.
+DEFAULT_LLM_CONTEXT_CACHE_MIN_TOKENS = 1024
+# Times a prompt prefix must be seen before it is cached with the provider.
+CONTEXT_CACHE_MIN_SIGHTINGS = 2
+CONTEXT_CACHE_EXPIRY_MARGIN_SECONDS = 30
+# Chunks embedded per request while indexing, the Gemini batch limit.
+INDEX_EMBED_BATCH_SIZE = 100
+# SimHash similarity (share of equal fingerprint bits) from which chunks are
+# indexed as near duplicates of each other.
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.9
+SIMHASH_BITS = 64
+SIMHASH_SHINGLE_WORDS = 3
 DEFAULT_QDRANT_CLIENT_URL = "http://localhost:6333"
+DEFAULT_QDRANT_UPLOAD_BATCH_SIZE = 256
+DEFAULT_QDRANT_UPLOAD_WORKERS = 4
+DEFAULT_QDRANT_UPLOAD_MAX_RETRIES = 3
+QDRANT_UPLOAD_RETRY_BACKOFF_SECONDS = 0.5
+DEFAULT_FILE_STORE_SCAN_WORKERS = 1
+DEFAULT_FILE_STORE_SHARD_MAX_CHUNKS = 1000
+DEFAULT_FILE_STORE_SHARD_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_FILE_STORE_WRITE_WORKERS = 4
+DEFAULT_FILE_STORE_RELOAD_INTERVAL_SECONDS = 5.0
+# Unpublished index builds untouched this long are from builds that crashed.
+FILE_STORE_STALE_BUILD_SECONDS = 3600.0
+DEFAULT_SCAN_SHARD_ROWS = 16384
+MAX_FILTER_DOC_PATHS = 10000
+MAX_MIGRATION_DATASETS = 10000
+DEFAULT_QDRANT_TENANT_PAYLOAD_M = 16
+# Output dimension of known embedding models, used when no embedding is at hand.
+EMBEDDING_MODEL_DIMENSIONS = {
+    "gemini-embedding-001": 3072,
+    "text-embedding-004": 768,
+}
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+import numpy as np
+from pydantic import BaseModel
+
+from llm_lab.config.variables import (
+    DEFAULT_ANSWER_CACHE_MAX_ENTRIES,
+    DEFAULT_ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    DEFAULT_ANSWER_CACHE_TTL_SECONDS,
+)
+from llm_lab.vector_store.types import QueryFilter, ScoredChunk
+
+
+class CachedAnswer(BaseModel):
+    answer: str
+    chunks: list[ScoredChunk]
+
+
+class _CacheEntry:
+    def __init__(
+        self,
+        dataset: str,
+        scope: str,
+        embedding: np.ndarray,
+        cached_answer: CachedAnswer,
+        expires_at: float,
+    ) -> None:
+        self.dataset = dataset
+        self.scope = scope
+        self.embedding = embedding
+        self.cached_answer = cached_answer
+        self.expires_at = expires_at
+
+
+def _unit_vector(embedding: list[float]) -> np.ndarray | None:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if norm == 0.0:
+        return None
+    return vector / norm
+
+
+def _request_scope(top_k: int, query_filter: QueryFilter | None) -> str:
+    """Identify the request parameters besides the question that shape an answer."""
+    filter_json = "" if query_filter is None else query_filter.model_dump_json()
+    return f"{top_k}:{filter_json}"
+
+
+class SemanticAnswerCache:
+    """In-memory cache of generated answers, looked up by question similarity.
+
+    An answer is reused for a question whose embedding has a cosine similarity of at
+    least similarity_threshold with a cached question asked against the same dataset
+    and index version, with the same top_k and filter. Each dataset's entries are
+    dropped as soon as a lookup sees a different index version. Entries expire after
+    ttl_seconds and the least recently used ones are evicted beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = DEFAULT_ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        max_entries: int = DEFAULT_ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_ANSWER_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._index_versions: dict[str, str | None] = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sync_index_version(self, dataset: str, index_version: str | None) -> None:
+        """Drop a dataset's entries if they were cached for another index version."""
+        if dataset in self._index_versions and (
+            self._index_versions[dataset] != index_version
+        ):
+            self.invalidate(dataset)
+        self._index_versions[dataset] = index_version
+
+    def invalidate(self, dataset: str) -> None:
+        """Drop every cached answer of the dataset."""
+        for key in [k for k, e in self._entries.items() if e.dataset == dataset]:
+            del self._entries[key]
+
+    def lookup(
+        self,
+        dataset: str,
+        index_version: str | None,
+        query_embedding: list[float],
+        top_k: int,
+        query_filter: QueryFilter | None = None,
+    ) -> CachedAnswer | None:
+        """Return the answer of the most similar cached question, if similar enough."""
+        query = _unit_vector(query_embedding)
+        if query is None:
+            return None
+        scope = _request_scope(top_k, query_filter)
+        now = self.clock()
+        with self._lock:
+            self._sync_index_version(dataset, index_version)
+            candidates = []
+            for key, entry in list(self._entries.items()):
+                if entry.expires_at <= now:
+                    del self._entries[key]
+                elif entry.dataset == dataset and entry.scope == scope:
+                    candidates.append((key, entry))
+            if not candidates:
+                return None
+            scores = np.stack([entry.embedding for _, entry in candidates]) @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+            key, entry = candidates[best]
+            self._entries.move_to_end(key)
+            return entry.cached_answer
+
+    def store(
+        self,
+        dataset: str,
+        index_version: str | None,
+        query_embedding: list[float],
+        top_k: int,
+        query_filter: QueryFilter | None,
+        cached_answer: CachedAnswer,
+    ) -> None:
+        """Cache an answer, evicting the least recently used entries if full."""
+        embedding = _unit_vector(query_embedding)
+        if embedding is None:
+            return
+        entry = _CacheEntry(
+            dataset=dataset,
+            scope=_request_scope(top_k, query_filter),
+            embedding=embedding,
+            cached_answer=cached_answer,
+            expires_at=self.clock() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._sync_index_version(dataset, index_version)
+            self._entries[self._next_key] = entry
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
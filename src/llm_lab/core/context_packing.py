@@ -0,0 +1,116 @@
+import re
+
+from pydantic import BaseModel, Field
+
+from llm_lab.config.variables import (
+    CHARS_PER_TOKEN,
+    DEFAULT_CONTEXT_TOKEN_BUDGET,
+    MIN_TRIMMED_PASSAGE_TOKENS,
+)
+from llm_lab.llm.tokens import estimate_tokens
+from llm_lab.vector_store.types import ScoredChunk
+
+_PARAGRAPH_SEPARATOR = re.compile(r"\n\s*\n")
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"[.!?](?=\s)")
+
+
+def passage_header(scored_chunk: ScoredChunk) -> str:
+    """Header introducing a chunk in the prompt context."""
+    chunk = scored_chunk.indexed_chunk
+    return f"Source: {chunk.source} (chunk {chunk.chunk_id})"
+
+
+def format_context(passages: list[ScoredChunk]) -> str:
+    """Render passages as the context section of the prompt."""
+    return "\n\n".join(
+        f"{passage_header(sc)}\n{sc.indexed_chunk.text}" for sc in passages
+    )
+
+
+def _normalize(paragraph: str) -> str:
+    return _WHITESPACE.sub(" ", paragraph).strip().casefold()
+
+
+def _trim(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens, preferring a sentence or word boundary."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    sentence_ends = [match.end() for match in _SENTENCE_END.finditer(cut)]
+    if sentence_ends and sentence_ends[-1] > max_chars // 2:
+        return cut[: sentence_ends[-1]]
+    word_end = cut.rfind(" ")
+    return cut[:word_end] if word_end > max_chars // 2 else cut
+
+
+class PackedContext(BaseModel):
+    passages: list[ScoredChunk] = Field(
+        description="Chunks to put in the prompt, in prompt order, text possibly trimmed."
+    )
+    sources: list[ScoredChunk] = Field(
+        description="The retrieved chunks that made it into the prompt, best first."
+    )
+    token_count: int = Field(description="Estimated tokens of the packed context.")
+
+
+class ContextPacker:
+    """Fit retrieved chunks into a prompt token budget.
+
+    Chunks are taken best score first. Paragraphs already included from a better
+    chunk are dropped, so duplicated or overlapping text is only paid for once.
+    The chunk that no longer fits is trimmed to the remaining budget (unless less
+    than MIN_TRIMMED_PASSAGE_TOKENS are left) and lower scoring chunks are
+    dropped; the best chunk is always included. Passages are then ordered with the
+    best ones at the start and end of the context, where models pay the most
+    attention to them.
+    """
+
+    def __init__(self, token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET) -> None:
+        if token_budget < 1:
+            raise ValueError("token_budget must be at least 1")
+        self.token_budget = token_budget
+
+    def pack(self, chunks: list[ScoredChunk]) -> PackedContext:
+        seen_paragraphs: set[str] = set()
+        packed: list[tuple[ScoredChunk, ScoredChunk]] = []
+        remaining = self.token_budget
+        for scored_chunk in sorted(chunks, key=lambda sc: sc.score, reverse=True):
+            paragraphs = []
+            for paragraph in _PARAGRAPH_SEPARATOR.split(
+                scored_chunk.indexed_chunk.text
+            ):
+                key = _normalize(paragraph)
+                if key and key not in seen_paragraphs:
+                    seen_paragraphs.add(key)
+                    paragraphs.append(paragraph.strip())
+            if not paragraphs:
+                continue
+            # The separator between passages is counted with the header.
+            header_tokens = estimate_tokens(passage_header(scored_chunk) + "\n\n\n")
+            text = "\n\n".join(paragraphs)
+            text_budget = remaining - header_tokens
+            if estimate_tokens(text) > text_budget:
+                if packed and text_budget < MIN_TRIMMED_PASSAGE_TOKENS:
+                    break
+                text = _trim(text, max(text_budget, MIN_TRIMMED_PASSAGE_TOKENS))
+            passage = scored_chunk.model_copy(
+                update={
+                    "indexed_chunk": scored_chunk.indexed_chunk.model_copy(
+                        update={"text": text}
+                    )
+                }
+            )
+            packed.append((scored_chunk, passage))
+            remaining -= header_tokens + estimate_tokens(text)
+            if remaining < MIN_TRIMMED_PASSAGE_TOKENS:
+                break
+        passages = [passage for _, passage in packed]
+        # Best first, second best last, the weakest ones in the middle.
+        ordered = passages[0::2] + passages[1::2][::-1]
+        return PackedContext(
+            passages=ordered,
+            sources=[source for source, _ in packed],
+            token_count=estimate_tokens(format_context(ordered)),
+        )
@@ -1,8 +1,21 @@
+from functools import lru_cache
+
 from llm_lab.config.settings import VectorStoreType, get_settings
+from llm_lab.core.answer_cache import SemanticAnswerCache
+from llm_lab.llm.circuit_breaker import shared_circuit_breaker
+from llm_lab.llm.context_cache import shared_context_cache
 from llm_lab.llm.gemini_client import GeminiClient
+from llm_lab.llm.hedging import shared_hedger
+from llm_lab.llm.rate_limit import shared_token_bucket
+from llm_lab.llm.retry import RetryPolicy
 from llm_lab.llm.types import LlmClient
+from llm_lab.retrieval.embedding_batcher import EmbeddingBatcher
 from llm_lab.vector_store.file.file_store import FileStoreClient
-from llm_lab.vector_store.qdrant import QdrantStoreClient
+from llm_lab.vector_store.qdrant import (
+    QdrantCollectionConfig,
+    QdrantSearchConfig,
+    shared_qdrant_store_client,
+)
 from llm_lab.vector_store.types import VectorStoreClient
 
 
@@ -12,13 +25,89 @@ def create_llm_client() -> LlmClient:
         api_key=settings.llm_api_key,
         model=settings.llm_model,
         embedding_model=settings.llm_embedding_model,
+        retry_policy=RetryPolicy(
+            max_retries=settings.llm_max_retries,
+            initial_backoff_seconds=settings.llm_retry_initial_backoff_seconds,
+            max_backoff_seconds=settings.llm_retry_max_backoff_seconds,
+        ),
+        embed_rate_limiter=None
+        if settings.llm_embed_requests_per_second is None
+        else shared_token_bucket("embed", settings.llm_embed_requests_per_second),
+        generate_rate_limiter=None
+        if settings.llm_generate_requests_per_second is None
+        else shared_token_bucket("generate", settings.llm_generate_requests_per_second),
+        circuit_breaker=shared_circuit_breaker(
+            settings.llm_circuit_failure_threshold, settings.llm_circuit_reset_seconds
+        ),
+        hedger=shared_hedger(
+            settings.llm_hedge_percentile, settings.llm_hedge_max_outstanding
+        )
+        if settings.llm_hedge_enabled
+        else None,
+        context_cache=shared_context_cache(
+            settings.llm_context_cache_ttl_seconds,
+            settings.llm_context_cache_max_entries,
+            settings.llm_context_cache_min_tokens,
+        )
+        if settings.llm_context_cache_enabled
+        else None,
     )
 
 
+@lru_cache
+def shared_llm_client() -> LlmClient:
+    """Process-wide LLM client, so every request and the warm-up share its connections."""
+    return create_llm_client()
+
+
 def create_vector_store_client() -> VectorStoreClient:
     settings = get_settings()
     if settings.vector_store == VectorStoreType.FILE:
-        return FileStoreClient()
+        return FileStoreClient(
+            scan_workers=settings.file_store_scan_workers,
+            shard_max_chunks=settings.file_store_shard_max_chunks,
+            shard_max_bytes=settings.file_store_shard_max_bytes,
+            write_workers=settings.file_store_write_workers,
+            reload_interval_seconds=settings.file_store_reload_interval_seconds,
+        )
     elif settings.vector_store == VectorStoreType.QDRANT:
-        return QdrantStoreClient()
+        return shared_qdrant_store_client(
+            upload_batch_size=settings.qdrant_upload_batch_size,
+            upload_workers=settings.qdrant_upload_workers,
+            prefer_grpc=settings.qdrant_prefer_grpc,
+            collection_config=QdrantCollectionConfig(
+                quantization=settings.qdrant_quantization,
+                on_disk_vectors=settings.qdrant_on_disk_vectors,
+                hnsw_m=settings.qdrant_hnsw_m,
+                hnsw_ef_construct=settings.qdrant_hnsw_ef_construct,
+            ),
+            search_config=QdrantSearchConfig(
+                hnsw_ef=settings.qdrant_hnsw_ef,
+                oversampling=settings.qdrant_quantization_oversampling,
+                rescore=settings.qdrant_quantization_rescore,
+            ),
+            tenant_mode=settings.qdrant_tenant_mode,
+        )
     raise NotImplementedError(f"Unsupported vector store type: {settings.vector_store}")
+
+
+def create_answer_cache() -> SemanticAnswerCache | None:
+    settings = get_settings()
+    if not settings.answer_cache_enabled:
+        return None
+    return SemanticAnswerCache(
+        similarity_threshold=settings.answer_cache_similarity_threshold,
+        max_entries=settings.answer_cache_max_entries,
+        ttl_seconds=settings.answer_cache_ttl_seconds,
+    )
+
+
+def create_embedding_batcher() -> EmbeddingBatcher | None:
+    settings = get_settings()
+    if settings.embedding_batch_max_size == 1:
+        return None
+    return EmbeddingBatcher(
+        shared_llm_client(),
+        window_ms=settings.embedding_batch_window_ms,
+        max_batch_size=settings.embedding_batch_max_size,
+    )
@@ -2,28 +2,35 @@ import time
 
 from pydantic import BaseModel
 
+from llm_lab.core.answer_cache import CachedAnswer, SemanticAnswerCache
+from llm_lab.core.context_packing import ContextPacker, format_context
 from llm_lab.llm.types import LlmClient
-from llm_lab.observability.context import generate_ms_context_var
+from llm_lab.observability.context import (
+    answer_cache_hit_context_var,
+    context_tokens_context_var,
+    generate_ms_context_var,
+)
+from llm_lab.observability.deadline import GENERATE_STAGE, check_deadline
 from llm_lab.retrieval.retriever import Retriever
-from llm_lab.vector_store.types import ScoredChunk
+from llm_lab.vector_store.types import QueryFilter, ScoredChunk
 
 
-def build_prompt(question: str, chunks: list[ScoredChunk]) -> str:
-    """Build a prompt for the LLM based on the question and chunks."""
-    context_parts = []
-    for sc in chunks:
-        chunk = sc.indexed_chunk
-        context_parts.append(
-            f"Source: {chunk.source} (chunk {chunk.chunk_id})\n{chunk.text}"
-        )
-    context = "\n\n".join(context_parts)
+def build_prompt_prefix(passages: list[ScoredChunk]) -> str:
+    """Build the part of the prompt that doesn't depend on the question.
 
-    prompt = (
+    It comes first so the same retrieved context yields the same prompt prefix,
+    which the LLM client can cache with the provider.
+    """
+    context = format_context(passages)
+    return (
         "You are a helpful assistant. Use ONLY the context below to answer the question.\n\n"
         f"Context:\n{context}\n\n"
-        f"Question: {question}\n"
-        "Answer:"
     )
+
+
+def build_prompt(question: str, passages: list[ScoredChunk]) -> str:
+    """Build a prompt for the LLM based on the question and context passages."""
+    prompt = build_prompt_prefix(passages) + f"Question: {question}\nAnswer:"
     return prompt
 
 
@@ -37,30 +44,102 @@ class RagService:
         self,
         llm_client: LlmClient,
         retriever: Retriever,
+        answer_cache: SemanticAnswerCache | None = None,
+        context_packer: ContextPacker | None = None,
     ) -> None:
         self.llm_client = llm_client
         self.retriever = retriever
+        self.answer_cache = answer_cache
+        self.context_packer = context_packer or ContextPacker()
 
     def answer_question(
         self,
         dataset: str,
         query: str,
         top_k: int,
+        query_filter: QueryFilter | None = None,
+    ) -> QueryResult:
+        """Answer a question using a simple RAG pipeline.
+
+        With an answer cache, a previous answer to a near-identical question is
+        returned without retrieval or generation.
+        """
+        if self.answer_cache is None:
+            return self._generate_answer(dataset, query, top_k, query_filter)
+        query_embedding = self.retriever.embed_query(
+            query, self.retriever.embedding_model(dataset)
+        )
+        index_version = self.retriever.get_index_version(dataset)
+        cached = self.answer_cache.lookup(
+            dataset, index_version, query_embedding, top_k, query_filter
+        )
+        answer_cache_hit_context_var.set(cached is not None)
+        if cached is not None:
+            return QueryResult(answer=cached.answer, chunks=cached.chunks)
+        result = self._generate_answer(
+            dataset, query, top_k, query_filter, query_embedding
+        )
+        if result.chunks:
+            self.answer_cache.store(
+                dataset,
+                index_version,
+                query_embedding,
+                top_k,
+                query_filter,
+                CachedAnswer(answer=result.answer, chunks=result.chunks),
+            )
+        return result
+
+    def answer_question_across(
+        self,
+        datasets: list[str],
+        query: str,
+        top_k: int,
+        query_filter: QueryFilter | None = None,
+    ) -> QueryResult:
+        """Answer a question from the best chunks of several datasets together.
+
+        The answer cache is keyed by a single dataset's index version, so it is
+        not used here.
+        """
+        top_chunks = self.retriever.search_datasets(
+            datasets, query, top_k, query_filter
+        )
+        return self._answer_from_chunks(query, top_chunks)
+
+    def _generate_answer(
+        self,
+        dataset: str,
+        query: str,
+        top_k: int,
+        query_filter: QueryFilter | None,
+        query_embedding: list[float] | None = None,
     ) -> QueryResult:
-        """Answer a question using a simple RAG pipeline."""
+        top_chunks = self.retriever.search(
+            dataset, query, top_k, query_filter, query_embedding=query_embedding
+        )
+        return self._answer_from_chunks(query, top_chunks)
 
-        top_chunks = self.retriever.search(dataset, query, top_k)
+    def _answer_from_chunks(
+        self, query: str, top_chunks: list[ScoredChunk]
+    ) -> QueryResult:
         if not top_chunks:
             return QueryResult(
                 answer="No relevant information found to answer the question.",
                 chunks=top_chunks,
             )
-        prompt = build_prompt(query, top_chunks)
+        # Don't start a generation whose answer the client will no longer wait for.
+        check_deadline(GENERATE_STAGE)
+        context = self.context_packer.pack(top_chunks)
+        context_tokens_context_var.set(context.token_count)
+        prompt = build_prompt(query, context.passages)
         start_time = time.perf_counter()
-        response = self.llm_client.generate_response(prompt)
+        response = self.llm_client.generate_response(
+            prompt, cacheable_prefix=build_prompt_prefix(context.passages)
+        )
         generate_ms = round(((time.perf_counter() - start_time) * 1000), 3)
         generate_ms_context_var.set(generate_ms)
         return QueryResult(
             answer=response,
-            chunks=top_chunks,
+            chunks=context.sources,
         )
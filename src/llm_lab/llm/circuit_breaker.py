@@ -0,0 +1,105 @@
+import enum
+import threading
+import time
+from collections.abc import Callable
+from functools import lru_cache
+
+from llm_lab.config.variables import (
+    DEFAULT_LLM_CIRCUIT_FAILURE_THRESHOLD,
+    DEFAULT_LLM_CIRCUIT_RESET_SECONDS,
+)
+from llm_lab.llm.errors import LlmUnavailableError
+from llm_lab.observability.metrics import (
+    llm_circuit_rejections_counter,
+    llm_circuit_state_gauge,
+)
+
+
+class CircuitState(enum.IntEnum):
+    """Circuit breaker states, valued as exported by the state gauge."""
+
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker:
+    """Fail fast while the LLM provider is degraded.
+
+    The circuit opens after failure_threshold consecutive failures. While open,
+    calls are rejected with LlmUnavailableError. After reset_seconds a single
+    probe call is let through (half-open); its success closes the circuit and its
+    failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_LLM_CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = DEFAULT_LLM_CIRCUIT_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def _set_state(self, state: CircuitState) -> None:
+        self._state = state
+        llm_circuit_state_gauge.set(state)
+
+    def before_call(self) -> None:
+        """Raise LlmUnavailableError if the call must not be sent."""
+        with self._lock:
+            if (
+                self._state == CircuitState.OPEN
+                and self.clock() - self._opened_at >= self.reset_seconds
+            ):
+                self._set_state(CircuitState.HALF_OPEN)
+            if self._state == CircuitState.CLOSED:
+                return
+            if self._state == CircuitState.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        llm_circuit_rejections_counter.inc()
+        raise LlmUnavailableError(
+            "LLM service is unavailable, not sending requests until it recovers"
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            if self._state != CircuitState.CLOSED:
+                self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            probe_failed = self._state == CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+            if probe_failed or self._consecutive_failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+                self._set_state(CircuitState.OPEN)
+
+    def record_ignored(self) -> None:
+        """Release a probe whose outcome says nothing about the provider's health."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+@lru_cache
+def shared_circuit_breaker(
+    failure_threshold: int, reset_seconds: float
+) -> CircuitBreaker:
+    """Process-wide breaker, shared by every client using the same settings."""
+    return CircuitBreaker(failure_threshold, reset_seconds)
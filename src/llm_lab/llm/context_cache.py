@@ -0,0 +1,144 @@
+import contextlib
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
+
+from llm_lab.config.variables import (
+    CONTEXT_CACHE_EXPIRY_MARGIN_SECONDS,
+    CONTEXT_CACHE_MIN_SIGHTINGS,
+    DEFAULT_LLM_CONTEXT_CACHE_MAX_ENTRIES,
+    DEFAULT_LLM_CONTEXT_CACHE_MIN_TOKENS,
+    DEFAULT_LLM_CONTEXT_CACHE_TTL_SECONDS,
+)
+from llm_lab.llm.tokens import estimate_tokens
+from llm_lab.observability.metrics import (
+    llm_context_cache_created_counter,
+    llm_context_cache_hits_counter,
+)
+
+
+class _CacheEntry:
+    def __init__(self) -> None:
+        self.sightings = 0
+        self.creating = False
+        # Provider handle of the cached prefix, None until it is registered.
+        self.name: str | None = None
+        self.expires_at = 0.0
+
+
+class ContextCacheRegistry:
+    """Local LRU of provider-side cached prompt prefixes.
+
+    A prefix is registered with the provider (via the create callback) once it
+    has been seen CONTEXT_CACHE_MIN_SIGHTINGS times, so one-off prompts don't pay
+    for cache storage, and its handle is then reused until it expires. Prefixes
+    shorter than min_tokens are never registered, since providers refuse to cache
+    them. Handles evicted from the LRU are deleted from the provider.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_LLM_CONTEXT_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_LLM_CONTEXT_CACHE_MAX_ENTRIES,
+        min_tokens: int = DEFAULT_LLM_CONTEXT_CACHE_MIN_TOKENS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.min_tokens = min_tokens
+        self.clock = clock
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(model: str, prefix: str) -> str:
+        return hashlib.sha256(f"{model}\0{prefix}".encode()).hexdigest()
+
+    def handle_for(
+        self,
+        model: str,
+        prefix: str,
+        create: Callable[[int], str],
+        delete: Callable[[str], object],
+    ) -> str | None:
+        """Return the handle of the cached prefix, registering it once it is hot.
+
+        create is called with the TTL in seconds and returns the new handle;
+        delete removes an evicted handle from the provider. Returns None when the
+        prefix is not (yet) cached.
+        """
+        if estimate_tokens(prefix) < self.min_tokens:
+            return None
+        key = self._key(model, prefix)
+        with self._lock:
+            entry = self._entries.pop(key, None) or _CacheEntry()
+            self._entries[key] = entry
+            if entry.name is not None and entry.expires_at > self.clock():
+                llm_context_cache_hits_counter.inc()
+                return entry.name
+            entry.name = None
+            entry.sightings += 1
+            # Concurrent callers send the full prompt until the handle exists.
+            register = (
+                not entry.creating and entry.sightings >= CONTEXT_CACHE_MIN_SIGHTINGS
+            )
+            entry.creating = entry.creating or register
+            evicted = self._evict()
+        self._delete_all(evicted, delete)
+        if not register:
+            return None
+        ttl_seconds = int(self.ttl_seconds)
+        try:
+            name = create(ttl_seconds)
+        finally:
+            with self._lock:
+                entry.creating = False
+                entry.sightings = 0
+        llm_context_cache_created_counter.inc()
+        with self._lock:
+            if self._entries.get(key) is entry:
+                entry.name = name
+                # Stop using the handle shortly before the provider expires it.
+                entry.expires_at = (
+                    self.clock() + ttl_seconds - CONTEXT_CACHE_EXPIRY_MARGIN_SECONDS
+                )
+                return name
+        # Evicted while it was being created.
+        self._delete_all([name], delete)
+        return None
+
+    def invalidate(self, model: str, prefix: str) -> None:
+        """Forget the handle of prefix, e.g. after the provider rejected it."""
+        with self._lock:
+            self._entries.pop(self._key(model, prefix), None)
+
+    def _evict(self) -> list[str]:
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            _, entry = self._entries.popitem(last=False)
+            if entry.name is not None:
+                evicted.append(entry.name)
+        return evicted
+
+    @staticmethod
+    def _delete_all(names: list[str], delete: Callable[[str], object]) -> None:
+        for name in names:
+            # The handle expires on its own; deleting it only frees storage early.
+            with contextlib.suppress(Exception):
+                delete(name)
+
+
+@lru_cache
+def shared_context_cache(
+    ttl_seconds: float, max_entries: int, min_tokens: int
+) -> ContextCacheRegistry:
+    """Process-wide registry, shared by every client using the same settings."""
+    return ContextCacheRegistry(ttl_seconds, max_entries, min_tokens)
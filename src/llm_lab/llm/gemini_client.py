@@ -1,9 +1,14 @@
+import math
+import time
 import typing
+from collections.abc import Callable
 
 from google import genai
 from google.genai import types
-from google.genai.errors import ClientError
+from google.genai.errors import APIError
 
+from llm_lab.llm.circuit_breaker import CircuitBreaker
+from llm_lab.llm.context_cache import ContextCacheRegistry
 from llm_lab.llm.errors import (
     LlmAuthenticationError,
     LlmError,
@@ -11,11 +16,25 @@ from llm_lab.llm.errors import (
     LlmRateLimitError,
     LlmUnavailableError,
 )
+from llm_lab.llm.hedging import Hedger
+from llm_lab.llm.rate_limit import TokenBucket
+from llm_lab.llm.retry import RetryPolicy, retry_after_seconds
 from llm_lab.llm.types import LlmClient
+from llm_lab.observability.deadline import (
+    EMBED_STAGE,
+    GENERATE_STAGE,
+    DeadlineExceededError,
+    check_deadline,
+    deadline_exceeded,
+    is_expired,
+    remaining_seconds,
+)
+
+RETRIABLE_ERRORS = (LlmRateLimitError, LlmUnavailableError)
 
 
-def _map_gemini_error(err: ClientError) -> LlmError:
-    """Map Google Gemini ClientError to custom LlmError."""
+def _map_gemini_error(err: APIError) -> LlmError:
+    """Map Google Gemini APIError to custom LlmError."""
     error_code = int(err.code)
     if error_code == 400:
         return LlmInvalidRequestError(str(err))
@@ -29,41 +48,255 @@ def _map_gemini_error(err: ClientError) -> LlmError:
         return LlmError(str(err))
 
 
+def _deadline_http_options(stage: str) -> types.HttpOptions | None:
+    """HTTP options that abort the request when the request deadline passes."""
+    remaining = check_deadline(stage)
+    if remaining is None:
+        return None
+    return types.HttpOptions(timeout=max(1, math.ceil(remaining * 1000)))
+
+
+def _record_breaker_outcome(breaker: CircuitBreaker, err: LlmError) -> None:
+    """Count server errors against the circuit; other errors prove the service is up."""
+    if isinstance(err, LlmUnavailableError):
+        breaker.record_failure()
+    elif isinstance(err, LlmRateLimitError):
+        breaker.record_ignored()
+    else:
+        breaker.record_success()
+
+
 class GeminiClient(LlmClient):
     """Client for interacting with Google Gemini LLM."""
 
-    def __init__(self, api_key: str, model: str, embedding_model: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        embedding_model: str,
+        retry_policy: RetryPolicy | None = None,
+        embed_rate_limiter: TokenBucket | None = None,
+        generate_rate_limiter: TokenBucket | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        hedger: Hedger | None = None,
+        context_cache: ContextCacheRegistry | None = None,
+    ) -> None:
         self.client = genai.Client(api_key=api_key)
         self.model = model
         self.embedding_model = embedding_model
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.embed_rate_limiter = embed_rate_limiter
+        self.generate_rate_limiter = generate_rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.hedger = hedger
+        self.context_cache = context_cache
+
+    def _send[T](
+        self,
+        rate_limiter: TokenBucket | None,
+        request: Callable[[types.HttpOptions | None], T],
+        stage: str,
+        hedge: bool,
+    ) -> T:
+        def paced_request() -> T:
+            if rate_limiter is not None:
+                rate_limiter.acquire(stage)
+            return request(_deadline_http_options(stage))
+
+        if hedge and self.hedger is not None:
+            return self.hedger.call(paced_request)
+        return paced_request()
+
+    def _attempt[T](
+        self,
+        rate_limiter: TokenBucket | None,
+        request: Callable[[types.HttpOptions | None], T],
+        stage: str,
+        hedge: bool,
+    ) -> T:
+        """Send one attempt, recording its outcome on the circuit breaker."""
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return self._send(rate_limiter, request, stage, hedge)
+        breaker.before_call()
+        try:
+            result = self._send(rate_limiter, request, stage, hedge)
+        except APIError as err:
+            _record_breaker_outcome(breaker, _map_gemini_error(err))
+            raise
+        except Exception as err:
+            # Running out of the request budget says nothing about the provider.
+            if isinstance(err, DeadlineExceededError) or is_expired():
+                breaker.record_ignored()
+            else:
+                breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
+
+    def _call[T](
+        self,
+        rate_limiter: TokenBucket | None,
+        request: Callable[[types.HttpOptions | None], T],
+        stage: str,
+        hedge: bool = False,
+    ) -> T:
+        """Send a request, pacing it with rate_limiter and retrying transient errors.
+
+        Rate limit and server errors are retried with backoff, honoring the server's
+        retry hint; other errors and the last failed attempt are raised as LlmError.
+        While the circuit breaker is open, calls fail fast with LlmUnavailableError.
+        Each attempt is given the remaining request budget as its HTTP timeout; when
+        the budget runs out, DeadlineExceededError is raised for stage.
+        """
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(rate_limiter, request, stage, hedge)
+            except APIError as err:
+                mapped = _map_gemini_error(err)
+                if (
+                    not isinstance(mapped, RETRIABLE_ERRORS)
+                    or attempt >= self.retry_policy.max_retries
+                ):
+                    raise mapped from err
+                retry_after = retry_after_seconds(
+                    getattr(err.response, "headers", None), err.details
+                )
+                backoff = self.retry_policy.backoff_seconds(attempt, retry_after)
+                remaining = remaining_seconds()
+                if remaining is not None and backoff >= remaining:
+                    raise deadline_exceeded(stage) from err
+                time.sleep(backoff)
+                attempt += 1
+            except DeadlineExceededError:
+                raise
+            except Exception as err:
+                if is_expired():
+                    # The HTTP timeout derived from the deadline fired.
+                    raise deadline_exceeded(stage) from err
+                raise
 
     def embed_text(self, text: str, embedding_model: str | None = None) -> list[float]:
         """Embed the given text. If embedding_model is provided, use that; otherwise use the client's default"""
-        try:
-            embedding = self.client.models.embed_content(
+        embedding = self._call(
+            self.embed_rate_limiter,
+            lambda http_options: self.client.models.embed_content(
                 model=embedding_model or self.embedding_model,
                 contents=text,
-                config=types.EmbedContentConfig(task_type="SEMANTIC_SIMILARITY"),
-            )
-            embedding_value = embedding.embeddings[0].values
-        except ClientError as err:
-            raise _map_gemini_error(err) from err
+                config=types.EmbedContentConfig(
+                    task_type="SEMANTIC_SIMILARITY", http_options=http_options
+                ),
+            ),
+            EMBED_STAGE,
+        )
+        embedding_value = (
+            embedding.embeddings[0].values if embedding.embeddings else None
+        )
         if embedding_value is None:
             raise LlmError("Received empty embedding from Gemini")
         else:
-            return typing.cast(list[float], embedding_value)
+            return embedding_value
 
-    def generate_response(self, prompt: str, model: str | None = None) -> str:
-        """Generate a response for the given prompt. If model is provided, use that; otherwise use the client's default"""
+    def embed_texts(
+        self, texts: list[str], embedding_model: str | None = None
+    ) -> list[list[float]]:
+        """Embed several texts in one request, returning one vector per text in order."""
+        response = self._call(
+            self.embed_rate_limiter,
+            lambda http_options: self.client.models.embed_content(
+                model=embedding_model or self.embedding_model,
+                contents=texts,
+                config=types.EmbedContentConfig(
+                    task_type="SEMANTIC_SIMILARITY", http_options=http_options
+                ),
+            ),
+            EMBED_STAGE,
+        )
+        embeddings = [embedding.values for embedding in response.embeddings or []]
+        if len(embeddings) != len(texts) or any(e is None for e in embeddings):
+            raise LlmError(
+                f"Received {len(embeddings)} embeddings from Gemini for {len(texts)} texts"
+            )
+        return typing.cast(list[list[float]], embeddings)
+
+    def _create_cached_prefix(self, model: str, prefix: str, ttl_seconds: int) -> str:
+        cached_content = self._call(
+            self.generate_rate_limiter,
+            lambda http_options: self.client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    contents=[types.UserContent(parts=[types.Part(text=prefix)])],
+                    ttl=f"{ttl_seconds}s",
+                    http_options=http_options,
+                ),
+            ),
+            GENERATE_STAGE,
+        )
+        if cached_content.name is None:
+            raise LlmError("Received cached content without a name from Gemini")
+        return cached_content.name
+
+    def _cached_prefix_handle(
+        self, context_cache: ContextCacheRegistry, model: str, prefix: str
+    ) -> str | None:
+        """Handle of prefix in Gemini's context cache, None to send it in full."""
         try:
-            response = self.client.models.generate_content(
-                model=model or self.model,
-                contents=prompt,
+            return context_cache.handle_for(
+                model,
+                prefix,
+                create=lambda ttl: self._create_cached_prefix(model, prefix, ttl),
+                delete=lambda name: self.client.caches.delete(name=name),
             )
-            response_text = response.text
-        except ClientError as err:
-            raise _map_gemini_error(err) from err
+        except LlmError:
+            # Caching is an optimization, the prompt can always be sent in full.
+            return None
+
+    def _generate(
+        self, model: str, contents: str, cached_content: str | None = None
+    ) -> str:
+        response = self._call(
+            self.generate_rate_limiter,
+            lambda http_options: self.client.models.generate_content(
+                model=model,
+                contents=contents,
+                config=types.GenerateContentConfig(
+                    cached_content=cached_content, http_options=http_options
+                ),
+            ),
+            GENERATE_STAGE,
+            hedge=True,
+        )
+        response_text = response.text
         if response_text is None:
             raise LlmError("Received empty response from Gemini")
         else:
             return typing.cast(str, response_text)
+
+    def generate_response(
+        self, prompt: str, model: str | None = None, cacheable_prefix: str | None = None
+    ) -> str:
+        """Generate a response for the given prompt. If model is provided, use that; otherwise use the client's default
+
+        With a context cache, a cacheable_prefix sent repeatedly is registered
+        with Gemini's context cache and only the rest of the prompt is sent.
+        """
+        model = model or self.model
+        context_cache = self.context_cache
+        if (
+            context_cache is not None
+            and cacheable_prefix
+            and prompt.startswith(cacheable_prefix)
+        ):
+            handle = self._cached_prefix_handle(context_cache, model, cacheable_prefix)
+            if handle is not None:
+                try:
+                    return self._generate(
+                        model, prompt[len(cacheable_prefix) :], handle
+                    )
+                except LlmError as err:
+                    if isinstance(err, RETRIABLE_ERRORS):
+                        raise
+                    # Most likely the cached content expired provider-side.
+                    context_cache.invalidate(model, cacheable_prefix)
+        return self._generate(model, prompt)
@@ -0,0 +1,128 @@
+import contextvars
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any
+
+from llm_lab.config.variables import (
+    DEFAULT_LLM_HEDGE_MAX_OUTSTANDING,
+    DEFAULT_LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_LATENCY_WINDOW,
+    LLM_HEDGE_MIN_SAMPLES,
+)
+from llm_lab.observability.metrics import (
+    llm_hedge_wins_counter,
+    llm_hedged_requests_counter,
+    llm_hedges_in_flight_gauge,
+)
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(
+        self,
+        window: int = LLM_HEDGE_LATENCY_WINDOW,
+        min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+    ) -> None:
+        self.min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, percentile: int) -> float | None:
+        """Latency below which percentile% of recent calls finished.
+
+        Returns None until min_samples latencies were recorded.
+        """
+        with self._lock:
+            latencies = list(self._latencies)
+        if len(latencies) < max(self.min_samples, 2):
+            return None
+        return statistics.quantiles(latencies, n=100)[percentile - 1]
+
+
+class Hedger:
+    """Send a duplicate of a slow call and return whichever finishes first.
+
+    A call still running after the percentile latency of recent calls is sent a
+    second time; at most max_outstanding duplicates run at once, beyond which
+    calls simply wait for the original. The losing call is left to finish in the
+    background since an in-flight HTTP request cannot be cancelled.
+    """
+
+    def __init__(
+        self,
+        percentile: int = DEFAULT_LLM_HEDGE_PERCENTILE,
+        max_outstanding: int = DEFAULT_LLM_HEDGE_MAX_OUTSTANDING,
+        latency_tracker: LatencyTracker | None = None,
+    ) -> None:
+        if not 1 <= percentile <= 99:
+            raise ValueError("percentile must be between 1 and 99")
+        self.percentile = percentile
+        self.latency_tracker = latency_tracker or LatencyTracker()
+        self._hedge_slots = threading.BoundedSemaphore(max_outstanding)
+        # Each hedged call occupies a thread for the original and one for the duplicate.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_outstanding * 2, thread_name_prefix="llm-hedge"
+        )
+
+    def _submit[T](self, request: Callable[[], T]) -> Future[T]:
+        # Run in a copy of the caller's context so the request deadline applies.
+        ctx = contextvars.copy_context()
+        return self._executor.submit(ctx.run, self._timed, request)
+
+    def _timed[T](self, request: Callable[[], T]) -> T:
+        start = time.perf_counter()
+        result = request()
+        self.latency_tracker.record(time.perf_counter() - start)
+        return result
+
+    def _release_slot(self, _: Future[Any]) -> None:
+        llm_hedges_in_flight_gauge.dec()
+        self._hedge_slots.release()
+
+    def call[T](self, request: Callable[[], T]) -> T:
+        """Run request, hedging it if it is slower than the hedge delay."""
+        delay = self.latency_tracker.percentile(self.percentile)
+        if delay is None or not self._hedge_slots.acquire(blocking=False):
+            return self._timed(request)
+        try:
+            original = self._submit(request)
+        except BaseException:
+            self._hedge_slots.release()
+            raise
+        done, _ = wait([original], timeout=delay)
+        if done:
+            self._hedge_slots.release()
+            return original.result()
+        llm_hedged_requests_counter.inc()
+        llm_hedges_in_flight_gauge.inc()
+        hedge = self._submit(request)
+        # Free the slot once both the original and the duplicate have finished.
+        hedge.add_done_callback(
+            lambda _: original.add_done_callback(self._release_slot)
+        )
+        pending = {original, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        llm_hedge_wins_counter.inc()
+                    return future.result()
+            if not pending:
+                return original.result()
+
+
+@lru_cache
+def shared_hedger(percentile: int, max_outstanding: int) -> Hedger:
+    """Process-wide hedger, so latencies and the outstanding cap span all clients."""
+    return Hedger(percentile, max_outstanding)
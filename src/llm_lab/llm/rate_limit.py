@@ -0,0 +1,71 @@
+import threading
+import time
+from collections.abc import Callable
+from functools import lru_cache
+
+from llm_lab.observability.deadline import deadline_exceeded, remaining_seconds
+
+
+class TokenBucket:
+    """Thread-safe token bucket pacing requests to a sustained rate.
+
+    Tokens refill continuously at rate_per_second up to capacity, allowing short
+    bursts of at most capacity requests. acquire blocks until a token is available,
+    unless that would outlast the request deadline.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_second)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens, possibly going into debt, and return how long to wait."""
+        with self._lock:
+            now = self.clock()
+            elapsed = now - self._updated_at
+            self._tokens = min(
+                self.capacity, self._tokens + elapsed * self.rate_per_second
+            )
+            self._updated_at = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+    def _refund(self, tokens: float) -> None:
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def acquire(self, stage: str, tokens: float = 1.0) -> None:
+        """Block until tokens are available, then consume them.
+
+        If they would only be available after the request deadline, they are given
+        back and DeadlineExceededError is raised for stage instead of waiting.
+        """
+        wait_seconds = self._reserve(tokens)
+        if wait_seconds <= 0:
+            return
+        remaining = remaining_seconds()
+        if remaining is not None and wait_seconds >= remaining:
+            self._refund(tokens)
+            raise deadline_exceeded(stage)
+        self.sleep(wait_seconds)
+
+
+@lru_cache
+def shared_token_bucket(name: str, rate_per_second: float) -> TokenBucket:
+    """Process-wide bucket for name, shared by every client using the same limit."""
+    return TokenBucket(rate_per_second)
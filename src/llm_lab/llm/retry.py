@@ -0,0 +1,71 @@
+import random
+import re
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from llm_lab.config.variables import (
+    DEFAULT_LLM_MAX_RETRIES,
+    DEFAULT_LLM_RETRY_INITIAL_BACKOFF_SECONDS,
+    DEFAULT_LLM_RETRY_MAX_BACKOFF_SECONDS,
+)
+
+_RETRY_INFO_TYPE = "type.googleapis.com/google.rpc.RetryInfo"
+_DURATION_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)s$")
+
+
+class RetryPolicy(BaseModel):
+    """Exponential backoff with full jitter for retriable LLM failures."""
+
+    max_retries: int = Field(default=DEFAULT_LLM_MAX_RETRIES, ge=0)
+    initial_backoff_seconds: float = Field(
+        default=DEFAULT_LLM_RETRY_INITIAL_BACKOFF_SECONDS, gt=0
+    )
+    max_backoff_seconds: float = Field(
+        default=DEFAULT_LLM_RETRY_MAX_BACKOFF_SECONDS, gt=0
+    )
+    multiplier: float = Field(default=2.0, ge=1.0)
+
+    def backoff_seconds(self, attempt: int, retry_after: float | None = None) -> float:
+        """Delay before retry number attempt (0-based).
+
+        A server hint takes precedence, capped at max_backoff_seconds; otherwise a
+        random delay up to the exponential backoff is used.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff_seconds)
+        ceiling = min(
+            self.max_backoff_seconds,
+            self.initial_backoff_seconds * self.multiplier**attempt,
+        )
+        return random.uniform(0, ceiling)
+
+
+def _parse_duration(value: Any) -> float | None:
+    if isinstance(value, int | float):
+        return float(value)
+    if isinstance(value, str):
+        match = _DURATION_PATTERN.match(value.strip())
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def retry_after_seconds(headers: Any, details: Any) -> float | None:
+    """Extract the server's retry hint from a Retry-After header or RetryInfo detail.
+
+    Only delays in seconds are understood; HTTP dates in Retry-After are ignored.
+    """
+    if headers is not None:
+        header = headers.get("retry-after")
+        if header is not None:
+            try:
+                return float(header)
+            except ValueError:
+                pass
+    if isinstance(details, dict):
+        error = details.get("error", details)
+        for detail in error.get("details", []) if isinstance(error, dict) else []:
+            if isinstance(detail, dict) and detail.get("@type") == _RETRY_INFO_TYPE:
+                return _parse_duration(detail.get("retryDelay"))
+    return None
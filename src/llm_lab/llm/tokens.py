@@ -0,0 +1,8 @@
+import math
+
+from llm_lab.config.variables import CHARS_PER_TOKEN
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in text without calling a tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -8,6 +8,18 @@ class LlmClient(Protocol):
         """Embed the given text. If embedding_model is provided, use that; otherwise use the client’s default"""
         ...
 
-    def generate_response(self, prompt: str, model: str | None = None) -> str:
-        """Generate a response for the given prompt. If model is provided, use that; otherwise use the client’s default"""
+    def embed_texts(
+        self, texts: list[str], embedding_model: str | None = None
+    ) -> list[list[float]]:
+        """Embed several texts in one request, returning one vector per text in order."""
+        ...
+
+    def generate_response(
+        self, prompt: str, model: str | None = None, cacheable_prefix: str | None = None
+    ) -> str:
+        """Generate a response for the given prompt. If model is provided, use that; otherwise use the client’s default
+
+        cacheable_prefix is a leading part of prompt likely to be sent again, which
+        clients may cache with the provider.
+        """
         ...
@@ -5,7 +5,9 @@ from typing import Annotated
 import typer
 
 from llm_lab.config.paths import DEFAULT_DOCS_DIR
-from llm_lab.config.settings import get_settings
+from llm_lab.config.settings import QdrantTenantMode, get_settings
+from llm_lab.config.variables import DEFAULT_NEAR_DUPLICATE_THRESHOLD
+from llm_lab.core.context_packing import ContextPacker
 from llm_lab.core.factories import create_llm_client, create_vector_store_client
 from llm_lab.core.rag_service import RagService
 from llm_lab.llm.errors import (
@@ -17,13 +19,31 @@ from llm_lab.llm.errors import (
 )
 from llm_lab.retrieval.indexing import Indexer
 from llm_lab.retrieval.retriever import Retriever
-from llm_lab.retrieval.types import ChunkingConfig
+from llm_lab.retrieval.types import ChunkingConfig, DeduplicationConfig, IndexingStats
+from llm_lab.vector_store.qdrant import QdrantStoreClient
 
 app = typer.Typer()
 
 DEFAULT_MAX_CHUNKS_PER_FILE = 1000
 
 
+def format_indexing_stats(stats: IndexingStats) -> list[str]:
+    """Summarize what was indexed and what deduplication saved."""
+    lines = [
+        f"Indexed {stats.embedded_chunks} of {stats.chunks_count} chunks "
+        f"from {stats.docs_count} documents"
+    ]
+    skipped = stats.exact_duplicates + stats.near_duplicates
+    if skipped:
+        lines.append(
+            f"Skipped {stats.exact_duplicates} exact and {stats.near_duplicates} "
+            f"near duplicate chunks: {skipped / stats.chunks_count:.1%} fewer "
+            f"embeddings and stored chunks, {stats.skipped_chars} characters "
+            "not embedded"
+        )
+    return lines
+
+
 def take_user_input() -> str:
     try:
         user_input = input("Enter the question:\n").strip()
@@ -44,6 +64,22 @@ def index(
     chunk_separator: Annotated[
         str, typer.Option(help="Chunk separator string")
     ] = "\n\n",
+    dedup: Annotated[
+        bool,
+        typer.Option(
+            help="Index exactly duplicated chunks once, with alternate sources"
+        ),
+    ] = True,
+    near_dedup: Annotated[
+        bool,
+        typer.Option(
+            help="Also index near-duplicate chunks only once, though their text differs"
+        ),
+    ] = False,
+    near_duplicate_threshold: Annotated[
+        float,
+        typer.Option(help="SimHash similarity from which chunks are near duplicates"),
+    ] = DEFAULT_NEAR_DUPLICATE_THRESHOLD,
 ) -> None:
     typer.echo(f"Indexing dataset '{dataset}' from {source_dir}")
     settings = get_settings()
@@ -53,13 +89,57 @@ def index(
         chunk_separator=chunk_separator,
     )
     indexer = Indexer(
-        source_dir, settings.llm_embedding_model, dataset, chunking_config
+        source_dir,
+        settings.llm_embedding_model,
+        dataset,
+        chunking_config,
+        DeduplicationConfig(
+            near_duplicates=near_dedup,
+            near_duplicate_threshold=near_duplicate_threshold,
+        )
+        if dedup
+        else None,
     )
     indexed_chunks, docs_count = indexer.run(llm_client)
     vector_store_client = create_vector_store_client()
     vector_store_client.store(
         indexed_chunks, dataset, settings.llm_embedding_model, docs_count
     )
+    for line in format_indexing_stats(indexer.stats):
+        typer.echo(line)
+
+
+@app.command()
+def migrate_qdrant(
+    source_mode: Annotated[
+        QdrantTenantMode, typer.Option(help="Tenant layout the data is stored in now")
+    ],
+    dataset: Annotated[
+        list[str] | None,
+        typer.Option(help="Dataset to migrate, repeatable (default: all)"),
+    ] = None,
+    delete_source: Annotated[
+        bool, typer.Option(help="Delete migrated data from the source layout")
+    ] = False,
+) -> None:
+    settings = get_settings()
+    vector_store_client = create_vector_store_client()
+    if not isinstance(vector_store_client, QdrantStoreClient):
+        raise ValueError("migrate-qdrant requires VECTOR_STORE=qdrant")
+    typer.echo(
+        f"Migrating {settings.llm_embedding_model} from the {source_mode} layout "
+        f"to the {settings.qdrant_tenant_mode} layout"
+    )
+    migrated = vector_store_client.migrate(
+        settings.llm_embedding_model,
+        source_mode,
+        datasets=dataset,
+        delete_source=delete_source,
+        progress_callback=lambda name, uploaded: typer.echo(
+            f"  {name}: {uploaded} points"
+        ),
+    )
+    typer.echo(f"Migrated {len(migrated)} dataset(s)")
 
 
 @app.command()
@@ -67,9 +147,18 @@ def query(
     dataset: Annotated[str, typer.Option(help="Dataset to query")],
 ) -> None:
     typer.echo("Loading the index...")
+    settings = get_settings()
     llm_client = create_llm_client()
-    retriever = Retriever(llm_client, create_vector_store_client())
-    rag_service = RagService(llm_client, retriever)
+    retriever = Retriever(
+        llm_client,
+        create_vector_store_client(),
+        default_embedding_model=settings.llm_embedding_model,
+    )
+    rag_service = RagService(
+        llm_client,
+        retriever,
+        context_packer=ContextPacker(settings.context_token_budget),
+    )
     query_text = take_user_input()
     result = rag_service.answer_question(
         dataset=dataset,
@@ -10,9 +10,37 @@ embed_ms_context_var: ContextVar[float | None] = ContextVar("embed_ms", default=
 retrieve_ms_context_var: ContextVar[float | None] = ContextVar(
     "retrieve_ms", default=None
 )
+# Retrieval time of each dataset of a query across several datasets.
+dataset_retrieve_ms_context_var: ContextVar[dict[str, float] | None] = ContextVar(
+    "dataset_retrieve_ms", default=None
+)
 generate_ms_context_var: ContextVar[float | None] = ContextVar(
     "generate_ms", default=None
 )
 chunks_return_context_var: ContextVar[int | None] = ContextVar(
     "chunks_returned", default=None
 )
+answer_cache_hit_context_var: ContextVar[bool | None] = ContextVar(
+    "answer_cache_hit", default=None
+)
+response_cache_hit_context_var: ContextVar[bool | None] = ContextVar(
+    "response_cache_hit", default=None
+)
+request_coalesced_context_var: ContextVar[bool | None] = ContextVar(
+    "request_coalesced", default=None
+)
+# Absolute time.monotonic() deadline of the current request, None when unbounded.
+deadline_context_var: ContextVar[float | None] = ContextVar("deadline", default=None)
+timeout_stage_context_var: ContextVar[str | None] = ContextVar(
+    "timeout_stage", default=None
+)
+admission_wait_ms_context_var: ContextVar[float | None] = ContextVar(
+    "admission_wait_ms", default=None
+)
+# Number of requests already queued for admission when the request arrived.
+admission_queue_depth_context_var: ContextVar[int | None] = ContextVar(
+    "admission_queue_depth", default=None
+)
+context_tokens_context_var: ContextVar[int | None] = ContextVar(
+    "context_tokens", default=None
+)
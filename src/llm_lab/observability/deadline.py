@@ -0,0 +1,87 @@
+import contextlib
+import contextvars
+import time
+from collections.abc import Callable, Iterator
+
+from llm_lab.observability.context import (
+    deadline_context_var,
+    timeout_stage_context_var,
+)
+
+# Query pipeline stages, as reported when one of them overruns the deadline.
+EMBED_STAGE = "embed"
+RETRIEVE_STAGE = "retrieve"
+GENERATE_STAGE = "generate"
+# Waiting for an identical request already being answered.
+COALESCE_STAGE = "coalesce"
+# Waiting for an admission slot.
+ADMISSION_STAGE = "admission"
+
+
+class DeadlineExceededError(Exception):
+    """Error raised when a request runs out of its time budget."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"Request deadline exceeded during {stage}")
+        self.stage = stage
+
+
+@contextlib.contextmanager
+def deadline(timeout_seconds: float | None) -> Iterator[None]:
+    """Bound the work done in this context to timeout_seconds.
+
+    A deadline already set by an outer context is only ever shortened, never
+    extended. With timeout_seconds None the outer deadline (if any) applies.
+    """
+    current = deadline_context_var.get()
+    if timeout_seconds is not None:
+        new_deadline = time.monotonic() + timeout_seconds
+        current = new_deadline if current is None else min(current, new_deadline)
+    token = deadline_context_var.set(current)
+    try:
+        yield
+    finally:
+        deadline_context_var.reset(token)
+
+
+def current_deadline() -> float | None:
+    """Absolute time.monotonic() deadline of the current context, None when unbounded."""
+    return deadline_context_var.get()
+
+
+def run_with_deadline[T](deadline_at: float | None, func: Callable[[], T]) -> T:
+    """Run func in a copy of the current context, bounded by deadline_at instead.
+
+    For work shared by several requests, which the deadline of the one that
+    happens to run it must not cut short for the others.
+    """
+    context = contextvars.copy_context()
+    context.run(deadline_context_var.set, deadline_at)
+    return context.run(func)
+
+
+def remaining_seconds() -> float | None:
+    """Seconds left before the current deadline, None when there is none."""
+    current = deadline_context_var.get()
+    if current is None:
+        return None
+    return max(current - time.monotonic(), 0.0)
+
+
+def deadline_exceeded(stage: str) -> DeadlineExceededError:
+    """Record stage as the one that overran and return the error to raise."""
+    timeout_stage_context_var.set(stage)
+    return DeadlineExceededError(stage)
+
+
+def check_deadline(stage: str) -> float | None:
+    """Return the remaining budget, raising DeadlineExceededError if it is spent."""
+    remaining = remaining_seconds()
+    if remaining is not None and remaining <= 0:
+        raise deadline_exceeded(stage)
+    return remaining
+
+
+def is_expired() -> bool:
+    remaining = remaining_seconds()
+    return remaining is not None and remaining <= 0
@@ -8,13 +8,21 @@ from datetime import UTC, datetime
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from llm_lab.observability.context import (
+    admission_queue_depth_context_var,
+    admission_wait_ms_context_var,
+    answer_cache_hit_context_var,
     candidate_k_context_var,
     chunks_return_context_var,
+    context_tokens_context_var,
     dataset_context_var,
+    dataset_retrieve_ms_context_var,
     embed_ms_context_var,
     generate_ms_context_var,
+    request_coalesced_context_var,
     request_id_context_var,
+    response_cache_hit_context_var,
     retrieve_ms_context_var,
+    timeout_stage_context_var,
     top_k_context_var,
 )
 
@@ -61,11 +69,19 @@ class LoggingMiddleware:
             "embed_ms": embed_ms_context_var.get(),
             "generate_ms": generate_ms_context_var.get(),
             "retrieve_ms": retrieve_ms_context_var.get(),
+            "dataset_retrieve_ms": dataset_retrieve_ms_context_var.get(),
             "duration_ms": round(duration_ms, 3),
             "dataset": dataset_context_var.get(),
             "top_k": top_k_context_var.get(),
             "candidate_k": candidate_k_context_var.get(),
             "num_chunks_returned": chunks_return_context_var.get(),
+            "context_tokens": context_tokens_context_var.get(),
+            "cache_hit": answer_cache_hit_context_var.get(),
+            "response_cache_hit": response_cache_hit_context_var.get(),
+            "coalesced": request_coalesced_context_var.get(),
+            "timeout_stage": timeout_stage_context_var.get(),
+            "admission_wait_ms": admission_wait_ms_context_var.get(),
+            "queue_depth": admission_queue_depth_context_var.get(),
         }
         if result["status_code"] >= 400:
             error_message = None
@@ -0,0 +1,159 @@
+import threading
+
+
+class Counter:
+    """Monotonically increasing, thread-safe counter."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        with self._lock:
+            self._value += amount
+
+
+class Gauge:
+    """Thread-safe value that can go up and down."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+
+class MetricsRegistry:
+    """Process-wide collection of metrics, rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Gauge] = {}
+        self._lock = threading.Lock()
+
+    def _register[M: (Counter, Gauge)](
+        self, metric_type: type[M], name: str, description: str
+    ) -> M:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_type(name, description)
+                self._metrics[name] = metric
+            if not isinstance(metric, metric_type):
+                raise ValueError(
+                    f"Metric {name} is already registered as a {metric.kind}"
+                )
+            return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        """Return the counter registered under name, creating it on first use."""
+        return self._register(Counter, name, description)
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        """Return the gauge registered under name, creating it on first use."""
+        return self._register(Gauge, name, description)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.append(f"{metric.name} {metric.value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+coalesced_requests_counter = metrics_registry.counter(
+    "llm_lab_coalesced_requests_total",
+    "Requests answered by sharing an identical in-flight request's result.",
+)
+llm_hedged_requests_counter = metrics_registry.counter(
+    "llm_lab_llm_hedged_requests_total",
+    "Duplicate LLM requests sent because the original was slower than the hedge delay.",
+)
+llm_hedge_wins_counter = metrics_registry.counter(
+    "llm_lab_llm_hedge_wins_total",
+    "Hedged LLM requests whose duplicate returned first.",
+)
+llm_hedges_in_flight_gauge = metrics_registry.gauge(
+    "llm_lab_llm_hedges_in_flight",
+    "Duplicate LLM requests currently outstanding.",
+)
+llm_circuit_state_gauge = metrics_registry.gauge(
+    "llm_lab_llm_circuit_state",
+    "LLM circuit breaker state: 0 closed, 1 open, 2 half-open.",
+)
+llm_circuit_rejections_counter = metrics_registry.counter(
+    "llm_lab_llm_circuit_rejections_total",
+    "LLM calls failed fast because the circuit breaker was open.",
+)
+llm_context_cache_hits_counter = metrics_registry.counter(
+    "llm_lab_llm_context_cache_hits_total",
+    "Generation calls that referenced a provider-side cached prompt prefix.",
+)
+llm_context_cache_created_counter = metrics_registry.counter(
+    "llm_lab_llm_context_cache_created_total",
+    "Prompt prefixes registered with the provider's context cache.",
+)
+admission_in_flight_gauge = metrics_registry.gauge(
+    "llm_lab_admission_in_flight",
+    "Requests currently holding an admission slot.",
+)
+admission_queue_depth_gauge = metrics_registry.gauge(
+    "llm_lab_admission_queue_depth",
+    "Requests waiting for an admission slot.",
+)
+admission_admitted_counter = metrics_registry.counter(
+    "llm_lab_admission_admitted_total",
+    "Requests admitted for processing.",
+)
+admission_wait_seconds_counter = metrics_registry.counter(
+    "llm_lab_admission_wait_seconds_total",
+    "Total time admitted requests spent waiting for a slot.",
+)
+admission_rejected_counter = metrics_registry.counter(
+    "llm_lab_admission_rejected_total",
+    "Requests shed with a 503 because the queue was full or the wait too long.",
+)
+file_store_loaded_versions_gauge = metrics_registry.gauge(
+    "llm_lab_file_store_loaded_versions",
+    "File store dataset versions held in memory, including ones still draining.",
+)
+file_store_reloads_counter = metrics_registry.counter(
+    "llm_lab_file_store_reloads_total",
+    "Newly published file store dataset versions swapped in.",
+)
+file_store_reload_failures_counter = metrics_registry.counter(
+    "llm_lab_file_store_reload_failures_total",
+    "Newly published file store dataset versions that failed to load.",
+)
@@ -0,0 +1,144 @@
+import hashlib
+import itertools
+import math
+import re
+from collections.abc import Iterable
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from llm_lab.config.variables import SIMHASH_BITS, SIMHASH_SHINGLE_WORDS
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase words only, so formatting and punctuation changes compare equal."""
+    return " ".join(_WORD.findall(text.casefold()))
+
+
+def content_hash(normalized_text: str) -> bytes:
+    return hashlib.blake2b(normalized_text.encode(), digest_size=16).digest()
+
+
+def simhash(normalized_text: str, shingle_words: int = SIMHASH_SHINGLE_WORDS) -> int:
+    """64-bit SimHash of the text's word shingles.
+
+    Each shingle is hashed and votes for the bits of its hash; the fingerprint has
+    the bits most shingles agree on. Texts sharing most shingles get fingerprints
+    differing in few bits.
+    """
+    words = normalized_text.split()
+    shingles = {
+        " ".join(words[start : start + shingle_words])
+        for start in range(max(len(words) - shingle_words + 1, 1))
+    }
+    digests = b"".join(
+        hashlib.blake2b(shingle.encode(), digest_size=8).digest()
+        for shingle in shingles
+    )
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(
+        -1, SIMHASH_BITS
+    )
+    majority = bits.sum(axis=0) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(majority).tobytes())
+
+
+def max_hamming_distance(similarity_threshold: float) -> int:
+    """Fingerprint bits two texts may differ in to reach the similarity threshold."""
+    return math.floor((1 - similarity_threshold) * SIMHASH_BITS + 1e-9)
+
+
+class DuplicateGroups(BaseModel):
+    duplicate_of: dict[str, str] = Field(
+        default_factory=dict,
+        description="Source of each duplicate chunk mapped to the source of the chunk kept.",
+    )
+    alternate_sources: dict[str, list[str]] = Field(
+        default_factory=dict,
+        description="Sources of the duplicates of each kept chunk that has any.",
+    )
+    exact_count: int = Field(
+        default=0, description="Duplicates identical after normalization."
+    )
+    near_count: int = Field(
+        default=0, description="Duplicates within the near-duplicate threshold."
+    )
+
+
+class DuplicateDetector:
+    """Find chunks whose text repeats an earlier chunk, exactly or nearly.
+
+    Exact duplicates are found by hashing the normalized text. Near duplicates are
+    chunks whose SimHash fingerprints differ in at most max_distance bits. The
+    fingerprint is split into max_distance + 1 blocks: two fingerprints that close
+    agree on at least one whole block, so only chunks sharing a block are compared.
+    Without a similarity threshold only exact duplicates are found.
+    """
+
+    def __init__(self, similarity_threshold: float | None = None) -> None:
+        self.near_duplicates = similarity_threshold is not None
+        self.max_distance = (
+            0
+            if similarity_threshold is None
+            else max_hamming_distance(similarity_threshold)
+        )
+        block_count = self.max_distance + 1
+        bounds = [
+            SIMHASH_BITS * block // block_count for block in range(block_count + 1)
+        ]
+        self._blocks = [
+            (start, (1 << (end - start)) - 1)
+            for start, end in itertools.pairwise(bounds)
+        ]
+        self._hashes: dict[bytes, str] = {}
+        self._tables: list[dict[int, list[tuple[int, str]]]] = [
+            {} for _ in self._blocks
+        ]
+        self.groups = DuplicateGroups()
+
+    def _near_duplicate_of(self, fingerprint: int) -> str | None:
+        for table, (shift, mask) in zip(self._tables, self._blocks, strict=True):
+            for candidate, source in table.get((fingerprint >> shift) & mask, []):
+                if (candidate ^ fingerprint).bit_count() <= self.max_distance:
+                    return source
+        return None
+
+    def add(self, source: str, text: str) -> str | None:
+        """Register a chunk; return the source of the chunk it duplicates, if any."""
+        normalized = normalize_text(text)
+        digest = content_hash(normalized)
+        original = self._hashes.get(digest)
+        if original is not None:
+            self.groups.exact_count += 1
+            return self._record(source, original)
+        if self.near_duplicates:
+            fingerprint = simhash(normalized)
+            original = self._near_duplicate_of(fingerprint)
+            if original is not None:
+                self.groups.near_count += 1
+                return self._record(source, original)
+            for table, (shift, mask) in zip(self._tables, self._blocks, strict=True):
+                table.setdefault((fingerprint >> shift) & mask, []).append(
+                    (fingerprint, source)
+                )
+        self._hashes[digest] = source
+        return None
+
+    def _record(self, source: str, original: str) -> str:
+        self.groups.duplicate_of[source] = original
+        self.groups.alternate_sources.setdefault(original, []).append(source)
+        return original
+
+
+def find_duplicates(
+    chunks: Iterable[tuple[str, str]], similarity_threshold: float | None = None
+) -> DuplicateGroups:
+    """Group (source, text) chunks by duplicated content, keeping the first of each.
+
+    Near duplicates are only grouped with a similarity_threshold.
+    """
+    detector = DuplicateDetector(similarity_threshold)
+    for source, text in chunks:
+        detector.add(source, text)
+    return detector.groups
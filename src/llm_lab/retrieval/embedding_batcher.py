@@ -0,0 +1,152 @@
+import threading
+import time
+import typing
+
+from llm_lab.config.variables import (
+    DEFAULT_EMBEDDING_BATCH_MAX_SIZE,
+    DEFAULT_EMBEDDING_BATCH_WINDOW_MS,
+)
+from llm_lab.llm.types import LlmClient
+from llm_lab.observability.deadline import (
+    EMBED_STAGE,
+    DeadlineExceededError,
+    current_deadline,
+    deadline_exceeded,
+    remaining_seconds,
+    run_with_deadline,
+)
+
+
+class _PendingEmbedding:
+    def __init__(self, text: str, embedding_model: str) -> None:
+        self.text = text
+        self.embedding_model = embedding_model
+        # Deadline of the request embedding text, None when unbounded.
+        self.deadline = current_deadline()
+        self.embedding: list[float] | None = None
+        self.error: Exception | None = None
+        self.is_leader = False
+        self.completed = False
+        # Set once the embedding is ready, or when promoted to flush the next batch.
+        self.ready = threading.Event()
+
+
+def _latest_deadline(batch: list[_PendingEmbedding]) -> float | None:
+    """The deadline bounding a batch: its latest one, None if any is unbounded."""
+    deadlines = [pending.deadline for pending in batch]
+    if any(deadline is None for deadline in deadlines):
+        return None
+    return max(typing.cast(list[float], deadlines))
+
+
+class EmbeddingBatcher:
+    """Combine concurrent single-text embedding requests into batched embed calls.
+
+    Callers block in embed until their vector is ready. The first queued caller
+    leads the next batch: while another batch is being embedded it waits up to
+    window_ms for more texts (or until max_batch_size are queued), then sends them
+    all in one embed_texts call. With no batch in flight it flushes immediately, so
+    a lone request is not delayed. A batch only holds texts for the embedding model
+    of its leader; texts for other models wait for a later batch. The embed call is
+    bounded by the latest deadline of the batch's requests, so a leader with a
+    short deadline does not fail the others.
+    """
+
+    def __init__(
+        self,
+        llm_client: LlmClient,
+        window_ms: float = DEFAULT_EMBEDDING_BATCH_WINDOW_MS,
+        max_batch_size: int = DEFAULT_EMBEDDING_BATCH_MAX_SIZE,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.llm_client = llm_client
+        self.window_seconds = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue: list[_PendingEmbedding] = []
+        self._batches_in_flight = 0
+        self._cond = threading.Condition()
+
+    def embed(self, text: str, embedding_model: str) -> list[float]:
+        """Embed a single text, possibly together with texts of concurrent callers."""
+        pending = _PendingEmbedding(text, embedding_model)
+        with self._cond:
+            self._queue.append(pending)
+            if len(self._queue) == 1:
+                pending.is_leader = True
+            elif len(self._queue) >= self.max_batch_size:
+                self._cond.notify_all()
+        if not pending.is_leader:
+            self._wait_for_batch(pending)
+        if not pending.completed:
+            self._flush()
+        if isinstance(pending.error, DeadlineExceededError):
+            # Recorded as this request's timeout stage, not only the flushing one's.
+            raise deadline_exceeded(pending.error.stage) from pending.error
+        if pending.error is not None:
+            raise pending.error
+        return typing.cast(list[float], pending.embedding)
+
+    def _wait_for_batch(self, pending: _PendingEmbedding) -> None:
+        """Wait until pending is embedded or promoted, within the request deadline.
+
+        A text still queued when the deadline passes is withdrawn. Once it is part
+        of a batch (or leads the next one) it is waited for, since the embed call
+        is bounded by the deadline of the request that sent it.
+        """
+        if pending.ready.wait(remaining_seconds()):
+            return
+        with self._cond:
+            if pending in self._queue and not pending.is_leader:
+                self._queue.remove(pending)
+                raise deadline_exceeded(EMBED_STAGE)
+        pending.ready.wait()
+
+    def _take_batch(self) -> list[_PendingEmbedding]:
+        """Wait for the batch to fill up, then dequeue it. Called by the leader."""
+        deadline = time.monotonic() + self.window_seconds
+        with self._cond:
+            while self._batches_in_flight and len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            embedding_model = self._queue[0].embedding_model
+            batch = [
+                pending
+                for pending in self._queue
+                if pending.embedding_model == embedding_model
+            ][: self.max_batch_size]
+            self._queue = [pending for pending in self._queue if pending not in batch]
+            self._batches_in_flight += 1
+            if self._queue:
+                next_leader = self._queue[0]
+                next_leader.is_leader = True
+                next_leader.ready.set()
+        return batch
+
+    def _flush(self) -> None:
+        batch = self._take_batch()
+        try:
+            embeddings = run_with_deadline(
+                _latest_deadline(batch),
+                lambda: self.llm_client.embed_texts(
+                    [pending.text for pending in batch], batch[0].embedding_model
+                ),
+            )
+            if len(embeddings) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} embeddings, received {len(embeddings)}"
+                )
+            for pending, embedding in zip(batch, embeddings, strict=True):
+                pending.embedding = embedding
+        except Exception as err:
+            for pending in batch:
+                pending.error = err
+        finally:
+            with self._cond:
+                self._batches_in_flight -= 1
+                self._cond.notify_all()
+            for pending in batch:
+                pending.completed = True
+                pending.ready.set()
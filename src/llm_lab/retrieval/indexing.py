@@ -1,9 +1,15 @@
+import itertools
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
 from llm_lab.config.paths import BASE_DIR
+from llm_lab.config.variables import INDEX_EMBED_BATCH_SIZE
 from llm_lab.llm.types import LlmClient
+from llm_lab.retrieval.deduplication import DuplicateGroups, find_duplicates
 from llm_lab.retrieval.types import (
     ChunkingConfig,
+    DeduplicationConfig,
+    IndexingStats,
 )
 from llm_lab.vector_store.types import Chunk, IndexedChunk
 
@@ -36,6 +42,10 @@ def _create_chunks(
     return chunks
 
 
+def _chunk_source(doc_path: str, chunk_id: int) -> str:
+    return f"{doc_path}#chunk-{chunk_id}"
+
+
 def _read_file(file_path: Path) -> str:
     """Read a file and return its content."""
     try:
@@ -56,11 +66,15 @@ class Indexer:
         embedding_model: str,
         dataset: str,
         chunking_config: ChunkingConfig,
+        deduplication_config: DeduplicationConfig | None = None,
     ) -> None:
         self.source_dir = source_dir
         self.embedding_model = embedding_model
         self.dataset = dataset
         self.chunking_config = chunking_config
+        self.deduplication_config = deduplication_config
+        # Filled in as the indexed chunks are consumed.
+        self.stats = IndexingStats()
 
     def load_docs(self) -> list[Path]:
         """Load all Markdown files from the source directory."""
@@ -71,30 +85,93 @@ class Indexer:
             raise ValueError(f"No Markdown files found in directory {self.source_dir}")
         return files
 
-    def build_index(
-        self, llm_client: LlmClient, docs: list[Path]
-    ) -> list[IndexedChunk]:
-        """Build index by creating embeddings for document chunks."""
-        indexed_chunks = []
+    def iter_chunks(self, docs: Iterable[Path]) -> Iterator[tuple[int, Chunk]]:
+        """Read and chunk documents one at a time, yielding (chunk_id, chunk)."""
         for doc in docs:
             file_content = _read_file(doc)
             doc_path = doc.relative_to(BASE_DIR)
             chunks = _create_chunks(file_content, doc_path, self.chunking_config)
-            for chunk_id, chunk in enumerate(chunks):
-                embedding = llm_client.embed_text(chunk.text, self.embedding_model)
-                source = f"{doc_path}#chunk-{chunk_id}"
-                indexed_chunk = IndexedChunk(
+            yield from enumerate(chunks)
+
+    def find_duplicates(self, docs: Iterable[Path]) -> DuplicateGroups:
+        """Read every chunk once to find the duplicated ones, before any is embedded.
+
+        The first chunk of a group is kept, the others become its alternate sources.
+        """
+        if self.deduplication_config is None:
+            return DuplicateGroups()
+        return find_duplicates(
+            (
+                (_chunk_source(chunk.doc_path, chunk_id), chunk.text)
+                for chunk_id, chunk in self.iter_chunks(docs)
+            ),
+            self.deduplication_config.near_duplicate_threshold
+            if self.deduplication_config.near_duplicates
+            else None,
+        )
+
+    def _iter_unique_chunks(
+        self, docs: Iterable[Path], groups: DuplicateGroups
+    ) -> Iterator[tuple[int, Chunk]]:
+        for chunk_id, chunk in self.iter_chunks(docs):
+            self.stats.chunks_count += 1
+            if _chunk_source(chunk.doc_path, chunk_id) in groups.duplicate_of:
+                self.stats.skipped_chars += len(chunk.text)
+            else:
+                yield chunk_id, chunk
+
+    def iter_indexed_chunks(
+        self,
+        llm_client: LlmClient,
+        docs: Iterable[Path],
+        batch_size: int = INDEX_EMBED_BATCH_SIZE,
+    ) -> Iterator[IndexedChunk]:
+        """Embed document chunks in batches, yielding them as they are embedded.
+
+        Only one batch of chunks is held in memory at a time. With deduplication,
+        the documents are read twice: once to find duplicates, which are then
+        neither embedded nor stored, and once to embed the remaining chunks.
+        """
+        docs = list(docs)
+        groups = self.find_duplicates(docs)
+        self.stats = IndexingStats(
+            docs_count=len(docs),
+            exact_duplicates=groups.exact_count,
+            near_duplicates=groups.near_count,
+        )
+        for batch in itertools.batched(
+            self._iter_unique_chunks(docs, groups), batch_size, strict=False
+        ):
+            embeddings = llm_client.embed_texts(
+                [chunk.text for _, chunk in batch], self.embedding_model
+            )
+            if len(embeddings) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} embeddings, received {len(embeddings)}"
+                )
+            self.stats.embedded_chunks += len(batch)
+            for (chunk_id, chunk), embedding in zip(batch, embeddings, strict=True):
+                source = _chunk_source(chunk.doc_path, chunk_id)
+                yield IndexedChunk(
                     text=chunk.text,
                     doc_path=chunk.doc_path,
                     source=source,
                     embedding=embedding,
                     chunk_id=chunk_id,
+                    alternate_sources=groups.alternate_sources.get(source, []),
                 )
-                indexed_chunks.append(indexed_chunk)
-        return indexed_chunks
 
-    def run(self, llm_client: LlmClient) -> tuple[list[IndexedChunk], int]:
-        """Run the indexing process."""
+    def build_index(
+        self, llm_client: LlmClient, docs: list[Path]
+    ) -> list[IndexedChunk]:
+        """Build index by creating embeddings for document chunks."""
+        return list(self.iter_indexed_chunks(llm_client, docs))
+
+    def run(self, llm_client: LlmClient) -> tuple[Iterator[IndexedChunk], int]:
+        """Run the indexing process.
+
+        Returns the indexed chunks as a lazy stream, to be consumed by a vector
+        store, and the number of documents.
+        """
         docs = self.load_docs()
-        indexed_chunks = self.build_index(llm_client, docs)
-        return indexed_chunks, len(docs)
+        return self.iter_indexed_chunks(llm_client, docs), len(docs)
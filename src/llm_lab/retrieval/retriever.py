@@ -1,7 +1,13 @@
+import contextvars
+import heapq
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+from llm_lab.config.settings import DEFAULT_EMBEDDING_MODEL_NAME
 from llm_lab.config.variables import (
     CANDIDATE_MULTIPLIER,
+    DEFAULT_QUERY_FAN_OUT_WORKERS,
     MAX_CANDIDATES,
     SIMILARITY_SCORE_THRESHOLD,
 )
@@ -9,10 +15,31 @@ from llm_lab.llm.types import LlmClient
 from llm_lab.observability.context import (
     candidate_k_context_var,
     chunks_return_context_var,
+    dataset_retrieve_ms_context_var,
     embed_ms_context_var,
     retrieve_ms_context_var,
 )
-from llm_lab.vector_store.types import ScoredChunk, VectorStoreClient
+from llm_lab.observability.deadline import EMBED_STAGE, RETRIEVE_STAGE, check_deadline
+from llm_lab.retrieval.embedding_batcher import EmbeddingBatcher
+from llm_lab.vector_store.types import QueryFilter, ScoredChunk, VectorStoreClient
+
+
+def resolve_embedding_model(
+    vector_store_client: VectorStoreClient, dataset: str, default_embedding_model: str
+) -> str:
+    """The embedding model the dataset was indexed with, from the store's metadata.
+
+    Datasets whose store records no metadata are assumed to use
+    default_embedding_model, the configured embedding model.
+    """
+    info = vector_store_client.get_dataset_info(dataset)
+    return default_embedding_model if info is None else info.embedding_model
+
+
+@lru_cache
+def _get_fan_out_executor(workers: int) -> ThreadPoolExecutor:
+    """Process-wide pool querying the datasets of multi-dataset searches."""
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dataset-query")
 
 
 class Retriever:
@@ -22,20 +49,70 @@ class Retriever:
         self,
         llm_client: LlmClient,
         vector_store_client: VectorStoreClient,
+        embedding_batcher: EmbeddingBatcher | None = None,
+        fan_out_workers: int = DEFAULT_QUERY_FAN_OUT_WORKERS,
+        default_embedding_model: str = DEFAULT_EMBEDDING_MODEL_NAME,
     ) -> None:
         self.llm_client = llm_client
         self.vector_store_client = vector_store_client
+        self.embedding_batcher = embedding_batcher
+        self.fan_out_workers = fan_out_workers
+        self.default_embedding_model = default_embedding_model
 
-    def search(self, dataset: str, query: str, top_k: int) -> list[ScoredChunk]:
-        candidate_k = min(top_k * CANDIDATE_MULTIPLIER, MAX_CANDIDATES)
-        candidate_k_context_var.set(candidate_k)
-        embedding_model = "gemini-embedding-001"
+    def embedding_model(self, dataset: str) -> str:
+        """Return the embedding model the dataset was indexed with."""
+        return resolve_embedding_model(
+            self.vector_store_client, dataset, self.default_embedding_model
+        )
+
+    def embed_query(self, query: str, embedding_model: str) -> list[float]:
+        """Embed the query with the model used to index the datasets."""
+        check_deadline(EMBED_STAGE)
         embedding_start_time = time.perf_counter()
-        query_embedding = self.llm_client.embed_text(query, embedding_model)
+        if self.embedding_batcher is not None:
+            query_embedding = self.embedding_batcher.embed(query, embedding_model)
+        else:
+            query_embedding = self.llm_client.embed_text(query, embedding_model)
         embedding_time = round((time.perf_counter() - embedding_start_time) * 1000, 3)
         embed_ms_context_var.set(embedding_time)
+        return query_embedding
+
+    def get_index_version(self, dataset: str) -> str | None:
+        """Return the version of the dataset's index, see VectorStoreClient."""
+        return self.vector_store_client.get_index_version(
+            dataset, self.embedding_model(dataset)
+        )
+
+    def search(
+        self,
+        dataset: str,
+        query: str,
+        top_k: int,
+        query_filter: QueryFilter | None = None,
+        query_embedding: list[float] | None = None,
+    ) -> list[ScoredChunk]:
+        """Return the top_k chunks most similar to the query.
+
+        Pass query_embedding to reuse an embedding already computed with
+        embed_query, with the dataset's embedding model, instead of embedding
+        the query again. Each stage only starts if the request deadline has not
+        passed.
+        """
+        candidate_k = min(top_k * CANDIDATE_MULTIPLIER, MAX_CANDIDATES)
+        candidate_k_context_var.set(candidate_k)
+        embedding_model = self.embedding_model(dataset)
+        if query_embedding is None:
+            query_embedding = self.embed_query(query, embedding_model)
+        check_deadline(RETRIEVE_STAGE)
         retrieve_start_time = time.perf_counter()
-        scored_chunks = self.vector_store_client.query(dataset, embedding_model, query_embedding, candidate_k)
+        scored_chunks = self.vector_store_client.query(
+            dataset,
+            embedding_model,
+            query_embedding,
+            candidate_k,
+            query_filter=query_filter,
+            score_threshold=SIMILARITY_SCORE_THRESHOLD,
+        )
         retrieve_time = round((time.perf_counter() - retrieve_start_time) * 1000, 3)
         retrieve_ms_context_var.set(retrieve_time)
         selected_chunks = [
@@ -43,3 +120,84 @@ class Retriever:
         ][:top_k]
         chunks_return_context_var.set(len(selected_chunks))
         return selected_chunks
+
+    def _query_candidates(
+        self,
+        dataset: str,
+        embedding_model: str,
+        query_embedding: list[float],
+        candidate_k: int,
+        query_filter: QueryFilter | None,
+    ) -> tuple[list[ScoredChunk], float]:
+        start_time = time.perf_counter()
+        scored_chunks = self.vector_store_client.query(
+            dataset,
+            embedding_model,
+            query_embedding,
+            candidate_k,
+            query_filter=query_filter,
+            score_threshold=SIMILARITY_SCORE_THRESHOLD,
+        )
+        candidates = [
+            sc.model_copy(update={"dataset": dataset})
+            for sc in scored_chunks
+            if sc.score >= SIMILARITY_SCORE_THRESHOLD
+        ]
+        return candidates, round((time.perf_counter() - start_time) * 1000, 3)
+
+    def search_datasets(
+        self,
+        datasets: list[str],
+        query: str,
+        top_k: int,
+        query_filter: QueryFilter | None = None,
+    ) -> list[ScoredChunk]:
+        """Return the top_k chunks most similar to the query across datasets.
+
+        The query is embedded once per distinct embedding model, then every
+        dataset is queried concurrently. The candidates of all datasets are
+        ranked together by their raw cosine similarity, one scale whatever the
+        dataset, which also holds them to the same similarity threshold.
+        Returned chunks record the dataset they came from.
+        """
+        candidate_k = min(top_k * CANDIDATE_MULTIPLIER, MAX_CANDIDATES)
+        candidate_k_context_var.set(candidate_k)
+        embedding_models = {
+            dataset: self.embedding_model(dataset) for dataset in datasets
+        }
+        embed_ms = 0.0
+        query_embeddings: dict[str, list[float]] = {}
+        for embedding_model in dict.fromkeys(embedding_models.values()):
+            query_embeddings[embedding_model] = self.embed_query(query, embedding_model)
+            embed_ms += embed_ms_context_var.get() or 0.0
+        embed_ms_context_var.set(round(embed_ms, 3))
+        check_deadline(RETRIEVE_STAGE)
+        retrieve_start_time = time.perf_counter()
+        executor = _get_fan_out_executor(self.fan_out_workers)
+        # Each query runs in a copy of this context, so it sees the request deadline.
+        futures = {
+            dataset: executor.submit(
+                contextvars.copy_context().run,
+                self._query_candidates,
+                dataset,
+                embedding_models[dataset],
+                query_embeddings[embedding_models[dataset]],
+                candidate_k,
+                query_filter,
+            )
+            for dataset in datasets
+        }
+        results = {dataset: future.result() for dataset, future in futures.items()}
+        retrieve_ms_context_var.set(
+            round((time.perf_counter() - retrieve_start_time) * 1000, 3)
+        )
+        dataset_retrieve_ms_context_var.set(
+            {dataset: retrieve_ms for dataset, (_, retrieve_ms) in results.items()}
+        )
+        selected_chunks = heapq.nlargest(
+            top_k,
+            (sc for candidates, _ in results.values() for sc in candidates),
+            key=lambda sc: sc.score,
+        )
+        chunks_return_context_var.set(len(selected_chunks))
+        return selected_chunks
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
 
+from llm_lab.config.variables import DEFAULT_NEAR_DUPLICATE_THRESHOLD
+
 
 class ChunkingConfig(BaseModel):
     chunk_size: int = Field(
@@ -10,3 +12,33 @@ class ChunkingConfig(BaseModel):
         description="The separator string used to delineate chunks.",
         min_length=1,
     )
+
+
+class DeduplicationConfig(BaseModel):
+    near_duplicates: bool = Field(
+        default=False,
+        description="Also skip near duplicates, whose text differs, not only exact ones.",
+    )
+    near_duplicate_threshold: float = Field(
+        default=DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+        description="SimHash similarity from which chunks count as near duplicates, 1 for identical fingerprints only.",
+        ge=0.5,
+        le=1.0,
+    )
+
+
+class IndexingStats(BaseModel):
+    docs_count: int = Field(default=0, description="Documents read.")
+    chunks_count: int = Field(default=0, description="Chunks found in the documents.")
+    exact_duplicates: int = Field(
+        default=0,
+        description="Chunks skipped as identical to another after normalization.",
+    )
+    near_duplicates: int = Field(
+        default=0, description="Chunks skipped as near duplicates of another."
+    )
+    embedded_chunks: int = Field(default=0, description="Chunks embedded and stored.")
+    skipped_chars: int = Field(
+        default=0,
+        description="Characters of text not embedded thanks to deduplication.",
+    )
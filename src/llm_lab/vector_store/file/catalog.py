@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from llm_lab.vector_store.file.dataset_cache import manifest_mtime_ns
+from llm_lab.vector_store.file.types import ManifestFile
+from llm_lab.vector_store.types import DatasetInfo
+
+logger = logging.getLogger(__name__)
+
+
+def dataset_info(manifest: ManifestFile) -> DatasetInfo:
+    """Describe a dataset from its manifest; the creation time is its index version."""
+    return DatasetInfo(
+        dataset=manifest.dataset,
+        embedding_model=manifest.embedding_model,
+        dimension=manifest.dimension,
+        docs_count=manifest.total_docs,
+        chunk_count=manifest.total_chunks,
+        index_version=manifest.created_at.isoformat(),
+        created_at=manifest.created_at,
+    )
+
+
+class _CatalogEntry:
+    def __init__(self, info: DatasetInfo, mtime_ns: int, checked_at: float) -> None:
+        self.info = info
+        self.mtime_ns = mtime_ns
+        self.checked_at = checked_at
+
+
+class DatasetCatalog:
+    """Metadata of the datasets of a file store, cached from their manifests.
+
+    A manifest is read and validated once. After that it is only checked for
+    changes, by its modification time, at most every refresh_interval_seconds,
+    and reread when a new version was published. Listing the datasets rescans
+    the store directory at most as often. Lookups in between touch no files.
+    """
+
+    def __init__(
+        self,
+        dest_dir: Path,
+        load_manifest: Callable[[Path], ManifestFile],
+        refresh_interval_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.dest_dir = dest_dir
+        self.load_manifest = load_manifest
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.clock = clock
+        self._entries: dict[str, _CatalogEntry] = {}
+        self._names: list[str] = []
+        self._listed_at: float | None = None
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, checked_at: float, now: float) -> bool:
+        return now - checked_at < self.refresh_interval_seconds
+
+    def get(self, dataset: str) -> DatasetInfo | None:
+        """Describe the dataset, None if it has no manifest."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(dataset)
+        if entry is not None and self._is_fresh(entry.checked_at, now):
+            return entry.info
+        dataset_dir = self.dest_dir / dataset
+        # Stat before reading, so a version published meanwhile is picked up later.
+        mtime_ns = manifest_mtime_ns(dataset_dir)
+        if mtime_ns == -1:
+            self.invalidate(dataset)
+            return None
+        if entry is None or entry.mtime_ns != mtime_ns:
+            info = dataset_info(self.load_manifest(dataset_dir / "manifest.json"))
+            entry = _CatalogEntry(info, mtime_ns, now)
+        else:
+            entry.checked_at = now
+        with self._lock:
+            self._entries[dataset] = entry
+        return entry.info
+
+    def _dataset_names(self) -> list[str]:
+        now = self.clock()
+        with self._lock:
+            if self._listed_at is not None and self._is_fresh(self._listed_at, now):
+                return self._names
+        names = (
+            sorted(path.parent.name for path in self.dest_dir.glob("*/manifest.json"))
+            if self.dest_dir.is_dir()
+            else []
+        )
+        with self._lock:
+            self._names, self._listed_at = names, now
+        return names
+
+    def list(self) -> list[DatasetInfo]:
+        """Describe every dataset with a manifest, by name; malformed ones are skipped."""
+        infos = []
+        for dataset in self._dataset_names():
+            try:
+                info = self.get(dataset)
+            except ValueError:
+                logger.warning("Skipping dataset %s", dataset, exc_info=True)
+                continue
+            if info is not None:
+                infos.append(info)
+        return infos
+
+    def invalidate(self, dataset: str) -> None:
+        """Forget a dataset, so its manifest and the store directory are read again."""
+        with self._lock:
+            self._entries.pop(dataset, None)
+            self._listed_at = None
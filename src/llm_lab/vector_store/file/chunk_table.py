@@ -0,0 +1,210 @@
+import bisect
+import struct
+from collections.abc import Sequence
+from pathlib import Path
+from typing import BinaryIO, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from llm_lab.vector_store.file.types import ManifestDocRange
+from llm_lab.vector_store.types import IndexedChunk
+
+TEXT_FILE_NAME = "text.utf8"
+TEXT_OFFSETS_FILE_NAME = "text.offsets"
+SOURCE_FILE_NAME = "source.utf8"
+SOURCE_OFFSETS_FILE_NAME = "source.offsets"
+CHUNK_IDS_FILE_NAME = "chunk_id.i64"
+ALTERNATE_SOURCES_FILE_NAME = "alternate_sources.utf8"
+ALTERNATE_SOURCES_OFFSETS_FILE_NAME = "alternate_sources.offsets"
+# Joins the alternate sources of a chunk into one string of the column.
+ALTERNATE_SOURCES_SEPARATOR = "\n"
+# Little-endian, fixed so the column files are portable between machines.
+OFFSET_DTYPE = np.dtype("<i8")
+CHUNK_ID_DTYPE = np.dtype("<i8")
+
+
+def _map_file[S: np.generic](path: Path, dtype: np.dtype[S]) -> npt.NDArray[S]:
+    """Map a column file read-only; mmap cannot map empty files, so read those."""
+    if path.stat().st_size == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+class StringColumn:
+    """Strings stored back to back as UTF-8, with the offset at which each starts."""
+
+    def __init__(
+        self, data: npt.NDArray[np.uint8], offsets: npt.NDArray[np.int64]
+    ) -> None:
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings: Sequence[str]) -> Self:
+        encoded = [string.encode() for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=OFFSET_DTYPE)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    @classmethod
+    def map(cls, data_path: Path, offsets_path: Path) -> Self:
+        return cls(
+            _map_file(data_path, np.dtype(np.uint8)),
+            _map_file(offsets_path, OFFSET_DTYPE),
+        )
+
+    def __getitem__(self, row: int) -> str:
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return self.data[start:end].tobytes().decode()
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.offsets.nbytes
+
+
+class ChunkTable:
+    """Chunk metadata in columns, one row per chunk.
+
+    Texts, sources and alternate sources are UTF-8 string columns and chunk ids
+    an integer array; document paths are not repeated per row but looked up in
+    the doc ranges. IndexedChunk models are only built for the rows a query
+    returns. Tables written before alternate sources were recorded have none.
+    """
+
+    def __init__(
+        self,
+        texts: StringColumn,
+        sources: StringColumn,
+        chunk_ids: npt.NDArray[np.int64],
+        doc_ranges: list[ManifestDocRange],
+        alternate_sources: StringColumn | None = None,
+    ) -> None:
+        self.texts = texts
+        self.sources = sources
+        self.chunk_ids = chunk_ids
+        self.doc_ranges = doc_ranges
+        self.alternate_sources = alternate_sources
+        self._doc_range_starts = [doc_range.start_row for doc_range in doc_ranges]
+
+    @classmethod
+    def from_chunks(
+        cls, chunks: Sequence[IndexedChunk], doc_ranges: list[ManifestDocRange]
+    ) -> Self:
+        return cls(
+            StringColumn.from_strings([chunk.text for chunk in chunks]),
+            StringColumn.from_strings([chunk.source for chunk in chunks]),
+            np.array([chunk.chunk_id for chunk in chunks], dtype=CHUNK_ID_DTYPE),
+            doc_ranges,
+            StringColumn.from_strings(
+                [
+                    ALTERNATE_SOURCES_SEPARATOR.join(chunk.alternate_sources)
+                    for chunk in chunks
+                ]
+            ),
+        )
+
+    @classmethod
+    def map(cls, table_dir: Path, doc_ranges: list[ManifestDocRange]) -> Self:
+        """Map the column files written by ChunkTableWriter read-only."""
+        return cls(
+            StringColumn.map(
+                table_dir / TEXT_FILE_NAME, table_dir / TEXT_OFFSETS_FILE_NAME
+            ),
+            StringColumn.map(
+                table_dir / SOURCE_FILE_NAME, table_dir / SOURCE_OFFSETS_FILE_NAME
+            ),
+            _map_file(table_dir / CHUNK_IDS_FILE_NAME, CHUNK_ID_DTYPE),
+            doc_ranges,
+            StringColumn.map(
+                table_dir / ALTERNATE_SOURCES_FILE_NAME,
+                table_dir / ALTERNATE_SOURCES_OFFSETS_FILE_NAME,
+            )
+            if (table_dir / ALTERNATE_SOURCES_FILE_NAME).exists()
+            else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def doc_path(self, row: int) -> str:
+        index = bisect.bisect_right(self._doc_range_starts, row) - 1
+        return self.doc_ranges[index].doc_path
+
+    def chunk(self, row: int) -> IndexedChunk:
+        """Materialize a row, without its embedding."""
+        return IndexedChunk(
+            text=self.texts[row],
+            doc_path=self.doc_path(row),
+            source=self.sources[row],
+            chunk_id=int(self.chunk_ids[row]),
+            alternate_sources=self._alternate_sources(row),
+        )
+
+    def _alternate_sources(self, row: int) -> list[str]:
+        if self.alternate_sources is None:
+            return []
+        joined = self.alternate_sources[row]
+        return joined.split(ALTERNATE_SOURCES_SEPARATOR) if joined else []
+
+    @property
+    def nbytes(self) -> int:
+        nbytes = self.texts.nbytes + self.sources.nbytes + self.chunk_ids.nbytes
+        if self.alternate_sources is not None:
+            nbytes += self.alternate_sources.nbytes
+        return nbytes
+
+
+class _StringColumnWriter:
+    def __init__(self, data_path: Path, offsets_path: Path) -> None:
+        self._data = data_path.open("wb")
+        self._offsets = offsets_path.open("wb")
+        self._offset = 0
+        self._offsets.write(struct.pack("<q", 0))
+
+    def add(self, value: str) -> None:
+        encoded = value.encode()
+        self._data.write(encoded)
+        self._offset += len(encoded)
+        self._offsets.write(struct.pack("<q", self._offset))
+
+    @property
+    def files(self) -> tuple[BinaryIO, BinaryIO]:
+        return self._data, self._offsets
+
+
+class ChunkTableWriter:
+    """Append chunks to the column files of a ChunkTable as they stream in."""
+
+    def __init__(self, table_dir: Path) -> None:
+        self._texts = _StringColumnWriter(
+            table_dir / TEXT_FILE_NAME, table_dir / TEXT_OFFSETS_FILE_NAME
+        )
+        self._sources = _StringColumnWriter(
+            table_dir / SOURCE_FILE_NAME, table_dir / SOURCE_OFFSETS_FILE_NAME
+        )
+        self._chunk_ids = (table_dir / CHUNK_IDS_FILE_NAME).open("wb")
+        self._alternate_sources = _StringColumnWriter(
+            table_dir / ALTERNATE_SOURCES_FILE_NAME,
+            table_dir / ALTERNATE_SOURCES_OFFSETS_FILE_NAME,
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        for file in (
+            *self._texts.files,
+            *self._sources.files,
+            self._chunk_ids,
+            *self._alternate_sources.files,
+        ):
+            file.close()
+
+    def add(self, chunk: IndexedChunk) -> None:
+        self._texts.add(chunk.text)
+        self._sources.add(chunk.source)
+        self._chunk_ids.write(struct.pack("<q", chunk.chunk_id))
+        self._alternate_sources.add(
+            ALTERNATE_SOURCES_SEPARATOR.join(chunk.alternate_sources)
+        )
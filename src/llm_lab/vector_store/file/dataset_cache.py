@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from llm_lab.observability.metrics import (
+    file_store_loaded_versions_gauge,
+    file_store_reload_failures_counter,
+    file_store_reloads_counter,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def manifest_mtime_ns(dataset_dir: Path) -> int:
+    """Modification time of the dataset manifest, -1 if there is none."""
+    try:
+        return (dataset_dir / "manifest.json").stat().st_mtime_ns
+    except FileNotFoundError:
+        return -1
+
+
+class DatasetVersion[T]:
+    """A loaded version of a dataset and the number of queries using it."""
+
+    def __init__(self, dataset: T, mtime_ns: int) -> None:
+        self.dataset = dataset
+        self.mtime_ns = mtime_ns
+        self.leases = 0
+        self.superseded = False
+        self.retired = False
+
+
+class _Entry[T]:
+    def __init__(self, version: DatasetVersion[T], checked_at: float) -> None:
+        self.version = version
+        self.checked_at = checked_at
+        self.reloading = False
+
+
+class DatasetCache[T]:
+    """Loaded datasets, swapped for newly published versions without downtime.
+
+    A dataset is loaded on first use. After that its manifest is checked at most
+    every reload_interval_seconds; when a new version was published, it is loaded
+    on a background thread while queries keep being served from the loaded one,
+    and swapped in once ready. Queries that started on the previous version finish
+    on it, and it is retired once the last of them is done. A version that fails
+    to load is skipped and the loaded one kept.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[Path], T],
+        reload_interval_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.load = load
+        self.reload_interval_seconds = reload_interval_seconds
+        self.clock = clock
+        self._entries: dict[Path, _Entry[T]] = {}
+        self._lock = threading.Lock()
+        # A single thread, so at most one extra dataset version is being loaded.
+        self._reloader = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="file-store-reload"
+        )
+
+    def _load_version(self, dataset_dir: Path) -> DatasetVersion[T]:
+        # Stat before loading, so a version published meanwhile is picked up later.
+        mtime_ns = manifest_mtime_ns(dataset_dir)
+        version = DatasetVersion(self.load(dataset_dir), mtime_ns)
+        file_store_loaded_versions_gauge.inc()
+        return version
+
+    def _supersede(self, version: DatasetVersion[T]) -> bool:
+        """Mark version as replaced; True if it must be retired now. Needs the lock."""
+        version.superseded = True
+        if version.leases or version.retired:
+            return False
+        version.retired = True
+        return True
+
+    def _swap(
+        self, dataset_dir: Path, entry: _Entry[T], version: DatasetVersion[T]
+    ) -> None:
+        with self._lock:
+            entry.reloading = False
+            if self._entries.get(dataset_dir) is entry:
+                entry.version, replaced = version, entry.version
+            else:
+                # The dataset was discarded while this version was loading.
+                replaced = version
+            retire = self._supersede(replaced)
+        file_store_reloads_counter.inc()
+        if retire:
+            file_store_loaded_versions_gauge.dec()
+
+    def _reload_in_background(self, dataset_dir: Path, entry: _Entry[T]) -> None:
+        try:
+            version = self._load_version(dataset_dir)
+        except Exception:
+            with self._lock:
+                entry.reloading = False
+            file_store_reload_failures_counter.inc()
+            logger.exception(
+                "Loading the new version of %s failed, serving the loaded one",
+                dataset_dir,
+            )
+            return
+        self._swap(dataset_dir, entry, version)
+
+    def _entry(self, dataset_dir: Path) -> _Entry[T]:
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(dataset_dir)
+            if entry is not None:
+                if (
+                    entry.reloading
+                    or now - entry.checked_at < self.reload_interval_seconds
+                ):
+                    return entry
+                entry.checked_at = now
+        if entry is None:
+            version = self._load_version(dataset_dir)
+            with self._lock:
+                entry = self._entries.setdefault(dataset_dir, _Entry(version, now))
+                retire = entry.version is not version and self._supersede(version)
+            if retire:
+                file_store_loaded_versions_gauge.dec()
+            return entry
+        if manifest_mtime_ns(dataset_dir) != entry.version.mtime_ns:
+            with self._lock:
+                start_reload = not entry.reloading
+                entry.reloading = True
+            if start_reload:
+                self._reloader.submit(self._reload_in_background, dataset_dir, entry)
+        return entry
+
+    @contextmanager
+    def lease(self, dataset_dir: Path) -> Iterator[T]:
+        """Use the loaded version of a dataset, which stays alive until released."""
+        entry = self._entry(dataset_dir)
+        with self._lock:
+            version = entry.version
+            version.leases += 1
+        try:
+            yield version.dataset
+        finally:
+            with self._lock:
+                version.leases -= 1
+                retire = version.superseded and self._supersede(version)
+            if retire:
+                file_store_loaded_versions_gauge.dec()
+
+    def reload(self, dataset_dir: Path) -> T:
+        """Load the published version now, unless it is already loaded."""
+        with self._lock:
+            entry = self._entries.get(dataset_dir)
+        if entry is None:
+            return self._entry(dataset_dir).version.dataset
+        if manifest_mtime_ns(dataset_dir) != entry.version.mtime_ns:
+            self._swap(dataset_dir, entry, self._load_version(dataset_dir))
+        return entry.version.dataset
+
+    def discard(self, dataset_dir: Path) -> None:
+        """Forget a dataset, so its next use loads the published version."""
+        with self._lock:
+            entry = self._entries.pop(dataset_dir, None)
+            retire = entry is not None and self._supersede(entry.version)
+        if retire:
+            file_store_loaded_versions_gauge.dec()
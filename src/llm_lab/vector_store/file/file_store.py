@@ -1,44 +1,199 @@
-import math
+import contextlib
+import json
+import os
 import shutil
-from collections.abc import Sequence
+import tempfile
+import time
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import UTC, datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Self
 
+import numpy as np
 from pydantic import ValidationError
 
 from llm_lab.config.paths import DEFAULT_DESTINATION_DIR
-from llm_lab.vector_store.file.types import IndexFile, ManifestFile, ManifestIndexFile
-from llm_lab.vector_store.types import IndexedChunk, ScoredChunk, VectorStoreClient
+from llm_lab.config.variables import (
+    DEFAULT_FILE_STORE_RELOAD_INTERVAL_SECONDS,
+    DEFAULT_FILE_STORE_SCAN_WORKERS,
+    DEFAULT_FILE_STORE_SHARD_MAX_BYTES,
+    DEFAULT_FILE_STORE_SHARD_MAX_CHUNKS,
+    DEFAULT_FILE_STORE_WRITE_WORKERS,
+    FILE_STORE_STALE_BUILD_SECONDS,
+)
+from llm_lab.observability.deadline import (
+    RETRIEVE_STAGE,
+    check_deadline,
+    deadline_exceeded,
+)
+from llm_lab.vector_store.file.catalog import DatasetCatalog
+from llm_lab.vector_store.file.chunk_table import ChunkTable, ChunkTableWriter
+from llm_lab.vector_store.file.dataset_cache import DatasetCache
+from llm_lab.vector_store.file.scan import ParallelScanner, Vectors, normalize_rows
+from llm_lab.vector_store.file.types import (
+    IndexFile,
+    ManifestDocRange,
+    ManifestFile,
+    ManifestIndexFile,
+)
+from llm_lab.vector_store.types import (
+    DatasetInfo,
+    DatasetStats,
+    IndexedChunk,
+    QueryFilter,
+    ScoredChunk,
+    VectorStoreClient,
+)
 
-MAX_CHUNKS_PER_INDEX_FILE = 10
+INDEX_DIR_PREFIX = "indexes"
+VECTORS_FILE_NAME = "vectors.f32"
+# Little-endian float32, fixed so vector files are portable between machines.
+VECTOR_DTYPE = np.dtype("<f4")
 
 
-def _create_dest_dir(dest_dir: Path) -> None:
-    """Create destination directory, removing it first if it exists."""
+def _write_index_file(path: Path, index_id: str, chunk_jsons: list[bytes]) -> None:
+    """Write an IndexFile from already serialized chunks, without indentation."""
+    with path.open("wb") as f:
+        f.write(b'{"index_id":%s,"chunks":[' % json.dumps(index_id).encode())
+        f.write(b",".join(chunk_jsons))
+        f.write(b"]}")
+
+
+def _write_text_atomically(path: Path, text: str) -> None:
+    """Replace path with text, so readers see either the old or the new content.
+
+    Each write goes through its own temp file, so concurrent writers of the same
+    path never rename each other's half-written content into place.
+    """
+    with tempfile.NamedTemporaryFile(
+        "w",
+        encoding="utf-8",
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        suffix=".tmp",
+        delete=False,
+    ) as tmp_file:
+        tmp_file.write(text)
     try:
-        if dest_dir.exists():
-            shutil.rmtree(dest_dir)
-        dest_dir.mkdir(parents=True, exist_ok=True)
-    except (FileExistsError, PermissionError) as e:
-        raise ValueError(
-            f"Could not create destination directory {dest_dir}: {e}"
-        ) from e
+        os.replace(tmp_file.name, path)
+    except OSError:
+        Path(tmp_file.name).unlink(missing_ok=True)
+        raise
+
+
+def _last_modified(path: Path) -> float:
+    """Latest modification time of a directory and the files directly in it."""
+    return max(
+        [path.stat().st_mtime, *(child.stat().st_mtime for child in path.iterdir())]
+    )
 
 
-def _cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
-    """Calculate cosine similarity between two embedding vectors."""
-    if len(a) != len(b):
-        raise ValueError("Embedding vectors must have the same length")
+def _remove_stale_index_dirs(dataset_dir: Path, keep: set[str]) -> None:
+    """Delete index directories of older builds and of builds that crashed.
 
-    dot_product = sum(x * y for x, y in zip(a, b, strict=False))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(y * y for y in b))
+    Unpublished build directories are only deleted once they have not been written
+    to for FILE_STORE_STALE_BUILD_SECONDS, so builds still running are left alone.
+    """
+    stale_before = time.time() - FILE_STORE_STALE_BUILD_SECONDS
+    for path in dataset_dir.iterdir():
+        if path.name in keep or not path.is_dir():
+            continue
+        if path.name.startswith(f".{INDEX_DIR_PREFIX}"):
+            with contextlib.suppress(FileNotFoundError):
+                if _last_modified(path) < stale_before:
+                    shutil.rmtree(path, ignore_errors=True)
+        elif path.name.startswith(INDEX_DIR_PREFIX):
+            shutil.rmtree(path, ignore_errors=True)
 
-    if norm_a == 0.0 or norm_b == 0.0:
-        # should not happen with real embeddings, but guard anyway
-        return 0.0
 
-    return dot_product / (norm_a * norm_b)
+class _IndexFileWriter:
+    """Pack serialized chunks into index files and write them on a thread pool.
+
+    An index file is cut once it holds max_chunks chunks or would grow past
+    max_bytes. At most `workers` index files are waiting to be written at once, so
+    memory stays bounded however fast chunks come in. Embeddings are not part of
+    the index files: they are normalized and appended to a single raw vector file,
+    one row per chunk, which readers map into memory.
+    """
+
+    def __init__(
+        self, index_dir: Path, max_chunks: int, max_bytes: int | None, workers: int
+    ) -> None:
+        self.index_dir = index_dir
+        self.max_chunks = max_chunks
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.index_files: list[ManifestIndexFile] = []
+        self.dimension: int | None = None
+        self._chunk_jsons: list[bytes] = []
+        self._embeddings: list[list[float]] = []
+        self._size = 0
+        self._pending: deque[Future[None]] = deque()
+        self._vectors_file = (index_dir / VECTORS_FILE_NAME).open("wb")
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="file-store-write"
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._executor.shutdown(cancel_futures=True)
+        self._vectors_file.close()
+
+    def add(self, chunk: IndexedChunk) -> None:
+        if self.dimension is None:
+            self.dimension = len(chunk.embedding)
+        elif len(chunk.embedding) != self.dimension:
+            raise ValueError(
+                f"Chunk {chunk.source} has {len(chunk.embedding)} dimensions, "
+                f"expected {self.dimension}"
+            )
+        chunk_json = chunk.model_dump_json(exclude={"embedding"}).encode()
+        if (
+            self._chunk_jsons
+            and self.max_bytes is not None
+            and self._size + len(chunk_json) > self.max_bytes
+        ):
+            self._flush()
+        self._chunk_jsons.append(chunk_json)
+        self._embeddings.append(chunk.embedding)
+        self._size += len(chunk_json) + 1
+        if len(self._chunk_jsons) >= self.max_chunks:
+            self._flush()
+
+    def _flush(self) -> None:
+        vectors = normalize_rows(self._embeddings).astype(VECTOR_DTYPE, copy=False)
+        self._vectors_file.write(vectors.tobytes())
+        index_id = f"index-{len(self.index_files):04}"
+        path = f"{index_id}.json"
+        self.index_files.append(
+            ManifestIndexFile(
+                index_id=index_id, path=path, num_chunks=len(self._chunk_jsons)
+            )
+        )
+        if len(self._pending) >= self.workers:
+            self._pending.popleft().result()
+        self._pending.append(
+            self._executor.submit(
+                _write_index_file, self.index_dir / path, index_id, self._chunk_jsons
+            )
+        )
+        self._chunk_jsons = []
+        self._embeddings = []
+        self._size = 0
+
+    def finish(self) -> list[ManifestIndexFile]:
+        """Write the last index file and wait until every file is written."""
+        if self._chunk_jsons:
+            self._flush()
+        while self._pending:
+            self._pending.popleft().result()
+        self._vectors_file.close()
+        return self.index_files
 
 
 def _load_manifest(manifest_path: Path) -> ManifestFile:
@@ -60,95 +215,313 @@ def _load_manifest(manifest_path: Path) -> ManifestFile:
         ) from err
 
 
+def _load_index_file(index_file_path: Path) -> list[IndexedChunk]:
+    """Load and validate the chunks of a single index file."""
+    if not index_file_path.exists():
+        raise FileNotFoundError(
+            f"Index file {index_file_path} not found, make sure to index the dataset first."
+        )
+    try:
+        index_file_data = index_file_path.read_text(encoding="utf-8")
+        index_file_validated_data = IndexFile.model_validate_json(index_file_data)
+    except ValidationError as err:
+        raise ValueError(
+            f"Index file at {index_file_path} is malformed: {err}"
+        ) from err
+    return index_file_validated_data.chunks
+
+
 def _load_indexed_chunks(
-    indexed_chunks_dir: Path, manifest_path: Path
+    dataset_dir: Path, manifest: ManifestFile
 ) -> list[IndexedChunk]:
-    """Load indexed chunks from the dataset directory."""
-    manifest = _load_manifest(manifest_path)
+    """Load all indexed chunks listed in the manifest, in row order."""
+    indexed_chunks_dir = dataset_dir / manifest.index_dir
     indexed_chunks = []
     for index_file in manifest.index_files:
-        index_file_path = indexed_chunks_dir / index_file.path
-        if not index_file_path.exists():
-            raise FileNotFoundError(
-                f"Index file {index_file_path} not found, make sure to index the dataset first."
-            )
-        try:
-            index_file_data = index_file_path.read_text(encoding="utf-8")
-            index_file_validated_data = IndexFile.model_validate_json(index_file_data)
-        except ValidationError as err:
-            raise ValueError(
-                f"Index file at {index_file_path} is malformed: {err}"
-            ) from err
-        index_file_chunks = index_file_validated_data.chunks
-        indexed_chunks.extend(index_file_chunks)
+        indexed_chunks.extend(_load_index_file(indexed_chunks_dir / index_file.path))
     return indexed_chunks
 
 
+class _DocRangeBuilder:
+    """Group consecutive rows of the same document into row ranges, row by row."""
+
+    def __init__(self) -> None:
+        self.doc_ranges: list[ManifestDocRange] = []
+
+    def add(self, row: int, chunk: IndexedChunk) -> None:
+        doc_ranges = self.doc_ranges
+        if doc_ranges and doc_ranges[-1].doc_path == chunk.doc_path:
+            doc_ranges[-1].end_row = row + 1
+        else:
+            doc_ranges.append(
+                ManifestDocRange(
+                    doc_path=chunk.doc_path, start_row=row, end_row=row + 1
+                )
+            )
+
+
+def _build_doc_ranges(indexed_chunks: list[IndexedChunk]) -> list[ManifestDocRange]:
+    """Group consecutive rows of the same document into row ranges."""
+    builder = _DocRangeBuilder()
+    for row, chunk in enumerate(indexed_chunks):
+        builder.add(row, chunk)
+    return builder.doc_ranges
+
+
+def _select_row_ranges(
+    table: ChunkTable, query_filter: QueryFilter
+) -> list[tuple[int, int]]:
+    """Resolve a query filter to row ranges using the doc range index.
+
+    Chunk ids increase within a document range but have gaps where duplicate chunks
+    were left out, so chunk id bounds are binary searched in the range's chunk ids
+    instead of requiring a per-row check.
+    """
+    row_ranges = []
+    for doc_range in table.doc_ranges:
+        if not query_filter.matches_doc_path(doc_range.doc_path):
+            continue
+        start, end = doc_range.start_row, doc_range.end_row
+        chunk_ids = table.chunk_ids[start:end]
+        if query_filter.chunk_id_min is not None:
+            start += int(np.searchsorted(chunk_ids, query_filter.chunk_id_min))
+        if query_filter.chunk_id_max is not None:
+            end = doc_range.start_row + int(
+                np.searchsorted(chunk_ids, query_filter.chunk_id_max, side="right")
+            )
+        if start < end:
+            row_ranges.append((start, end))
+    return row_ranges
+
+
+def _map_vectors(dataset_dir: Path, manifest: ManifestFile) -> Vectors | None:
+    """Map the dataset's vector file read-only, None if the index files hold them.
+
+    The mapping is backed by the page cache, so every process serving the dataset
+    shares a single copy of the vectors instead of loading its own.
+    """
+    if manifest.vectors_file is None:
+        return None
+    if manifest.total_chunks == 0:
+        return np.empty((0, manifest.dimension or 0), dtype=VECTOR_DTYPE)
+    return np.memmap(
+        dataset_dir / manifest.index_dir / manifest.vectors_file,
+        dtype=VECTOR_DTYPE,
+        mode="r",
+        shape=(manifest.total_chunks, manifest.dimension or 0),
+    )
+
+
+class _LoadedDataset:
+    """A stored dataset, ready to be scanned.
+
+    The normalized embeddings are a float32 matrix and the chunk metadata a
+    ChunkTable, one row per chunk in both. Both are mapped from the files of the
+    index directory; indexes written before those files existed are read from
+    their index files instead.
+    """
+
+    def __init__(
+        self, manifest: ManifestFile, vectors: Vectors, table: ChunkTable
+    ) -> None:
+        self.manifest = manifest
+        self.vectors = vectors
+        self.table = table
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate memory used, counting mapped files in full."""
+        return self.vectors.nbytes + self.table.nbytes
+
+
+def _read_dataset(dataset_dir: Path) -> _LoadedDataset:
+    manifest = _load_manifest(dataset_dir / "manifest.json")
+    vectors = _map_vectors(dataset_dir, manifest)
+    if vectors is not None and manifest.chunk_table:
+        table = ChunkTable.map(dataset_dir / manifest.index_dir, manifest.doc_ranges)
+        return _LoadedDataset(manifest, vectors, table)
+    indexed_chunks = _load_indexed_chunks(dataset_dir, manifest)
+    if vectors is None:
+        vectors = normalize_rows([chunk.embedding for chunk in indexed_chunks])
+    # Manifests written before the doc range index existed get it rebuilt here.
+    doc_ranges = manifest.doc_ranges or _build_doc_ranges(indexed_chunks)
+    table = ChunkTable.from_chunks(indexed_chunks, doc_ranges)
+    return _LoadedDataset(manifest, vectors, table)
+
+
+@lru_cache
+def shared_dataset_cache(
+    reload_interval_seconds: float,
+) -> DatasetCache[_LoadedDataset]:
+    """Process-wide loaded datasets, shared by every client."""
+    return DatasetCache(_read_dataset, reload_interval_seconds)
+
+
+@lru_cache
+def shared_dataset_catalog(
+    dest_dir: Path, refresh_interval_seconds: float
+) -> DatasetCatalog:
+    """Process-wide metadata of the datasets under dest_dir, shared by every client."""
+    return DatasetCatalog(dest_dir, _load_manifest, refresh_interval_seconds)
+
+
 class FileStoreClient(VectorStoreClient):
     """File-based implementation of VectorStoreClient."""
 
-    def __init__(self, dest_dir: Path = DEFAULT_DESTINATION_DIR) -> None:
+    def __init__(
+        self,
+        dest_dir: Path = DEFAULT_DESTINATION_DIR,
+        scan_workers: int = DEFAULT_FILE_STORE_SCAN_WORKERS,
+        shard_max_chunks: int = DEFAULT_FILE_STORE_SHARD_MAX_CHUNKS,
+        shard_max_bytes: int | None = DEFAULT_FILE_STORE_SHARD_MAX_BYTES,
+        write_workers: int = DEFAULT_FILE_STORE_WRITE_WORKERS,
+        reload_interval_seconds: float = DEFAULT_FILE_STORE_RELOAD_INTERVAL_SECONDS,
+    ) -> None:
         self.dest_dir = dest_dir
+        self.scanner = ParallelScanner(workers=scan_workers)
+        self.shard_max_chunks = shard_max_chunks
+        self.shard_max_bytes = shard_max_bytes
+        self.write_workers = write_workers
+        self.datasets = shared_dataset_cache(reload_interval_seconds)
+        self.catalog = shared_dataset_catalog(dest_dir, reload_interval_seconds)
 
     def get_embedding_model(self, dataset: str) -> str:
         """Get the embedding model used for the dataset."""
-        manifest_path = self.dest_dir / dataset / "manifest.json"
-        return _load_manifest(manifest_path).embedding_model
+        info = self.catalog.get(dataset)
+        if info is None:
+            raise FileNotFoundError(
+                f"Manifest file not found at {self.dest_dir / dataset / 'manifest.json'}, "
+                "make sure to index the dataset first."
+            )
+        return info.embedding_model
+
+    def get_dataset_info(self, dataset: str) -> DatasetInfo | None:
+        """Describe the dataset from its cached manifest."""
+        return self.catalog.get(dataset)
+
+    def list_datasets(self) -> list[DatasetInfo]:
+        """Describe every dataset of the store directory from the cached manifests."""
+        return self.catalog.list()
+
+    def get_index_version(self, dataset: str, embedding_model: str) -> str | None:
+        """Use the manifest creation time as the version of the loaded index."""
+        with self.datasets.lease(self.dest_dir / dataset) as loaded:
+            return loaded.manifest.created_at.isoformat()
+
+    def warm_up(self, dataset: str, embedding_model: str) -> DatasetStats:
+        """Load the dataset into memory ahead of the first query."""
+        with self.datasets.lease(self.dest_dir / dataset) as loaded:
+            return DatasetStats(
+                chunk_count=len(loaded.table),
+                memory_bytes=loaded.memory_bytes,
+                index_version=loaded.manifest.created_at.isoformat(),
+            )
+
+    def reload(self, dataset: str) -> str:
+        """Load the published version of the dataset now and return its version."""
+        loaded = self.datasets.reload(self.dest_dir / dataset)
+        return loaded.manifest.created_at.isoformat()
 
     def store(
         self,
-        indexed_chunks: list[IndexedChunk],
+        indexed_chunks: Iterable[IndexedChunk],
         dataset: str,
         embedding_model: str,
         docs_count: int,
     ) -> None:
-        """Store the indexed chunks into a file based indexed chunk store."""
-        manifest_file = self.dest_dir / dataset / "manifest.json"
-        index_creation_dir = self.dest_dir / dataset / "indexes"
-        _create_dest_dir(index_creation_dir)
+        """Store the indexed chunks into a file based indexed chunk store.
+
+        Chunks are consumed lazily and written out one index file at a time, so
+        only a few index files worth of chunks are held in memory. The index files
+        are written to a temporary directory, which is renamed into place once
+        complete; the manifest pointing at it is then replaced atomically. Readers
+        thus see either the previous index or the new one, never a partial one,
+        and a failed build leaves the previous index in place.
+
+        The previous index is kept on disk for servers still serving it until they
+        reload; older ones are deleted, as are builds that crashed long ago.
+        """
+        dataset_dir = self.dest_dir / dataset
+        dataset_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.now(tz=UTC)
-        file_counter = 0
-        manifest_index_files = []
-        for idx in range(0, len(indexed_chunks), MAX_CHUNKS_PER_INDEX_FILE):
-            chunk_slice = indexed_chunks[idx : idx + MAX_CHUNKS_PER_INDEX_FILE]
-            index_id = f"index-{file_counter:04}"
-            index_file_name = f"{index_id}.json"
-            index_path = index_creation_dir / index_file_name
-            index_data = IndexFile(
-                index_id=index_id,
-                chunks=chunk_slice,
-            )
-            index_path.write_text(index_data.model_dump_json(indent=2))
-            manifest_index_files.append(
-                ManifestIndexFile(
-                    index_id=index_id,
-                    path=str(index_path.relative_to(index_creation_dir)),
-                    num_chunks=len(chunk_slice),
-                )
-            )
-            file_counter += 1  # noqa: SIM113
+        doc_ranges = _DocRangeBuilder()
+        build_dir = Path(
+            tempfile.mkdtemp(prefix=f".{INDEX_DIR_PREFIX}-", dir=dataset_dir)
+        )
+        try:
+            with (
+                _IndexFileWriter(
+                    build_dir,
+                    self.shard_max_chunks,
+                    self.shard_max_bytes,
+                    self.write_workers,
+                ) as writer,
+                ChunkTableWriter(build_dir) as table_writer,
+            ):
+                for row, chunk in enumerate(indexed_chunks):
+                    doc_ranges.add(row, chunk)
+                    writer.add(chunk)
+                    table_writer.add(chunk)
+                index_files = writer.finish()
+                dimension = writer.dimension
+            index_dir = dataset_dir / f"{INDEX_DIR_PREFIX}-{timestamp:%Y%m%dT%H%M%S%fZ}"
+            build_dir.rename(index_dir)
+        except BaseException:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
         manifest = ManifestFile(
             dataset=dataset,
             embedding_model=embedding_model,
             created_at=timestamp,
             total_docs=docs_count,
-            total_chunks=len(indexed_chunks),
-            index_files=manifest_index_files,
+            total_chunks=sum(index_file.num_chunks for index_file in index_files),
+            index_dir=index_dir.name,
+            vectors_file=VECTORS_FILE_NAME,
+            chunk_table=True,
+            dimension=dimension,
+            index_files=index_files,
+            doc_ranges=doc_ranges.doc_ranges,
         )
-        manifest_file.write_text(manifest.model_dump_json(indent=2))
+        manifest_path = dataset_dir / "manifest.json"
+        previous_index_dir = None
+        with contextlib.suppress(FileNotFoundError, ValueError):
+            previous_index_dir = _load_manifest(manifest_path).index_dir
+        _write_text_atomically(manifest_path, manifest.model_dump_json(indent=2))
+        self.datasets.discard(dataset_dir)
+        self.catalog.invalidate(dataset)
+        keep = {index_dir.name}
+        if previous_index_dir is not None:
+            keep.add(previous_index_dir)
+        _remove_stale_index_dirs(dataset_dir, keep)
 
-    def query(self, dataset: str, query_embedding: list[float]) -> list[ScoredChunk]:
+    def query(
+        self,
+        dataset: str,
+        embedding_model: str,
+        query_embedding: list[float],
+        limit: int,
+        query_filter: QueryFilter | None = None,
+        score_threshold: float | None = None,
+    ) -> list[ScoredChunk]:
         """Query the vector store and return a list of the top_k most relevant chunks."""
-        manifest_file = self.dest_dir / dataset / "manifest.json"
-        index_creation_dir = self.dest_dir / dataset / "indexes"
-        scored_chunks = []
-        indexed_chunks = _load_indexed_chunks(index_creation_dir, manifest_file)
-        for chunk in indexed_chunks:
-            score = _cosine_similarity(query_embedding, chunk.embedding)
-            scored_chunks.append(
-                ScoredChunk(
-                    score=score,
-                    indexed_chunk=chunk,
+        with self.datasets.lease(self.dest_dir / dataset) as loaded:
+            if not len(loaded.table):
+                return []
+            row_ranges = None
+            if query_filter is not None:
+                row_ranges = _select_row_ranges(loaded.table, query_filter)
+            try:
+                hits = self.scanner.top_k(
+                    loaded.vectors,
+                    query_embedding,
+                    limit,
+                    row_ranges,
+                    timeout=check_deadline(RETRIEVE_STAGE),
                 )
-            )
-        return scored_chunks
+            except TimeoutError as err:
+                raise deadline_exceeded(RETRIEVE_STAGE) from err
+            return [
+                ScoredChunk(score=score, indexed_chunk=loaded.table.chunk(row))
+                for score, row in hits
+                if score_threshold is None or score >= score_threshold
+            ]
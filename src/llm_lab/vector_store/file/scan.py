@@ -0,0 +1,135 @@
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+
+import numpy as np
+import numpy.typing as npt
+
+from llm_lab.config.variables import DEFAULT_SCAN_SHARD_ROWS
+
+type Vectors = npt.NDArray[np.float32]
+
+
+def normalize_rows(vectors: npt.ArrayLike) -> Vectors:
+    """Scale each row to unit length so dot products are cosine similarities.
+
+    All-zero rows are left as zeros and therefore score 0 against any query.
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return matrix / norms
+
+
+@lru_cache
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    """Process-wide scan pool, shared by every scanner with the same worker count."""
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="file-scan")
+
+
+def _split_ranges(
+    row_ranges: list[tuple[int, int]], shard_rows: int
+) -> list[tuple[int, int]]:
+    """Split row ranges into shards of at most shard_rows rows."""
+    shards = []
+    for start, end in row_ranges:
+        for shard_start in range(start, end, shard_rows):
+            shards.append((shard_start, min(shard_start + shard_rows, end)))
+    return shards
+
+
+def _score_shard(
+    vectors: Vectors, query: Vectors, start: int, end: int, limit: int
+) -> list[tuple[float, int]]:
+    """Return the top `limit` (score, row) pairs of one row shard."""
+    scores = vectors[start:end] @ query
+    if limit < len(scores):
+        top = np.argpartition(scores, -limit)[-limit:]
+    else:
+        top = np.arange(len(scores))
+    return [(float(scores[i]), start + int(i)) for i in top]
+
+
+class ParallelScanner:
+    """Exact top-k scan over a normalized embedding matrix.
+
+    The matrix is split into row shards that are scored concurrently on a shared
+    thread pool; numpy releases the GIL during the matrix products, so shards run
+    in parallel on separate cores without copying the matrix. Per-shard top-k
+    results are merged with a heap.
+    """
+
+    def __init__(self, workers: int = 1, shard_rows: int = DEFAULT_SCAN_SHARD_ROWS):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if shard_rows < 1:
+            raise ValueError("shard_rows must be at least 1")
+        self.workers = workers
+        self.shard_rows = shard_rows
+
+    def top_k(
+        self,
+        vectors: Vectors,
+        query_embedding: list[float],
+        limit: int,
+        row_ranges: list[tuple[int, int]] | None = None,
+        timeout: float | None = None,
+    ) -> list[tuple[float, int]]:
+        """Return the `limit` best (score, row) pairs, highest score first.
+
+        If row_ranges is provided, only rows inside those [start, end) ranges are
+        scored. If the scan takes longer than timeout seconds, shards not yet
+        started are cancelled and TimeoutError is raised.
+        """
+        if len(query_embedding) != vectors.shape[1]:
+            raise ValueError("Embedding vectors must have the same length")
+        if limit < 1:
+            return []
+        query = normalize_rows(query_embedding)[0]
+        if row_ranges is None:
+            row_ranges = [(0, vectors.shape[0])]
+        shard_rows = self.shard_rows
+        if self.workers > 1:
+            # Make sure there are enough shards to keep every worker busy.
+            total_rows = sum(end - start for start, end in row_ranges)
+            shard_rows = max(1, min(shard_rows, -(-total_rows // self.workers)))
+        shards = _split_ranges(row_ranges, shard_rows)
+        if self.workers == 1 or len(shards) == 1:
+            results = self._scan_serially(vectors, query, shards, limit, timeout)
+        else:
+            executor = _get_executor(self.workers)
+            futures = [
+                executor.submit(_score_shard, vectors, query, start, end, limit)
+                for start, end in shards
+            ]
+            _, not_done = wait(futures, timeout=timeout)
+            if not_done:
+                for future in not_done:
+                    future.cancel()
+                raise TimeoutError(f"Scan did not finish within {timeout:g}s")
+            results = [future.result() for future in futures]
+        # Ties go to the lower row, matching a stable sort over the whole dataset.
+        return heapq.nlargest(
+            limit,
+            (hit for shard_hits in results for hit in shard_hits),
+            key=lambda hit: (hit[0], -hit[1]),
+        )
+
+    @staticmethod
+    def _scan_serially(
+        vectors: Vectors,
+        query: Vectors,
+        shards: list[tuple[int, int]],
+        limit: int,
+        timeout: float | None,
+    ) -> list[list[tuple[float, int]]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = []
+        for start, end in shards:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Scan did not finish within {timeout:g}s")
+            results.append(_score_shard(vectors, query, start, end, limit))
+        return results
@@ -17,13 +17,23 @@ class ManifestIndexFile(BaseModel):
         description='Unique identifier for the index (e.g., "index-0001").'
     )
     path: str = Field(
-        description='Relative path to the index file (e.g., "index-0001.json").'
+        description='Path to the index file relative to index_dir (e.g., "index-0001.json").'
     )
     num_chunks: int = Field(
         description="Number of chunks contained within this index file."
     )
 
 
+class ManifestDocRange(BaseModel):
+    doc_path: str = Field(description="The document path the rows belong to.")
+    start_row: int = Field(
+        description="Index of the first row of the document across all index files."
+    )
+    end_row: int = Field(
+        description="Index one past the last row of the document across all index files."
+    )
+
+
 class ManifestFile(BaseModel):
     dataset: str = Field(
         description="The name of the dataset to which this manifest belongs, as passed to the CLI."
@@ -40,6 +50,26 @@ class ManifestFile(BaseModel):
     total_chunks: int = Field(
         description="The total number of chunks across all documents and index files in this manifest."
     )
+    index_dir: str = Field(
+        default="indexes",
+        description="Directory holding the index files, relative to the dataset directory.",
+    )
+    vectors_file: str | None = Field(
+        default=None,
+        description="Raw little-endian float32 file of the normalized embeddings, one row per chunk, "
+        "relative to index_dir. None when the index files hold the embeddings.",
+    )
+    dimension: int | None = Field(
+        default=None, description="Number of dimensions of each embedding."
+    )
+    chunk_table: bool = Field(
+        default=False,
+        description="Whether index_dir holds the chunk metadata as column files, which are read instead of the index files.",
+    )
     index_files: list[ManifestIndexFile] = Field(
         description="A list of index file entries, each detailing an index shard."
     )
+    doc_ranges: list[ManifestDocRange] = Field(
+        default_factory=list,
+        description="Contiguous row ranges per document, used to pre-filter queries.",
+    )
@@ -1,70 +1,562 @@
+import functools
+import itertools
+import math
 import re
+import time
+import typing
 import uuid
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import UTC, datetime
 
+from pydantic import BaseModel, ConfigDict, Field
 from qdrant_client import QdrantClient, models
 
-from llm_lab.config.variables import DEFAULT_QDRANT_CLIENT_URL
-from llm_lab.vector_store.types import IndexedChunk, ScoredChunk, VectorStoreClient
+from llm_lab.config.settings import QdrantQuantization, QdrantTenantMode
+from llm_lab.config.variables import (
+    DEFAULT_QDRANT_CLIENT_URL,
+    DEFAULT_QDRANT_TENANT_PAYLOAD_M,
+    DEFAULT_QDRANT_UPLOAD_BATCH_SIZE,
+    DEFAULT_QDRANT_UPLOAD_MAX_RETRIES,
+    DEFAULT_QDRANT_UPLOAD_WORKERS,
+    EMBEDDING_MODEL_DIMENSIONS,
+    MAX_FILTER_DOC_PATHS,
+    MAX_MIGRATION_DATASETS,
+    QDRANT_UPLOAD_RETRY_BACKOFF_SECONDS,
+)
+from llm_lab.observability.deadline import (
+    RETRIEVE_STAGE,
+    check_deadline,
+    deadline_exceeded,
+    is_expired,
+)
+from llm_lab.vector_store.types import (
+    DatasetInfo,
+    DatasetStats,
+    DocPathFilterLimitError,
+    IndexedChunk,
+    QueryFilter,
+    ScoredChunk,
+    VectorStoreClient,
+)
+
+# Only the fields needed to build the response; vectors are never fetched.
+QUERY_PAYLOAD_FIELDS = ["text", "source", "chunk_id", "doc_path", "alternate_sources"]
 
 
 def _build_collection_name(collection_name: str) -> str:
     return re.sub(r"[^a-zA-Z0-9]", "-", collection_name).lower()
 
 
-def _create_collection(client: QdrantClient, collection_name: str) -> None:
+def _tenant_collection_name(
+    embedding_model: str, dataset: str, tenant_mode: QdrantTenantMode
+) -> str:
+    """Name of the collection holding a dataset under the given tenant layout."""
+    if tenant_mode == QdrantTenantMode.COLLECTION:
+        return _build_collection_name(f"{embedding_model}-{dataset}")
+    if tenant_mode == QdrantTenantMode.SHARD_KEY:
+        return _build_collection_name(f"{embedding_model}-sharded")
+    return _build_collection_name(embedding_model)
+
+
+def _index_version_key(dataset: str) -> str:
+    """Collection metadata key holding the index version of a dataset."""
+    return f"index_version:{dataset}"
+
+
+def _shard_key_selector(dataset: str, tenant_mode: QdrantTenantMode) -> str | None:
+    return dataset if tenant_mode == QdrantTenantMode.SHARD_KEY else None
+
+
+class QdrantCollectionConfig(BaseModel):
+    """Storage and index settings applied when a collection is created."""
+
+    model_config = ConfigDict(frozen=True)
+
+    quantization: QdrantQuantization = Field(default=QdrantQuantization.NONE)
+    on_disk_vectors: bool = Field(
+        default=False, description="Keep original vectors on disk instead of in RAM."
+    )
+    hnsw_m: int | None = Field(default=None, description="HNSW graph degree.", gt=0)
+    hnsw_ef_construct: int | None = Field(
+        default=None, description="HNSW build-time beam size.", gt=0
+    )
+
+
+class QdrantSearchConfig(BaseModel):
+    """Query-time search settings."""
+
+    model_config = ConfigDict(frozen=True)
+
+    hnsw_ef: int | None = Field(
+        default=None, description="HNSW query-time beam size.", gt=0
+    )
+    oversampling: float | None = Field(
+        default=None,
+        description="Candidates fetched per result from quantized vectors.",
+        ge=1.0,
+    )
+    rescore: bool | None = Field(
+        default=None,
+        description="Rescore quantized candidates with the original vectors.",
+    )
+
+
+def _build_quantization_config(
+    quantization: QdrantQuantization,
+) -> models.ScalarQuantization | models.BinaryQuantization | None:
+    if quantization == QdrantQuantization.SCALAR:
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+            )
+        )
+    if quantization == QdrantQuantization.BINARY:
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    return None
+
+
+def _build_search_params(
+    search_config: QdrantSearchConfig,
+) -> models.SearchParams | None:
+    quantization = None
+    if search_config.oversampling is not None or search_config.rescore is not None:
+        quantization = models.QuantizationSearchParams(
+            oversampling=search_config.oversampling, rescore=search_config.rescore
+        )
+    if search_config.hnsw_ef is None and quantization is None:
+        return None
+    return models.SearchParams(hnsw_ef=search_config.hnsw_ef, quantization=quantization)
+
+
+def _build_hnsw_config(
+    collection_config: QdrantCollectionConfig, tenant_mode: QdrantTenantMode
+) -> models.HnswConfigDiff | None:
+    """HNSW settings; the payload tenant layout builds one graph per dataset only."""
+    if tenant_mode == QdrantTenantMode.PAYLOAD:
+        return models.HnswConfigDiff(
+            m=0,
+            payload_m=collection_config.hnsw_m or DEFAULT_QDRANT_TENANT_PAYLOAD_M,
+            ef_construct=collection_config.hnsw_ef_construct,
+        )
+    if collection_config.hnsw_m is None and collection_config.hnsw_ef_construct is None:
+        return None
+    return models.HnswConfigDiff(
+        m=collection_config.hnsw_m, ef_construct=collection_config.hnsw_ef_construct
+    )
+
+
+def _dataset_index_schema(
+    tenant_mode: QdrantTenantMode,
+) -> models.KeywordIndexParams | models.PayloadSchemaType:
+    if tenant_mode == QdrantTenantMode.PAYLOAD:
+        return models.KeywordIndexParams(
+            type=models.KeywordIndexType.KEYWORD, is_tenant=True
+        )
+    return models.PayloadSchemaType.KEYWORD
+
+
+def _enable_payload_tenancy(
+    client: QdrantClient,
+    collection_name: str,
+    collection_config: QdrantCollectionConfig,
+) -> None:
+    """Switch an existing shared collection to per-dataset HNSW graphs."""
+    client.create_payload_index(
+        collection_name,
+        field_name="dataset",
+        field_schema=_dataset_index_schema(QdrantTenantMode.PAYLOAD),
+    )
+    client.update_collection(
+        collection_name,
+        hnsw_config=_build_hnsw_config(collection_config, QdrantTenantMode.PAYLOAD),
+    )
+
+
+def _resolve_vector_size(embedding_model: str, first_chunk: IndexedChunk | None) -> int:
+    """Take the vector size from a stored embedding, falling back to the model."""
+    if first_chunk is not None and first_chunk.embedding:
+        return len(first_chunk.embedding)
+    if embedding_model in EMBEDDING_MODEL_DIMENSIONS:
+        return EMBEDDING_MODEL_DIMENSIONS[embedding_model]
+    raise ValueError(f"Unknown vector size for embedding model {embedding_model}")
+
+
+def _create_collection(
+    client: QdrantClient,
+    collection_name: str,
+    vector_size: int,
+    collection_config: QdrantCollectionConfig | None = None,
+    tenant_mode: QdrantTenantMode = QdrantTenantMode.PAYLOAD,
+) -> None:
     if client.collection_exists(collection_name):
         return
     else:
+        collection_config = collection_config or QdrantCollectionConfig()
         try:
             client.create_collection(
                 collection_name,
                 vectors_config=models.VectorParams(
-                    # TO-DO: Get the dimension from the model
-                    size=3072,
+                    size=vector_size,
                     distance=models.Distance.COSINE,
+                    on_disk=collection_config.on_disk_vectors or None,
                 ),
+                hnsw_config=_build_hnsw_config(collection_config, tenant_mode),
+                quantization_config=_build_quantization_config(
+                    collection_config.quantization
+                ),
+                sharding_method=models.ShardingMethod.CUSTOM
+                if tenant_mode == QdrantTenantMode.SHARD_KEY
+                else None,
             )
             client.create_payload_index(
                 collection_name,
                 field_name="dataset",
+                field_schema=_dataset_index_schema(tenant_mode),
+            )
+            client.create_payload_index(
+                collection_name,
+                field_name="doc_path",
                 field_schema=models.PayloadSchemaType.KEYWORD,
             )
+            client.create_payload_index(
+                collection_name,
+                field_name="chunk_id",
+                field_schema=models.PayloadSchemaType.INTEGER,
+            )
         except Exception as err:
             raise RuntimeError(
                 f"Failed to create collection {collection_name}: {err}"
             ) from err
 
 
+def _build_point(
+    chunk: IndexedChunk, dataset: str, embedding_model: str
+) -> models.PointStruct:
+    """Build a point whose id is derived from its content, so re-uploads are idempotent."""
+    hash_id_text = f"{dataset}-{embedding_model}-{chunk.source}"
+    point_id = uuid.uuid5(namespace=uuid.NAMESPACE_DNS, name=hash_id_text)
+    return models.PointStruct(
+        id=point_id,
+        payload={
+            "dataset": dataset,
+            "text": chunk.text,
+            "source": chunk.source,
+            "chunk_id": chunk.chunk_id,
+            "doc_path": chunk.doc_path,
+            "alternate_sources": chunk.alternate_sources,
+        },
+        vector=chunk.embedding,
+    )
+
+
+def _dataset_condition(dataset: str) -> models.FieldCondition:
+    return models.FieldCondition(
+        key="dataset",
+        match=models.MatchValue(value=dataset),
+    )
+
+
+def _needs_doc_path_resolution(query_filter: QueryFilter | None) -> bool:
+    """Prefix and glob conditions have no Qdrant equivalent and must be resolved."""
+    return query_filter is not None and (
+        query_filter.doc_path_prefix is not None
+        or query_filter.doc_path_glob is not None
+    )
+
+
+def _doc_path_facet_filter(dataset: str) -> models.Filter:
+    return models.Filter(must=[_dataset_condition(dataset)])
+
+
+def _matching_facet_doc_paths(
+    facet: models.FacetResponse, dataset: str, query_filter: QueryFilter
+) -> list[str]:
+    """Doc paths of the facet matching the filter.
+
+    The facet is fetched with room for one path more than the cap, so a dataset
+    with too many documents is detected instead of its extra paths being dropped.
+    """
+    if len(facet.hits) > MAX_FILTER_DOC_PATHS:
+        raise DocPathFilterLimitError(
+            f"Dataset {dataset} has more than {MAX_FILTER_DOC_PATHS} documents, "
+            "too many to apply doc_path_prefix or doc_path_glob filters; "
+            "list the documents in doc_paths instead"
+        )
+    return [
+        str(hit.value)
+        for hit in facet.hits
+        if query_filter.matches_doc_path(str(hit.value))
+    ]
+
+
+def _resolve_doc_paths(
+    client: QdrantClient,
+    collection_name: str,
+    dataset: str,
+    query_filter: QueryFilter,
+    shard_key: str | None = None,
+) -> list[str]:
+    """Resolve prefix and glob conditions to the matching distinct doc paths."""
+    facet = client.facet(
+        collection_name,
+        key="doc_path",
+        facet_filter=_doc_path_facet_filter(dataset),
+        limit=MAX_FILTER_DOC_PATHS + 1,
+        exact=True,
+        shard_key_selector=shard_key,
+    )
+    return _matching_facet_doc_paths(facet, dataset, query_filter)
+
+
+def _build_query_filter(
+    dataset: str,
+    query_filter: QueryFilter | None,
+    doc_paths: list[str] | None = None,
+) -> models.Filter | None:
+    """Translate a QueryFilter into a Qdrant payload filter.
+
+    doc_paths holds the already resolved doc paths when the filter has prefix or
+    glob conditions. Returns None when the filter cannot match any document.
+    """
+    conditions: list[models.Condition] = [_dataset_condition(dataset)]
+    if query_filter is None:
+        return models.Filter(must=conditions)
+    if doc_paths is None:
+        doc_paths = query_filter.doc_paths
+    if doc_paths is not None:
+        if not doc_paths:
+            return None
+        conditions.append(
+            models.FieldCondition(key="doc_path", match=models.MatchAny(any=doc_paths))
+        )
+    if query_filter.has_chunk_id_condition:
+        conditions.append(
+            models.FieldCondition(
+                key="chunk_id",
+                range=models.Range(
+                    gte=query_filter.chunk_id_min, lte=query_filter.chunk_id_max
+                ),
+            )
+        )
+    return models.Filter(must=conditions)
+
+
+def _scroll_dataset(
+    client: QdrantClient,
+    collection_name: str,
+    dataset: str,
+    shard_key: str | None,
+    batch_size: int,
+) -> Iterator[IndexedChunk]:
+    """Stream every chunk of a dataset, including its vector, page by page."""
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name,
+            scroll_filter=models.Filter(must=[_dataset_condition(dataset)]),
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+            shard_key_selector=shard_key,
+        )
+        for record in records:
+            payload = record.payload or {}
+            yield IndexedChunk(
+                text=payload["text"],
+                source=payload["source"],
+                chunk_id=payload["chunk_id"],
+                doc_path=payload["doc_path"],
+                alternate_sources=payload.get("alternate_sources", []),
+                embedding=typing.cast(list[float], record.vector),
+            )
+        if offset is None:
+            return
+
+
+def _deadline_timeout() -> int | None:
+    """Search timeout in whole seconds (as Qdrant expects) for the request budget."""
+    remaining = check_deadline(RETRIEVE_STAGE)
+    return None if remaining is None else max(1, math.ceil(remaining))
+
+
+def _to_scored_chunks(points: list[models.ScoredPoint]) -> list[ScoredChunk]:
+    scored_chunks = []
+    for point in points:
+        payload = point.payload or {}
+        scored_chunks.append(
+            ScoredChunk(
+                score=point.score,
+                indexed_chunk=IndexedChunk(
+                    text=payload["text"],
+                    source=payload["source"],
+                    chunk_id=payload["chunk_id"],
+                    doc_path=payload["doc_path"],
+                    alternate_sources=payload.get("alternate_sources", []),
+                ),
+            )
+        )
+    return scored_chunks
+
+
 class QdrantStoreClient(VectorStoreClient):
-    def __init__(self) -> None:
-        self.client = QdrantClient(url=DEFAULT_QDRANT_CLIENT_URL)
+    def __init__(
+        self,
+        client: QdrantClient | None = None,
+        upload_batch_size: int = DEFAULT_QDRANT_UPLOAD_BATCH_SIZE,
+        upload_workers: int = DEFAULT_QDRANT_UPLOAD_WORKERS,
+        upload_max_retries: int = DEFAULT_QDRANT_UPLOAD_MAX_RETRIES,
+        prefer_grpc: bool = False,
+        collection_config: QdrantCollectionConfig | None = None,
+        search_config: QdrantSearchConfig | None = None,
+        tenant_mode: QdrantTenantMode = QdrantTenantMode.PAYLOAD,
+    ) -> None:
+        self.client = client or QdrantClient(
+            url=DEFAULT_QDRANT_CLIENT_URL, prefer_grpc=prefer_grpc
+        )
+        self.upload_batch_size = upload_batch_size
+        self.upload_workers = upload_workers
+        self.upload_max_retries = upload_max_retries
+        self.collection_config = collection_config or QdrantCollectionConfig()
+        self.search_params = _build_search_params(search_config or QdrantSearchConfig())
+        self.tenant_mode = tenant_mode
+        self._known_collections: set[str] = set()
+        self._known_shard_keys: set[tuple[str, str]] = set()
+
+    def _ensure_shard_key(self, collection_name: str, shard_key: str) -> None:
+        if (collection_name, shard_key) in self._known_shard_keys:
+            return
+        existing = self.client.list_shard_keys(collection_name).shard_keys or []
+        if shard_key not in {description.key for description in existing}:
+            self.client.create_shard_key(collection_name, shard_key)
+        self._known_shard_keys.add((collection_name, shard_key))
+
+    def _upsert_batch(
+        self,
+        collection_name: str,
+        points: list[models.PointStruct],
+        wait_for_result: bool,
+        shard_key: str | None = None,
+    ) -> int:
+        """Upsert a batch of points, retrying with exponential backoff on failure."""
+        attempt = 0
+        while True:
+            try:
+                self.client.upsert(
+                    collection_name=collection_name,
+                    points=points,
+                    wait=wait_for_result,
+                    shard_key_selector=shard_key,
+                )
+                return len(points)
+            except Exception as err:
+                if attempt >= self.upload_max_retries:
+                    raise RuntimeError(
+                        f"Failed to upsert {len(points)} points into {collection_name}: {err}"
+                    ) from err
+                time.sleep(QDRANT_UPLOAD_RETRY_BACKOFF_SECONDS * 2**attempt)
+                attempt += 1
 
     def store(
         self,
-        indexed_chunks: list[IndexedChunk],
+        indexed_chunks: Iterable[IndexedChunk],
         dataset: str,
         embedding_model: str,
         docs_count: int,
+        progress_callback: Callable[[int], None] | None = None,
     ) -> None:
-        _create_collection(self.client, _build_collection_name(embedding_model))
-        points = []
-        for chunk in indexed_chunks:
-            hash_id_text = f"{dataset}-{embedding_model}-{chunk.source}"
-            point_id = uuid.uuid5(namespace=uuid.NAMESPACE_DNS, name=hash_id_text)
-            points.append(
-                models.PointStruct(
-                    id=point_id,
-                    payload={
-                        "dataset": dataset,
-                        "text": chunk.text,
-                        "source": chunk.source,
-                        "chunk_id": chunk.chunk_id,
-                        "doc_path": chunk.doc_path,
-                    },
-                    vector=chunk.embedding,
-                )
+        """Upload the indexed chunks in parallel batches.
+
+        Chunks are consumed lazily, so at most a few batches are held in memory at
+        once. Batches are sent with wait=False; the last batch is held back and sent
+        with wait=True once every other batch is acknowledged, acting as the
+        consistency barrier. progress_callback receives the number of points
+        uploaded so far after each batch.
+        """
+        collection_name = _tenant_collection_name(
+            embedding_model, dataset, self.tenant_mode
+        )
+        shard_key = _shard_key_selector(dataset, self.tenant_mode)
+        chunks = iter(indexed_chunks)
+        first_chunk = next(chunks, None)
+        _create_collection(
+            self.client,
+            collection_name,
+            _resolve_vector_size(embedding_model, first_chunk),
+            self.collection_config,
+            self.tenant_mode,
+        )
+        self._known_collections.add(collection_name)
+        if shard_key is not None:
+            self._ensure_shard_key(collection_name, shard_key)
+        if first_chunk is not None:
+            self._upload(
+                itertools.chain([first_chunk], chunks),
+                collection_name,
+                dataset,
+                embedding_model,
+                shard_key,
+                progress_callback,
             )
-        self.client.upsert(collection_name=embedding_model, points=points)
+        self.client.update_collection(
+            collection_name,
+            metadata={_index_version_key(dataset): datetime.now(tz=UTC).isoformat()},
+        )
+
+    def _upload(
+        self,
+        indexed_chunks: Iterable[IndexedChunk],
+        collection_name: str,
+        dataset: str,
+        embedding_model: str,
+        shard_key: str | None,
+        progress_callback: Callable[[int], None] | None,
+    ) -> None:
+        points = (
+            _build_point(chunk, dataset, embedding_model) for chunk in indexed_chunks
+        )
+        batches = map(
+            list, itertools.batched(points, self.upload_batch_size, strict=False)
+        )
+        max_in_flight = self.upload_workers * 2
+        uploaded = 0
+
+        def report(batch_size: int) -> None:
+            nonlocal uploaded
+            uploaded += batch_size
+            if progress_callback is not None:
+                progress_callback(uploaded)
+
+        pending = next(batches, None)
+        if pending is None:
+            return
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+            in_flight: set[Future[int]] = set()
+            for batch in batches:
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        report(future.result())
+                in_flight.add(
+                    executor.submit(
+                        self._upsert_batch, collection_name, pending, False, shard_key
+                    )
+                )
+                pending = batch
+            for future in wait(in_flight).done:
+                report(future.result())
+        report(self._upsert_batch(collection_name, pending, True, shard_key))
+
+    def _ensure_collection_exists(self, collection_name: str) -> None:
+        """Check that a collection exists, remembering the answer for later queries."""
+        if collection_name in self._known_collections:
+            return
+        if not self.client.collection_exists(collection_name):
+            raise ValueError(f"Collection {collection_name} does not exist in Qdrant.")
+        self._known_collections.add(collection_name)
 
     def query(
         self,
@@ -72,39 +564,170 @@ class QdrantStoreClient(VectorStoreClient):
         embedding_model: str,
         query_embedding: list[float],
         limit: int,
+        query_filter: QueryFilter | None = None,
+        score_threshold: float | None = None,
     ) -> list[ScoredChunk]:
-        collection_name = _build_collection_name(embedding_model)
-        if not self.client.collection_exists(collection_name):
-            raise ValueError(
-                f"Collection {collection_name} does not exist in Qdrant."
+        collection_name = _tenant_collection_name(
+            embedding_model, dataset, self.tenant_mode
+        )
+        shard_key = _shard_key_selector(dataset, self.tenant_mode)
+        self._ensure_collection_exists(collection_name)
+        doc_paths = None
+        if query_filter is not None and _needs_doc_path_resolution(query_filter):
+            doc_paths = _resolve_doc_paths(
+                self.client, collection_name, dataset, query_filter, shard_key
             )
-        search_results = self.client.query_points(
-            collection_name=collection_name,
-            query=query_embedding,
-            query_filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="dataset",
-                        match=models.MatchValue(value=dataset),
-                    )
-                ]
-            ),
-            limit=limit,
-            with_payload=True,
-            with_vectors=True,
-        ).points
-        scored_chunks = []
-        for point in search_results:
-            scored_chunks.append(
-                ScoredChunk(
-                    score=point.score,
-                    indexed_chunk=IndexedChunk(
-                        text=point.payload["text"],
-                        source=point.payload["source"],
-                        chunk_id=point.payload["chunk_id"],
-                        doc_path=point.payload["doc_path"],
-                        embedding=point.vector,
-                    )
+        payload_filter = _build_query_filter(dataset, query_filter, doc_paths)
+        if payload_filter is None:
+            return []
+        try:
+            search_results = self.client.query_points(
+                collection_name=collection_name,
+                query=query_embedding,
+                query_filter=payload_filter,
+                limit=limit,
+                score_threshold=score_threshold,
+                search_params=self.search_params,
+                with_payload=QUERY_PAYLOAD_FIELDS,
+                with_vectors=False,
+                shard_key_selector=shard_key,
+                timeout=_deadline_timeout(),
+            ).points
+        except Exception as err:
+            if is_expired():
+                raise deadline_exceeded(RETRIEVE_STAGE) from err
+            raise
+        return _to_scored_chunks(search_results)
+
+    def get_index_version(self, dataset: str, embedding_model: str) -> str | None:
+        """Read the dataset's index version from the collection metadata."""
+        collection_name = _tenant_collection_name(
+            embedding_model, dataset, self.tenant_mode
+        )
+        self._ensure_collection_exists(collection_name)
+        metadata = self.client.get_collection(collection_name).config.metadata or {}
+        version = metadata.get(_index_version_key(dataset))
+        return None if version is None else str(version)
+
+    def warm_up(self, dataset: str, embedding_model: str) -> DatasetStats:
+        """Open the connection and count the dataset's points; Qdrant holds the vectors."""
+        collection_name = _tenant_collection_name(
+            embedding_model, dataset, self.tenant_mode
+        )
+        self._ensure_collection_exists(collection_name)
+        count = self.client.count(
+            collection_name,
+            count_filter=models.Filter(must=[_dataset_condition(dataset)]),
+            exact=True,
+            shard_key_selector=_shard_key_selector(dataset, self.tenant_mode),
+        ).count
+        return DatasetStats(
+            chunk_count=count,
+            index_version=self.get_index_version(dataset, embedding_model),
+        )
+
+    def get_dataset_info(self, dataset: str) -> DatasetInfo | None:
+        """Qdrant keeps no per-dataset manifest, so datasets use the default model."""
+        return None
+
+    def list_datasets(self) -> list[DatasetInfo]:
+        """Qdrant keeps no per-dataset manifest to list."""
+        return []
+
+    def _list_datasets(self, collection_name: str) -> list[str]:
+        facet = self.client.facet(
+            collection_name, key="dataset", limit=MAX_MIGRATION_DATASETS, exact=True
+        )
+        return [str(hit.value) for hit in facet.hits]
+
+    def _delete_dataset(
+        self, embedding_model: str, dataset: str, tenant_mode: QdrantTenantMode
+    ) -> None:
+        collection_name = _tenant_collection_name(embedding_model, dataset, tenant_mode)
+        if tenant_mode == QdrantTenantMode.COLLECTION:
+            self.client.delete_collection(collection_name)
+        elif tenant_mode == QdrantTenantMode.SHARD_KEY:
+            self.client.delete_shard_key(collection_name, dataset)
+        else:
+            self.client.delete(
+                collection_name,
+                points_selector=models.FilterSelector(
+                    filter=models.Filter(must=[_dataset_condition(dataset)])
+                ),
+            )
+
+    def migrate(
+        self,
+        embedding_model: str,
+        source_mode: QdrantTenantMode,
+        datasets: list[str] | None = None,
+        delete_source: bool = False,
+        progress_callback: Callable[[str, int], None] | None = None,
+    ) -> list[str]:
+        """Move datasets stored under source_mode into this client's tenant layout.
+
+        Migrating a shared collection to the payload layout happens in place by
+        marking the dataset index as the tenant key. Other migrations copy every
+        point, keeping its id, so an interrupted migration can simply be re-run.
+        Returns the migrated datasets.
+        """
+        if source_mode == self.tenant_mode:
+            if source_mode != QdrantTenantMode.PAYLOAD:
+                raise ValueError(f"Datasets already use the {source_mode} layout")
+            _enable_payload_tenancy(
+                self.client,
+                _build_collection_name(embedding_model),
+                self.collection_config,
+            )
+            return []
+        if datasets is None:
+            if source_mode == QdrantTenantMode.COLLECTION:
+                raise ValueError(
+                    "Datasets must be listed explicitly when migrating from per-dataset collections"
                 )
+            datasets = self._list_datasets(
+                _tenant_collection_name(embedding_model, "", source_mode)
+            )
+        for dataset in datasets:
+            source_chunks = _scroll_dataset(
+                self.client,
+                _tenant_collection_name(embedding_model, dataset, source_mode),
+                dataset,
+                _shard_key_selector(dataset, source_mode),
+                self.upload_batch_size,
+            )
+            self.store(
+                source_chunks,
+                dataset,
+                embedding_model,
+                docs_count=0,
+                progress_callback=None
+                if progress_callback is None
+                else functools.partial(progress_callback, dataset),
             )
-        return scored_chunks
+            if delete_source:
+                self._delete_dataset(embedding_model, dataset, source_mode)
+        return datasets
+
+
+@functools.lru_cache
+def shared_qdrant_store_client(
+    upload_batch_size: int = DEFAULT_QDRANT_UPLOAD_BATCH_SIZE,
+    upload_workers: int = DEFAULT_QDRANT_UPLOAD_WORKERS,
+    prefer_grpc: bool = False,
+    collection_config: QdrantCollectionConfig | None = None,
+    search_config: QdrantSearchConfig | None = None,
+    tenant_mode: QdrantTenantMode = QdrantTenantMode.PAYLOAD,
+) -> QdrantStoreClient:
+    """Process-wide store client, shared by every request using the same settings.
+
+    Its connection is reused and the collections it has seen are only checked once.
+    """
+    return QdrantStoreClient(
+        upload_batch_size=upload_batch_size,
+        upload_workers=upload_workers,
+        prefer_grpc=prefer_grpc,
+        collection_config=collection_config,
+        search_config=search_config,
+        tenant_mode=tenant_mode,
+    )
@@ -1,6 +1,9 @@
-from typing import Protocol
+from collections.abc import Iterable
+from datetime import datetime
+from fnmatch import fnmatchcase
+from typing import Protocol, Self
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class Chunk(BaseModel):
@@ -12,15 +15,127 @@ class Chunk(BaseModel):
 
 class IndexedChunk(Chunk):
     source: str = Field(description="The source of the chunk (e.g., 'document').")
-    embedding: list[float] = Field(description="The embedding vector of the chunk.")
+    embedding: list[float] = Field(
+        default_factory=list,
+        description="The embedding vector of the chunk, empty when not fetched from the store.",
+    )
     chunk_id: int = Field(
         description="A unique identifier for the chunk within its index."
     )
+    alternate_sources: list[str] = Field(
+        default_factory=list,
+        description="Sources of chunks with the same or nearly the same text, indexed only as this one.",
+    )
 
 
 class ScoredChunk(BaseModel):
     score: float = Field(description="The score of the chunk.")
     indexed_chunk: IndexedChunk = Field()
+    dataset: str | None = Field(
+        default=None,
+        description="The dataset the chunk was retrieved from, set by queries across several datasets.",
+    )
+
+
+class DatasetStats(BaseModel):
+    chunk_count: int = Field(description="Number of chunks stored for the dataset.")
+    memory_bytes: int | None = Field(
+        default=None,
+        description="Approximate memory held by the loaded dataset, None if it lives in an external store.",
+    )
+    index_version: str | None = Field(
+        default=None, description="Version of the index that was loaded."
+    )
+
+
+class DatasetInfo(BaseModel):
+    dataset: str = Field(description="Name of the dataset.")
+    embedding_model: str = Field(
+        description="The embedding model the dataset was indexed with."
+    )
+    dimension: int | None = Field(
+        default=None, description="Number of dimensions of each embedding, if recorded."
+    )
+    docs_count: int = Field(description="Number of documents indexed.")
+    chunk_count: int = Field(description="Number of chunks stored for the dataset.")
+    index_version: str | None = Field(
+        default=None, description="Version of the published index."
+    )
+    created_at: datetime | None = Field(
+        default=None, description="When the published index was created."
+    )
+
+
+class QueryFilter(BaseModel):
+    """Metadata filter restricting which chunks a query is scored against.
+
+    All conditions that are set must hold for a chunk to match.
+    """
+
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True, frozen=True)
+
+    doc_paths: list[str] | None = Field(
+        default=None, description="Explicit list of document paths to search."
+    )
+    doc_path_prefix: str | None = Field(
+        default=None, description="Only search documents whose path starts with this."
+    )
+    doc_path_glob: str | None = Field(
+        default=None,
+        description="Only search documents whose path matches this glob pattern.",
+    )
+    chunk_id_min: int | None = Field(
+        default=None, ge=0, description="Lowest chunk id to search (inclusive)."
+    )
+    chunk_id_max: int | None = Field(
+        default=None, ge=0, description="Highest chunk id to search (inclusive)."
+    )
+
+    @model_validator(mode="after")
+    def _check_chunk_id_range(self) -> Self:
+        if (
+            self.chunk_id_min is not None
+            and self.chunk_id_max is not None
+            and self.chunk_id_min > self.chunk_id_max
+        ):
+            raise ValueError("chunk_id_min must be less than or equal to chunk_id_max")
+        return self
+
+    @property
+    def has_doc_path_condition(self) -> bool:
+        return (
+            self.doc_paths is not None
+            or self.doc_path_prefix is not None
+            or self.doc_path_glob is not None
+        )
+
+    @property
+    def has_chunk_id_condition(self) -> bool:
+        return self.chunk_id_min is not None or self.chunk_id_max is not None
+
+    def matches_doc_path(self, doc_path: str) -> bool:
+        """Check whether a document path satisfies the doc path conditions."""
+        if self.doc_paths is not None and doc_path not in self.doc_paths:
+            return False
+        if self.doc_path_prefix is not None and not doc_path.startswith(
+            self.doc_path_prefix
+        ):
+            return False
+        return self.doc_path_glob is None or fnmatchcase(doc_path, self.doc_path_glob)
+
+    def matches_chunk_id(self, chunk_id: int) -> bool:
+        """Check whether a chunk id lies within the chunk id range."""
+        if self.chunk_id_min is not None and chunk_id < self.chunk_id_min:
+            return False
+        return self.chunk_id_max is None or chunk_id <= self.chunk_id_max
+
+    def matches(self, doc_path: str, chunk_id: int) -> bool:
+        """Check whether a chunk satisfies every condition of the filter."""
+        return self.matches_doc_path(doc_path) and self.matches_chunk_id(chunk_id)
+
+
+class DocPathFilterLimitError(ValueError):
+    """A doc path filter cannot be resolved: the dataset has too many documents."""
 
 
 class VectorStoreClient(Protocol):
@@ -28,12 +143,16 @@ class VectorStoreClient(Protocol):
 
     def store(
         self,
-        indexed_chunks: list[IndexedChunk],
+        indexed_chunks: Iterable[IndexedChunk],
         dataset: str,
         embedding_model: str,
         docs_count: int,
     ) -> None:
-        """Store the indexed chunks into a vector store."""
+        """Store the indexed chunks into a vector store.
+
+        indexed_chunks may be a generator; it is consumed once, incrementally, so
+        a whole dataset never has to be held in memory.
+        """
         ...
 
     def query(
@@ -42,6 +161,34 @@ class VectorStoreClient(Protocol):
         embedding_model: str,
         query_embedding: list[float],
         limit: int,
+        query_filter: QueryFilter | None = None,
+        score_threshold: float | None = None,
     ) -> list[ScoredChunk]:
-        """Query the vector store and return a list of the top_k most relevant IndexedChunks."""
+        """Query the vector store and return a list of the top_k most relevant IndexedChunks.
+
+        If query_filter is provided, only chunks matching it are scored. If
+        score_threshold is provided, chunks scoring below it are not returned.
+        """
+        ...
+
+    def get_index_version(self, dataset: str, embedding_model: str) -> str | None:
+        """Return an opaque version that changes whenever the dataset is re-indexed.
+
+        Returns None if no version was recorded for the dataset.
+        """
+        ...
+
+    def warm_up(self, dataset: str, embedding_model: str) -> DatasetStats:
+        """Prepare the dataset to be queried and describe what was loaded."""
+        ...
+
+    def get_dataset_info(self, dataset: str) -> DatasetInfo | None:
+        """Describe the dataset from cached metadata, without reading its index.
+
+        Returns None if the store records no metadata for the dataset.
+        """
+        ...
+
+    def list_datasets(self) -> list[DatasetInfo]:
+        """Describe every dataset whose metadata the store records."""
         ...
@@ -0,0 +1,101 @@
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+
+from llm_lab.api.dependencies import get_vector_store_client
+from llm_lab.config.settings import get_settings
+from llm_lab.main import app
+from llm_lab.vector_store.file.file_store import FileStoreClient
+from llm_lab.vector_store.types import IndexedChunk
+from tests.fakes import FakeVectorStoreClient
+
+ADMIN_HEADERS = {"Authorization": "Bearer admin-secret"}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch: MonkeyPatch) -> Generator[None]:
+    monkeypatch.setenv("LLM_API_KEY", "dummy-key")
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+class TestReloadDatasetApi:
+    @pytest.fixture
+    def file_store(self, tmp_path: Path) -> Generator[FileStoreClient]:
+        store = FileStoreClient(dest_dir=tmp_path)
+        chunk = IndexedChunk(
+            text="text",
+            doc_path="docs/a.md",
+            source="docs/a.md#chunk-0",
+            embedding=[1.0, 0.0],
+            chunk_id=0,
+        )
+        store.store([chunk], "ducks", "fake-embedding-model", docs_count=1)
+        app.dependency_overrides[get_vector_store_client] = lambda: store
+        yield store
+        app.dependency_overrides.clear()
+
+    def test_reload_returns_loaded_index_version(
+        self, client: TestClient, file_store: FileStoreClient
+    ) -> None:
+        response = client.post("/admin/datasets/ducks/reload", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "dataset": "ducks",
+            "index_version": file_store.get_index_version(
+                "ducks", "fake-embedding-model"
+            ),
+        }
+
+    def test_reload_unknown_dataset_returns_404(
+        self, client: TestClient, file_store: FileStoreClient
+    ) -> None:
+        response = client.post("/admin/datasets/geese/reload", headers=ADMIN_HEADERS)
+        assert response.status_code == 404
+
+    def test_reload_is_rejected_for_other_vector_stores(
+        self, client: TestClient
+    ) -> None:
+        app.dependency_overrides[get_vector_store_client] = FakeVectorStoreClient
+        try:
+            response = client.post(
+                "/admin/datasets/ducks/reload", headers=ADMIN_HEADERS
+            )
+        finally:
+            app.dependency_overrides.clear()
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}])
+    def test_reload_without_admin_token_returns_401(
+        self,
+        client: TestClient,
+        file_store: FileStoreClient,
+        headers: dict[str, str],
+    ) -> None:
+        response = client.post("/admin/datasets/ducks/reload", headers=headers)
+        assert response.status_code == 401
+
+    def test_reload_is_disabled_without_configured_token(
+        self, client: TestClient, file_store: FileStoreClient, monkeypatch: MonkeyPatch
+    ) -> None:
+        monkeypatch.delenv("ADMIN_TOKEN")
+        get_settings.cache_clear()
+
+        response = client.post("/admin/datasets/ducks/reload", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize("dataset", ["%2E%2E", ".hidden", "a%5Cb"])
+    def test_reload_rejects_invalid_dataset_names(
+        self, client: TestClient, file_store: FileStoreClient, dataset: str
+    ) -> None:
+        response = client.post(
+            f"/admin/datasets/{dataset}/reload", headers=ADMIN_HEADERS
+        )
+        assert response.status_code == 400
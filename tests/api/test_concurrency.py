@@ -0,0 +1,296 @@
+import asyncio
+
+import pytest
+
+from llm_lab.api.concurrency import (
+    AdmissionController,
+    AdmissionRejectedError,
+    Priority,
+    SingleFlight,
+)
+from llm_lab.observability.context import (
+    generate_ms_context_var,
+    request_coalesced_context_var,
+)
+from llm_lab.observability.deadline import (
+    ADMISSION_STAGE,
+    COALESCE_STAGE,
+    GENERATE_STAGE,
+    DeadlineExceededError,
+    check_deadline,
+    deadline,
+)
+from llm_lab.observability.metrics import (
+    admission_queue_depth_gauge,
+    admission_rejected_counter,
+    coalesced_requests_counter,
+)
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one_computation(self) -> None:
+        calls = 0
+        coalesced_before = coalesced_requests_counter.value
+
+        async def compute() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def main() -> list[str]:
+            single_flight: SingleFlight[str] = SingleFlight()
+            results = await asyncio.gather(
+                *(single_flight.run("key", compute) for _ in range(5))
+            )
+            assert len(single_flight) == 0
+            return results
+
+        assert asyncio.run(main()) == ["result"] * 5
+        assert calls == 1
+        assert coalesced_requests_counter.value == coalesced_before + 4
+
+    def test_different_keys_are_not_coalesced(self) -> None:
+        async def main() -> list[str]:
+            single_flight: SingleFlight[str] = SingleFlight()
+
+            async def compute(key: str) -> str:
+                await asyncio.sleep(0)
+                return key
+
+            return await asyncio.gather(
+                single_flight.run("a", lambda: compute("a")),
+                single_flight.run("b", lambda: compute("b")),
+            )
+
+        assert asyncio.run(main()) == ["a", "b"]
+
+    def test_exception_is_shared_with_waiting_callers(self) -> None:
+        async def fail() -> str:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def main() -> list[str | BaseException]:
+            single_flight: SingleFlight[str] = SingleFlight()
+            return await asyncio.gather(
+                single_flight.run("key", fail),
+                single_flight.run("key", fail),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(main())
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_cancelled_caller_does_not_cancel_computation(self) -> None:
+        async def compute() -> str:
+            await asyncio.sleep(0.02)
+            return "result"
+
+        async def main() -> str:
+            single_flight: SingleFlight[str] = SingleFlight()
+            first = asyncio.create_task(single_flight.run("key", compute))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(single_flight.run("key", compute))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(main()) == "result"
+
+    def test_joining_caller_stops_waiting_at_its_own_deadline(self) -> None:
+        async def compute() -> str:
+            await asyncio.sleep(0.2)
+            return "result"
+
+        async def join(single_flight: SingleFlight[str]) -> str:
+            with deadline(0.02):
+                return await single_flight.run("key", compute)
+
+        async def main() -> tuple[str, str]:
+            single_flight: SingleFlight[str] = SingleFlight()
+            first = asyncio.create_task(single_flight.run("key", compute))
+            await asyncio.sleep(0)
+            with pytest.raises(DeadlineExceededError) as exc_info:
+                await join(single_flight)
+            return exc_info.value.stage, await first
+
+        assert asyncio.run(main()) == (COALESCE_STAGE, "result")
+
+    def test_joining_caller_retries_when_the_starting_caller_runs_out(self) -> None:
+        calls = 0
+
+        async def compute() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            check_deadline(GENERATE_STAGE)
+            return "result"
+
+        async def lead(single_flight: SingleFlight[str]) -> str:
+            with deadline(0.01):
+                return await single_flight.run("key", compute)
+
+        async def main() -> list[str | BaseException]:
+            single_flight: SingleFlight[str] = SingleFlight()
+            first = asyncio.create_task(lead(single_flight))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(single_flight.run("key", compute))
+            return await asyncio.gather(first, second, return_exceptions=True)
+
+        first, second = asyncio.run(main())
+        assert isinstance(first, DeadlineExceededError)
+        assert second == "result"
+        assert calls == 2
+
+    def test_context_vars_reach_the_starting_caller_only(self) -> None:
+        async def compute() -> str:
+            generate_ms_context_var.set(1.5)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def call(single_flight: SingleFlight[str]) -> tuple[float | None, bool]:
+            await single_flight.run("key", compute)
+            return (
+                generate_ms_context_var.get(),
+                bool(request_coalesced_context_var.get()),
+            )
+
+        async def main() -> list[tuple[float | None, bool]]:
+            single_flight: SingleFlight[str] = SingleFlight()
+            return await asyncio.gather(call(single_flight), call(single_flight))
+
+        assert asyncio.run(main()) == [(1.5, False), (None, True)]
+
+
+class TestAdmissionController:
+    def test_excess_requests_wait_for_a_slot_in_order(self) -> None:
+        order: list[str] = []
+
+        async def request(controller: AdmissionController, name: str) -> None:
+            async with controller.admit():
+                order.append(f"start {name}")
+                await asyncio.sleep(0.01)
+                order.append(f"end {name}")
+
+        async def main() -> None:
+            controller = AdmissionController(max_concurrency=1, max_queue=2)
+            await asyncio.gather(*(request(controller, name) for name in "abc"))
+            assert controller.in_flight == 0
+            assert controller.queue_depth == 0
+
+        asyncio.run(main())
+        assert order == ["start a", "end a", "start b", "end b", "start c", "end c"]
+
+    def test_rejects_when_queue_is_full(self) -> None:
+        rejected_before = admission_rejected_counter.value
+
+        async def main() -> None:
+            controller = AdmissionController(
+                max_concurrency=1, max_queue=0, max_wait_seconds=2.5
+            )
+            async with controller.admit():
+                with pytest.raises(AdmissionRejectedError) as exc_info:
+                    async with controller.admit():
+                        pass
+            assert exc_info.value.retry_after_seconds == 3
+
+        asyncio.run(main())
+        assert admission_rejected_counter.value == rejected_before + 1
+
+    def test_rejects_when_wait_budget_is_exceeded(self) -> None:
+        async def main() -> None:
+            controller = AdmissionController(
+                max_concurrency=1, max_queue=1, max_wait_seconds=0.01
+            )
+            async with controller.admit():
+                with pytest.raises(AdmissionRejectedError):
+                    async with controller.admit():
+                        pass
+                assert controller.queue_depth == 0
+                assert admission_queue_depth_gauge.value == 0
+            assert controller.in_flight == 0
+
+        asyncio.run(main())
+
+    def test_interactive_requests_are_admitted_before_batch(self) -> None:
+        order: list[Priority] = []
+
+        async def request(controller: AdmissionController, priority: Priority) -> None:
+            async with controller.admit(priority):
+                order.append(priority)
+
+        async def main() -> None:
+            controller = AdmissionController(max_concurrency=1, max_queue=4)
+            async with controller.admit():
+                waiting = [
+                    asyncio.create_task(request(controller, priority))
+                    for priority in (Priority.BATCH, Priority.INTERACTIVE)
+                ]
+                await asyncio.sleep(0)
+                assert controller.queue_depth == 2
+            await asyncio.gather(*waiting)
+
+        asyncio.run(main())
+        assert order == [Priority.INTERACTIVE, Priority.BATCH]
+
+    def test_batch_requests_only_fill_part_of_the_queue(self) -> None:
+        async def main() -> None:
+            controller = AdmissionController(max_concurrency=1, max_queue=2)
+            async with controller.admit():
+                waiting = asyncio.create_task(_admit(controller, Priority.BATCH))
+                await asyncio.sleep(0)
+                with pytest.raises(AdmissionRejectedError, match="batch queue"):
+                    await _admit(controller, Priority.BATCH)
+                interactive = asyncio.create_task(_admit(controller))
+                await asyncio.sleep(0)
+                assert controller.queue_depth == 2
+            await asyncio.gather(waiting, interactive)
+
+        asyncio.run(main())
+
+    def test_both_lanes_together_stay_within_max_queue(self) -> None:
+        async def main() -> None:
+            controller = AdmissionController(max_concurrency=1, max_queue=2)
+            async with controller.admit():
+                waiting = [
+                    asyncio.create_task(_admit(controller, priority))
+                    for priority in (Priority.BATCH, Priority.INTERACTIVE)
+                ]
+                await asyncio.sleep(0)
+                assert controller.queue_depth == 2
+                with pytest.raises(AdmissionRejectedError, match="queue is full"):
+                    await _admit(controller)
+            await asyncio.gather(*waiting)
+
+        asyncio.run(main())
+
+    def test_expired_request_fails_with_deadline_error(self) -> None:
+        async def main() -> None:
+            controller = AdmissionController(max_concurrency=1)
+            with deadline(0), pytest.raises(DeadlineExceededError) as exc_info:
+                await _admit(controller)
+            assert exc_info.value.stage == ADMISSION_STAGE
+            assert controller.in_flight == 0
+
+        asyncio.run(main())
+
+    def test_request_whose_deadline_passes_in_queue_fails_with_deadline_error(
+        self,
+    ) -> None:
+        async def main() -> None:
+            controller = AdmissionController(max_concurrency=1, max_wait_seconds=5)
+            async with controller.admit():
+                with deadline(0.01), pytest.raises(DeadlineExceededError):
+                    await _admit(controller)
+                assert controller.queue_depth == 0
+
+        asyncio.run(main())
+
+
+async def _admit(
+    controller: AdmissionController, priority: Priority = Priority.INTERACTIVE
+) -> None:
+    async with controller.admit(priority):
+        pass
@@ -0,0 +1,65 @@
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from llm_lab.api.dependencies import get_vector_store_client
+from llm_lab.main import app
+from llm_lab.vector_store.file.file_store import FileStoreClient
+from llm_lab.vector_store.types import IndexedChunk
+
+
+class TestDatasetsApi:
+    @pytest.fixture
+    def file_store(self, tmp_path: Path) -> Generator[FileStoreClient]:
+        store = FileStoreClient(dest_dir=tmp_path)
+        chunk = IndexedChunk(
+            text="text",
+            doc_path="docs/a.md",
+            source="docs/a.md#chunk-0",
+            embedding=[1.0, 0.0],
+            chunk_id=0,
+        )
+        store.store([chunk], "ducks", "fake-embedding-model", docs_count=1)
+        app.dependency_overrides[get_vector_store_client] = lambda: store
+        yield store
+        app.dependency_overrides.clear()
+
+    def test_lists_datasets_with_manifest_metadata(
+        self, client: TestClient, file_store: FileStoreClient
+    ) -> None:
+        response = client.get("/datasets")
+
+        assert response.status_code == 200
+        [dataset] = response.json()["datasets"]
+        assert dataset["dataset"] == "ducks"
+        assert dataset["embedding_model"] == "fake-embedding-model"
+        assert (
+            dataset["dimension"],
+            dataset["docs_count"],
+            dataset["chunk_count"],
+        ) == (
+            2,
+            1,
+            1,
+        )
+        assert dataset["index_version"] == file_store.get_index_version(
+            "ducks", "fake-embedding-model"
+        )
+
+    def test_describes_one_dataset(
+        self, client: TestClient, file_store: FileStoreClient
+    ) -> None:
+        response = client.get("/datasets/ducks")
+
+        assert response.status_code == 200
+        assert response.json()["embedding_model"] == "fake-embedding-model"
+
+    def test_unknown_dataset_returns_404(
+        self, client: TestClient, file_store: FileStoreClient
+    ) -> None:
+        response = client.get("/datasets/geese")
+
+        assert response.status_code == 404
+        assert response.json() == {"error": "Dataset geese not found"}
@@ -17,3 +17,11 @@ class TestMainApi:
         # Missing required field "name"
         response = client.post("/echo", json={})
         assert response.status_code == 422
+
+    def test_metrics_exposes_counters_in_prometheus_format(
+        self, client: TestClient
+    ) -> None:
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE llm_lab_coalesced_requests_total counter" in response.text
@@ -1,15 +1,40 @@
 import json
 import logging
+import time
 import uuid
+from collections.abc import Generator
 
+import pytest
 from _pytest.logging import LogCaptureFixture
 from _pytest.monkeypatch import MonkeyPatch
 from fastapi.testclient import TestClient
 
+from llm_lab.api.concurrency import AdmissionController
+from llm_lab.api.dependencies import (
+    get_admission_controller,
+    get_llm_client,
+    get_response_cache,
+    get_retriever_client,
+)
+from llm_lab.api.response_cache import InMemoryResponseCache
 from llm_lab.core.rag_service import QueryResult, RagService
 from llm_lab.llm.errors import LlmUnavailableError
+from llm_lab.main import app
+from llm_lab.observability.context import generate_ms_context_var
+from llm_lab.observability.deadline import GENERATE_STAGE, check_deadline
 from llm_lab.retrieval.retriever import Retriever
-from llm_lab.vector_store.types import IndexedChunk, ScoredChunk
+from llm_lab.vector_store.types import (
+    DocPathFilterLimitError,
+    IndexedChunk,
+    QueryFilter,
+    ScoredChunk,
+)
+from tests.fakes import (
+    CountingLlmClient,
+    DatasetVectorStoreClient,
+    FakeLlmClient,
+    FakeVectorStoreClient,
+)
 
 
 class TestQueryApi:
@@ -42,7 +67,11 @@ class TestQueryApi:
 
         # 2) Fake RagService.answer_question so we don't touch real LLM / index
         def fake_answer_question(
-            self: RagService, dataset: str, query: str, top_k: int
+            self: RagService,
+            dataset: str,
+            query: str,
+            top_k: int,
+            query_filter: QueryFilter | None = None,
         ) -> QueryResult:
             assert query == "What is a Kubernetes pod?"
             assert top_k == 1
@@ -103,13 +132,98 @@ class TestQueryApi:
         assert response.status_code == 400
         assert response.json() == {"error": "top_k must be between 1 and 10"}
 
+    @pytest.mark.parametrize(
+        ("datasets", "error"),
+        [
+            (
+                {"dataset": "a", "datasets": ["b"]},
+                "Set either dataset or datasets, not both",
+            ),
+            ({}, "Dataset name must be a non-empty string"),
+            ({"datasets": ["a", " "]}, "Dataset name must be a non-empty string"),
+            (
+                {"dataset": "../secrets"},
+                "Invalid dataset name '../secrets': use letters, digits, '.', '_' "
+                "and '-', starting with a letter or digit",
+            ),
+            ({"datasets": ["a", "a"]}, "Datasets must be distinct"),
+            (
+                {"datasets": [f"d{i}" for i in range(9)]},
+                "At most 8 datasets can be searched at once",
+            ),
+        ],
+    )
+    def test_query_invalid_datasets_returns_400(
+        self,
+        client: TestClient,
+        monkeypatch: MonkeyPatch,
+        datasets: dict[str, object],
+        error: str,
+    ) -> None:
+        monkeypatch.setenv("LLM_API_KEY", "dummy-key")
+        response = client.post("/query", json={"query": "Test Query", **datasets})
+        assert response.status_code == 400
+        assert response.json() == {"error": error}
+
+    def test_query_across_datasets_merges_sources_and_logs_timings(
+        self, client: TestClient, monkeypatch: MonkeyPatch, caplog: LogCaptureFixture
+    ) -> None:
+        caplog.set_level(logging.INFO, logger="llm_lab.api")
+        monkeypatch.setenv("LLM_API_KEY", "dummy-key")
+
+        def scored(source: str, score: float) -> ScoredChunk:
+            return ScoredChunk(
+                score=score,
+                indexed_chunk=IndexedChunk(
+                    text=f"About {source}", doc_path=source, source=source, chunk_id=0
+                ),
+            )
+
+        llm_client = CountingLlmClient()
+        app.dependency_overrides[get_llm_client] = lambda: llm_client
+        app.dependency_overrides[get_retriever_client] = lambda: Retriever(
+            llm_client,
+            DatasetVectorStoreClient(
+                {
+                    "docs": [scored("docs/a.md", 0.9), scored("docs/b.md", 0.8)],
+                    "wiki": [scored("wiki/c.md", 0.85)],
+                }
+            ),
+        )
+        try:
+            response = client.post(
+                "/query",
+                json={
+                    "query": "What is a pod?",
+                    "top_k": 2,
+                    "datasets": ["docs", "wiki"],
+                },
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["sources"] == [
+            {"source": "docs/a.md", "chunk_id": 0, "dataset": "docs"},
+            {"source": "wiki/c.md", "chunk_id": 0, "dataset": "wiki"},
+        ]
+        assert llm_client.embed_calls == 1
+        logs = json.loads(caplog.messages[0])
+        assert logs["dataset"] == "docs,wiki"
+        assert set(logs["dataset_retrieve_ms"]) == {"docs", "wiki"}
+
     def test_query_missing_index_returns_500(
         self, client: TestClient, monkeypatch: MonkeyPatch
     ) -> None:
         payload = {"query": "Test Query", "top_k": 1, "dataset": "test_dataset"}
 
         def fake_search(
-            self: Retriever, dataset: str, query: str, top_k: int
+            self: Retriever,
+            dataset: str,
+            query: str,
+            top_k: int,
+            query_filter: QueryFilter | None = None,
+            query_embedding: list[float] | None = None,
         ) -> list[ScoredChunk]:
             raise ValueError(
                 "Dataset test_dataset not found, make sure to run the index command first"
@@ -125,6 +239,35 @@ class TestQueryApi:
             "error": "Dataset test_dataset not found, make sure to run the index command first"
         }
 
+    def test_query_too_broad_doc_path_filter_returns_400(
+        self, client: TestClient, monkeypatch: MonkeyPatch
+    ) -> None:
+        payload = {
+            "query": "Test Query",
+            "dataset": "test_dataset",
+            "filter": {"doc_path_prefix": "docs/"},
+        }
+
+        def fake_search(
+            self: Retriever,
+            dataset: str,
+            query: str,
+            top_k: int,
+            query_filter: QueryFilter | None = None,
+            query_embedding: list[float] | None = None,
+        ) -> list[ScoredChunk]:
+            raise DocPathFilterLimitError("Dataset test_dataset has too many documents")
+
+        monkeypatch.setenv("LLM_API_KEY", "dummy-key")
+        monkeypatch.setattr(Retriever, "search", fake_search)
+
+        response = client.post("/query", json=payload)
+
+        assert response.status_code == 400
+        assert response.json() == {
+            "error": "Dataset test_dataset has too many documents"
+        }
+
     def test_query_llm_unavailable_returns_502(
         self, client: TestClient, monkeypatch: MonkeyPatch
     ) -> None:
@@ -135,7 +278,11 @@ class TestQueryApi:
 
         # Fake RagService.answer_question to simulate an upstream 5xx from the LLM
         def fake_answer_question(
-            self: RagService, dataset: str, query: str, top_k: int
+            self: RagService,
+            dataset: str,
+            query: str,
+            top_k: int,
+            query_filter: QueryFilter | None = None,
         ) -> QueryResult:
             assert query == "Test Query"
             assert top_k == 1
@@ -173,7 +320,11 @@ class TestQueryApi:
 
         # 2) Fake RagService.answer_question so we don't touch real LLM / index
         def fake_answer_question(
-            self: RagService, dataset: str, query: str, top_k: int
+            self: RagService,
+            dataset: str,
+            query: str,
+            top_k: int,
+            query_filter: QueryFilter | None = None,
         ) -> QueryResult:
             assert query == "What is a Kubernetes pod?"
             assert top_k == 1
@@ -210,3 +361,158 @@ class TestQueryApi:
         uuid.UUID(logs["request_id"])
         assert logs["top_k"] == 1
         assert logs["dataset"] == "test_dataset"
+
+    def test_query_log_includes_timings_set_in_worker_thread(
+        self, client: TestClient, monkeypatch: MonkeyPatch, caplog: LogCaptureFixture
+    ) -> None:
+        caplog.set_level(logging.INFO, logger="llm_lab.api")
+
+        def fake_answer_question(
+            self: RagService,
+            dataset: str,
+            query: str,
+            top_k: int,
+            query_filter: QueryFilter | None = None,
+        ) -> QueryResult:
+            generate_ms_context_var.set(12.5)
+            return QueryResult(answer="fake answer from LLM", chunks=[])
+
+        monkeypatch.setenv("LLM_API_KEY", "dummy-key")
+        monkeypatch.setattr(RagService, "answer_question", fake_answer_question)
+
+        client.post(
+            "/query",
+            json={"query": "Test Query", "top_k": 1, "dataset": "test_dataset"},
+        )
+
+        logs = json.loads(caplog.messages[0])
+        assert logs["generate_ms"] == 12.5
+
+    def test_query_deadline_exceeded_returns_504_naming_stage(
+        self, client: TestClient, monkeypatch: MonkeyPatch, caplog: LogCaptureFixture
+    ) -> None:
+        caplog.set_level(logging.INFO, logger="llm_lab.api")
+
+        def fake_answer_question(
+            self: RagService,
+            dataset: str,
+            query: str,
+            top_k: int,
+            query_filter: QueryFilter | None = None,
+        ) -> QueryResult:
+            time.sleep(0.05)
+            check_deadline(GENERATE_STAGE)
+            raise AssertionError("The deadline should have been exceeded")
+
+        monkeypatch.setenv("LLM_API_KEY", "dummy-key")
+        monkeypatch.setattr(RagService, "answer_question", fake_answer_question)
+
+        response = client.post(
+            "/query",
+            json={"query": "Test Query", "top_k": 1, "dataset": "test_dataset"},
+            headers={"X-Request-Timeout": "0.01"},
+        )
+
+        assert response.status_code == 504
+        assert response.json() == {
+            "error": "Request deadline exceeded during generate",
+            "stage": "generate",
+        }
+        logs = json.loads(caplog.messages[0])
+        assert logs["timeout_stage"] == "generate"
+
+    def test_query_rejects_non_positive_timeout_header(
+        self, client: TestClient, monkeypatch: MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("LLM_API_KEY", "dummy-key")
+        response = client.post(
+            "/query",
+            json={"query": "Test Query", "top_k": 1, "dataset": "test_dataset"},
+            headers={"X-Request-Timeout": "0"},
+        )
+        assert response.status_code == 422
+
+    def test_query_is_shed_with_retry_after_when_overloaded(
+        self, client: TestClient, monkeypatch: MonkeyPatch
+    ) -> None:
+        def fake_answer_question(
+            self: RagService,
+            dataset: str,
+            query: str,
+            top_k: int,
+            query_filter: QueryFilter | None = None,
+        ) -> QueryResult:
+            raise AssertionError("Shed requests must not be answered")
+
+        monkeypatch.setenv("LLM_API_KEY", "dummy-key")
+        monkeypatch.setattr(RagService, "answer_question", fake_answer_question)
+        controller = AdmissionController(
+            max_concurrency=1, max_queue=0, max_wait_seconds=4
+        )
+        # Occupy the only slot, as a request being processed would.
+        controller._in_flight = 1
+        app.dependency_overrides[get_admission_controller] = lambda: controller
+        try:
+            response = client.post(
+                "/query",
+                json={"query": "Test Query", "top_k": 1, "dataset": "test_dataset"},
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "4"
+        assert "overloaded" in response.json()["error"]
+
+
+class TestQueryResponseCache:
+    @pytest.fixture
+    def answer_calls(self, monkeypatch: MonkeyPatch) -> Generator[list[str]]:
+        calls: list[str] = []
+
+        def fake_answer_question(
+            self: RagService,
+            dataset: str,
+            query: str,
+            top_k: int,
+            query_filter: QueryFilter | None = None,
+        ) -> QueryResult:
+            calls.append(query)
+            return QueryResult(answer=f"answer {len(calls)}", chunks=[])
+
+        monkeypatch.setenv("LLM_API_KEY", "dummy-key")
+        monkeypatch.setattr(RagService, "answer_question", fake_answer_question)
+        cache = InMemoryResponseCache(max_entries=10)
+        app.dependency_overrides[get_response_cache] = lambda: cache
+        app.dependency_overrides[get_retriever_client] = lambda: Retriever(
+            FakeLlmClient(), FakeVectorStoreClient()
+        )
+        yield calls
+        app.dependency_overrides.clear()
+
+    def test_identical_requests_are_served_from_cache(
+        self, client: TestClient, answer_calls: list[str]
+    ) -> None:
+        payload = {"query": "What is a pod?", "top_k": 1, "dataset": "test_dataset"}
+
+        first = client.post("/query", json=payload)
+        second = client.post("/query", json={**payload, "query": "what is a  POD?"})
+
+        assert answer_calls == ["What is a pod?"]
+        assert first.status_code == second.status_code == 200
+        assert second.json() == {"answer": "answer 1", "sources": []}
+        assert first.headers["etag"] == second.headers["etag"]
+        assert second.headers["cache-control"] == "private, no-cache"
+
+    def test_matching_if_none_match_returns_304(
+        self, client: TestClient, answer_calls: list[str]
+    ) -> None:
+        payload = {"query": "What is a pod?", "top_k": 1, "dataset": "test_dataset"}
+        etag = client.post("/query", json=payload).headers["etag"]
+
+        response = client.post("/query", json=payload, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        assert len(answer_calls) == 1
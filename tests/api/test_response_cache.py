@@ -0,0 +1,96 @@
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from llm_lab.api.response_cache import (
+    CachedResponse,
+    DiskResponseCache,
+    InMemoryResponseCache,
+    build_cache_key,
+    build_etag,
+    etag_matches,
+)
+from llm_lab.vector_store.types import QueryFilter
+
+
+def _response(body: str) -> CachedResponse:
+    return CachedResponse(etag=build_etag(body), body=body)
+
+
+class TestBuildCacheKey:
+    def test_key_ignores_case_and_whitespace_of_query(self) -> None:
+        assert build_cache_key(
+            "What is  a pod?", "ds", 3, None, "v1", "model"
+        ) == build_cache_key(" what is a POD? ", "ds", 3, None, "v1", "model")
+
+    def test_key_changes_with_any_other_input(self) -> None:
+        key = build_cache_key("q", "ds", 3, None, "v1", "model")
+        assert key != build_cache_key("q", "other", 3, None, "v1", "model")
+        assert key != build_cache_key("q", "ds", 2, None, "v1", "model")
+        assert key != build_cache_key(
+            "q", "ds", 3, QueryFilter(doc_path_prefix="a/"), "v1", "model"
+        )
+        assert key != build_cache_key("q", "ds", 3, None, "v2", "model")
+        assert key != build_cache_key("q", "ds", 3, None, "v1", "other-model")
+
+
+class TestEtagMatches:
+    def test_matches_listed_weak_and_wildcard_etags(self) -> None:
+        etag = build_etag("body")
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches(f"W/{etag}", etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+
+class TestInMemoryResponseCache:
+    def test_evicts_least_recently_used_entries(self) -> None:
+        cache = InMemoryResponseCache(max_entries=2)
+        cache.set("a", _response("a"))
+        cache.set("b", _response("b"))
+        cache.get("a")
+        cache.set("c", _response("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") == _response("a")
+        assert cache.get("c") == _response("c")
+
+
+class TestDiskResponseCache:
+    def test_round_trips_responses_across_instances(self, tmp_path: Path) -> None:
+        DiskResponseCache(tmp_path, max_bytes=10_000).set("key", _response("body"))
+
+        assert DiskResponseCache(tmp_path, max_bytes=10_000).get("key") == _response(
+            "body"
+        )
+        assert DiskResponseCache(tmp_path, max_bytes=10_000).get("missing") is None
+
+    def test_evicts_oldest_files_beyond_max_bytes(self, tmp_path: Path) -> None:
+        entry_size = len(_response("x" * 100).model_dump_json())
+        cache = DiskResponseCache(tmp_path, max_bytes=entry_size * 2)
+        for key in ("a", "b", "c"):
+            cache.set(key, _response("x" * 100))
+
+        assert cache.get("a") is None
+        assert cache.get("c") is not None
+        assert sum(p.stat().st_size for p in tmp_path.glob("*.json")) <= entry_size * 2
+
+    def test_writes_below_max_bytes_do_not_scan_the_directory(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        entry_size = len(_response("x" * 100).model_dump_json())
+        cache = DiskResponseCache(tmp_path, max_bytes=entry_size * 10)
+        scan = mocker.spy(cache, "_scan")
+
+        for key in "abcdefghij":
+            cache.set(key, _response("x" * 100))
+        # Rewriting an entry replaces its size instead of adding to it.
+        cache.set("a", _response("x" * 100))
+        assert scan.call_count == 0
+
+        cache.set("k", _response("x" * 100))
+        assert scan.call_count == 1
+        assert len(list(tmp_path.glob("*.json"))) == 9
+        cache.set("l", _response("x" * 100))
+        assert scan.call_count == 1
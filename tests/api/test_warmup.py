@@ -0,0 +1,114 @@
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from llm_lab.api.dependencies import get_warm_up
+from llm_lab.api.warmup import LoadState, WarmUp
+from llm_lab.llm.errors import LlmUnavailableError
+from llm_lab.main import app
+from llm_lab.vector_store.file.file_store import FileStoreClient
+from llm_lab.vector_store.types import IndexedChunk
+from tests.fakes import FakeLlmClient
+
+
+def _file_store(dest_dir: Path) -> FileStoreClient:
+    store = FileStoreClient(dest_dir=dest_dir)
+    chunks = [
+        IndexedChunk(
+            text=f"chunk {i}",
+            doc_path="docs/a.md",
+            source=f"docs/a.md#chunk-{i}",
+            embedding=[1.0, 0.0],
+            chunk_id=i,
+        )
+        for i in range(3)
+    ]
+    store.store(chunks, "ducks", "fake-embedding-model", docs_count=1)
+    return store
+
+
+class FailingEmbedLlmClient(FakeLlmClient):
+    def embed_text(self, text: str, embedding_model: str | None = None) -> list[float]:
+        raise LlmUnavailableError("down")
+
+
+class RecordingLlmClient(FakeLlmClient):
+    def __init__(self) -> None:
+        self.embedding_models: list[str | None] = []
+
+    def embed_text(self, text: str, embedding_model: str | None = None) -> list[float]:
+        self.embedding_models.append(embedding_model)
+        return super().embed_text(text, embedding_model)
+
+
+class TestWarmUp:
+    def test_not_ready_before_warm_up_finished(self) -> None:
+        assert not WarmUp().report().ready
+
+    def test_reports_loaded_datasets(self, tmp_path: Path) -> None:
+        warm_up = WarmUp()
+        warm_up.load_datasets(["ducks"], _file_store(tmp_path), "fake-embedding-model")
+        warm_up.finish()
+
+        report = warm_up.report()
+        assert report.ready
+        [status] = report.datasets
+        assert status.state == LoadState.READY
+        assert status.chunk_count == 3
+        assert status.memory_bytes is not None
+        assert status.memory_bytes > 0
+        assert status.load_seconds is not None
+        assert status.index_version is not None
+
+    def test_not_ready_when_a_dataset_fails_to_load(self, tmp_path: Path) -> None:
+        warm_up = WarmUp()
+        warm_up.load_datasets(
+            ["ducks", "geese"], _file_store(tmp_path), "fake-embedding-model"
+        )
+        warm_up.finish()
+
+        report = warm_up.report()
+        assert not report.ready
+        assert [s.state for s in report.datasets] == [
+            LoadState.READY,
+            LoadState.FAILED,
+        ]
+        assert report.datasets[1].error is not None
+
+    def test_failed_warm_up_embedding_does_not_affect_readiness(self) -> None:
+        warm_up = WarmUp()
+        warm_up.prime_llm(FailingEmbedLlmClient(), "fake-embedding-model")
+        warm_up.finish()
+
+        report = warm_up.report()
+        assert report.ready
+        assert report.embed_error == "down"
+
+    def test_prime_llm_embeds_with_given_model(self) -> None:
+        llm_client = RecordingLlmClient()
+
+        WarmUp().prime_llm(llm_client, "text-embedding-004")
+
+        assert llm_client.embedding_models == ["text-embedding-004"]
+
+
+class TestReadyApi:
+    def test_ready_returns_503_until_warm_up_finished(self, client: TestClient) -> None:
+        warm_up = WarmUp()
+        app.dependency_overrides[get_warm_up] = lambda: warm_up
+        try:
+            warming = client.get("/ready")
+            warm_up.finish()
+            ready = client.get("/ready")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert warming.status_code == 503
+        assert warming.json()["ready"] is False
+        assert ready.status_code == 200
+        assert ready.json() == {
+            "ready": True,
+            "error": None,
+            "embed_error": None,
+            "datasets": [],
+        }
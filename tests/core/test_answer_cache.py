@@ -0,0 +1,71 @@
+from llm_lab.core.answer_cache import CachedAnswer, SemanticAnswerCache
+from llm_lab.vector_store.types import QueryFilter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _answer(text: str) -> CachedAnswer:
+    return CachedAnswer(answer=text, chunks=[])
+
+
+class TestSemanticAnswerCache:
+    def test_lookup_returns_answer_for_similar_question(self) -> None:
+        cache = SemanticAnswerCache(similarity_threshold=0.95)
+        cache.store("ds", "v1", [1.0, 0.0], 3, None, _answer("cached"))
+
+        hit = cache.lookup("ds", "v1", [0.99, 0.05], 3)
+
+        assert hit is not None
+        assert hit.answer == "cached"
+
+    def test_lookup_misses_below_threshold(self) -> None:
+        cache = SemanticAnswerCache(similarity_threshold=0.95)
+        cache.store("ds", "v1", [1.0, 0.0], 3, None, _answer("cached"))
+
+        assert cache.lookup("ds", "v1", [0.7, 0.7], 3) is None
+
+    def test_lookup_requires_same_dataset_top_k_and_filter(self) -> None:
+        cache = SemanticAnswerCache()
+        query_filter = QueryFilter(doc_path_prefix="docs/")
+        cache.store("ds", "v1", [1.0, 0.0], 3, query_filter, _answer("cached"))
+
+        assert cache.lookup("other", "v1", [1.0, 0.0], 3, query_filter) is None
+        assert cache.lookup("ds", "v1", [1.0, 0.0], 2, query_filter) is None
+        assert cache.lookup("ds", "v1", [1.0, 0.0], 3) is None
+        assert cache.lookup("ds", "v1", [1.0, 0.0], 3, query_filter) is not None
+
+    def test_new_index_version_invalidates_dataset(self) -> None:
+        cache = SemanticAnswerCache()
+        cache.store("ds", "v1", [1.0, 0.0], 3, None, _answer("stale"))
+        cache.store("other", "v1", [1.0, 0.0], 3, None, _answer("kept"))
+
+        assert cache.lookup("ds", "v2", [1.0, 0.0], 3) is None
+        assert cache.lookup("ds", "v1", [1.0, 0.0], 3) is None
+        assert cache.lookup("other", "v1", [1.0, 0.0], 3) is not None
+
+    def test_entries_expire_after_ttl(self) -> None:
+        clock = FakeClock()
+        cache = SemanticAnswerCache(ttl_seconds=10, clock=clock)
+        cache.store("ds", "v1", [1.0, 0.0], 3, None, _answer("cached"))
+
+        clock.now = 10.0
+
+        assert cache.lookup("ds", "v1", [1.0, 0.0], 3) is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used_entries(self) -> None:
+        cache = SemanticAnswerCache(max_entries=2)
+        cache.store("ds", "v1", [1.0, 0.0], 3, None, _answer("a"))
+        cache.store("ds", "v1", [0.0, 1.0], 3, None, _answer("b"))
+        cache.lookup("ds", "v1", [1.0, 0.0], 3)
+        cache.store("ds", "v1", [-1.0, 0.0], 3, None, _answer("c"))
+
+        assert len(cache) == 2
+        assert cache.lookup("ds", "v1", [0.0, 1.0], 3) is None
+        assert cache.lookup("ds", "v1", [1.0, 0.0], 3) is not None
@@ -0,0 +1,81 @@
+import pytest
+
+from llm_lab.core.context_packing import ContextPacker, format_context
+from llm_lab.llm.tokens import estimate_tokens
+from llm_lab.vector_store.types import IndexedChunk, ScoredChunk
+
+
+def _scored(chunk_id: int, score: float, text: str) -> ScoredChunk:
+    return ScoredChunk(
+        score=score,
+        indexed_chunk=IndexedChunk(
+            text=text, doc_path="a.md", source="a.md", chunk_id=chunk_id
+        ),
+    )
+
+
+def _ids(chunks: list[ScoredChunk]) -> list[int]:
+    return [sc.indexed_chunk.chunk_id for sc in chunks]
+
+
+class TestContextPacker:
+    def test_everything_fits_within_budget(self) -> None:
+        chunks = [_scored(0, 0.9, "First."), _scored(1, 0.8, "Second.")]
+
+        packed = ContextPacker(token_budget=1000).pack(chunks)
+
+        assert _ids(packed.sources) == [0, 1]
+        assert [sc.indexed_chunk.text for sc in packed.passages] == [
+            "First.",
+            "Second.",
+        ]
+        assert packed.token_count == estimate_tokens(format_context(packed.passages))
+
+    def test_duplicate_paragraphs_are_only_included_once(self) -> None:
+        chunks = [
+            _scored(0, 0.9, "Pods run containers.\n\nShared paragraph."),
+            _scored(1, 0.8, "shared   paragraph.\n\nServices expose pods."),
+            _scored(2, 0.7, "Pods run containers."),
+        ]
+
+        packed = ContextPacker(token_budget=1000).pack(chunks)
+
+        assert _ids(packed.sources) == [0, 1]
+        texts = {
+            sc.indexed_chunk.chunk_id: sc.indexed_chunk.text for sc in packed.passages
+        }
+        assert texts[1] == "Services expose pods."
+
+    def test_trims_chunk_that_overflows_and_drops_the_rest(self) -> None:
+        long_text = " ".join(f"Sentence number {i}." for i in range(200))
+        chunks = [
+            _scored(0, 0.9, "Best chunk."),
+            _scored(1, 0.8, long_text),
+            _scored(2, 0.7, "Never reached."),
+        ]
+
+        packed = ContextPacker(token_budget=300).pack(chunks)
+
+        assert _ids(packed.sources) == [0, 1]
+        trimmed = packed.passages[1].indexed_chunk.text
+        assert long_text.startswith(trimmed)
+        assert trimmed.endswith(".")
+        assert packed.token_count <= 300
+
+    def test_best_chunk_is_always_included(self) -> None:
+        packed = ContextPacker(token_budget=10).pack([_scored(0, 0.9, "word " * 1000)])
+
+        assert _ids(packed.sources) == [0]
+        assert packed.passages[0].indexed_chunk.text
+
+    def test_best_passages_are_placed_at_the_edges(self) -> None:
+        chunks = [_scored(i, 1 - i / 10, f"Chunk {i}.") for i in range(5)]
+
+        packed = ContextPacker(token_budget=1000).pack(chunks)
+
+        assert _ids(packed.passages) == [0, 2, 4, 3, 1]
+        assert _ids(packed.sources) == [0, 1, 2, 3, 4]
+
+    def test_rejects_non_positive_budget(self) -> None:
+        with pytest.raises(ValueError):
+            ContextPacker(token_budget=0)
@@ -1,7 +1,13 @@
 import pytest
 from pytest_mock import MockerFixture
 
-from llm_lab.core.factories import create_vector_store_client
+from llm_lab.config.settings import Settings, VectorStoreType
+from llm_lab.core.factories import (
+    create_embedding_batcher,
+    create_vector_store_client,
+    shared_llm_client,
+)
+from llm_lab.vector_store.qdrant import shared_qdrant_store_client
 
 
 class TestFactories:
@@ -14,3 +20,38 @@ class TestFactories:
 
         with pytest.raises(NotImplementedError):
             create_vector_store_client()
+
+    def test_create_vector_store_client_shares_the_qdrant_client(
+        self, mocker: MockerFixture
+    ) -> None:
+        settings = Settings(
+            llm_api_key="dummy-key", VECTOR_STORE=VectorStoreType.QDRANT
+        )
+        mocker.patch("llm_lab.core.factories.get_settings", return_value=settings)
+        qdrant_client = mocker.patch("llm_lab.vector_store.qdrant.QdrantClient")
+        shared_qdrant_store_client.cache_clear()
+
+        try:
+            first = create_vector_store_client()
+            second = create_vector_store_client()
+        finally:
+            shared_qdrant_store_client.cache_clear()
+
+        assert first is second
+        qdrant_client.assert_called_once()
+
+    def test_embedding_batcher_uses_the_shared_llm_client(
+        self, mocker: MockerFixture
+    ) -> None:
+        settings = Settings(llm_api_key="dummy-key")
+        mocker.patch("llm_lab.core.factories.get_settings", return_value=settings)
+        shared_llm_client.cache_clear()
+
+        try:
+            batcher = create_embedding_batcher()
+            llm_client = shared_llm_client()
+        finally:
+            shared_llm_client.cache_clear()
+
+        assert batcher is not None
+        assert batcher.llm_client is llm_client
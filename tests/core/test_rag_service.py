@@ -1,6 +1,19 @@
+import time
+from typing import Any
+
+import pytest
+
+from llm_lab.core.answer_cache import SemanticAnswerCache
+from llm_lab.core.context_packing import ContextPacker
 from llm_lab.core.rag_service import RagService
+from llm_lab.observability.context import (
+    answer_cache_hit_context_var,
+    context_tokens_context_var,
+)
+from llm_lab.observability.deadline import DeadlineExceededError, deadline
 from llm_lab.retrieval.retriever import Retriever
-from tests.fakes import FakeVectorStoreClient, NoCallLlmClient
+from llm_lab.vector_store.types import IndexedChunk, ScoredChunk
+from tests.fakes import CountingLlmClient, FakeVectorStoreClient, NoCallLlmClient
 
 
 class TestRagService:
@@ -18,3 +31,63 @@ class TestRagService:
 
         assert result.answer == "No relevant information found to answer the question."
         assert result.chunks == []
+
+    def test_rag_service_reuses_cached_answer_without_generating(self) -> None:
+        llm_client = CountingLlmClient()
+        chunk = IndexedChunk(text="text", doc_path="a.md", source="a.md", chunk_id=0)
+        retriever = Retriever(
+            llm_client,
+            FakeVectorStoreClient([ScoredChunk(score=0.9, indexed_chunk=chunk)]),
+        )
+        rag_service = RagService(llm_client, retriever, SemanticAnswerCache())
+
+        first = rag_service.answer_question("test_dataset", "What is a pod?", 3)
+        second = rag_service.answer_question("test_dataset", "What's a pod?", 3)
+
+        assert first == second
+        assert llm_client.generate_calls == 1
+        assert llm_client.embed_calls == 2
+        assert answer_cache_hit_context_var.get() is True
+
+    def test_rag_service_does_not_generate_after_deadline(self) -> None:
+        llm_client = CountingLlmClient()
+        chunk = IndexedChunk(text="text", doc_path="a.md", source="a.md", chunk_id=0)
+
+        class SlowVectorStoreClient(FakeVectorStoreClient):
+            def query(self, *args: Any, **kwargs: Any) -> list[ScoredChunk]:
+                time.sleep(0.02)
+                return super().query(*args, **kwargs)
+
+        retriever = Retriever(
+            llm_client,
+            SlowVectorStoreClient([ScoredChunk(score=0.9, indexed_chunk=chunk)]),
+        )
+        rag_service = RagService(llm_client, retriever)
+
+        with deadline(0.01), pytest.raises(DeadlineExceededError) as exc_info:
+            rag_service.answer_question("test_dataset", "What is a pod?", 3)
+        assert exc_info.value.stage == "generate"
+        assert llm_client.generate_calls == 0
+
+    def test_rag_service_packs_context_into_token_budget(self) -> None:
+        llm_client = CountingLlmClient()
+        chunks = [
+            ScoredChunk(
+                score=0.9 - i / 10,
+                indexed_chunk=IndexedChunk(
+                    text="word " * 400, doc_path="a.md", source="a.md", chunk_id=i
+                ),
+            )
+            for i in range(3)
+        ]
+        retriever = Retriever(llm_client, FakeVectorStoreClient(chunks))
+        rag_service = RagService(
+            llm_client, retriever, context_packer=ContextPacker(token_budget=300)
+        )
+
+        result = rag_service.answer_question("test_dataset", "What is a pod?", 3)
+
+        assert [sc.indexed_chunk.chunk_id for sc in result.chunks] == [0]
+        tokens = context_tokens_context_var.get()
+        assert tokens is not None
+        assert tokens <= 300
@@ -1,11 +1,28 @@
-from llm_lab.vector_store.types import IndexedChunk, ScoredChunk, VectorStoreClient
+import threading
+from collections.abc import Iterable
+
+from llm_lab.vector_store.types import (
+    DatasetInfo,
+    DatasetStats,
+    IndexedChunk,
+    QueryFilter,
+    ScoredChunk,
+    VectorStoreClient,
+)
 
 
 class FakeLlmClient:
     def embed_text(self, text: str, embedding_model: str | None = None) -> list[float]:
         return [0.1, 0.2, 0.3]
 
-    def generate_response(self, prompt: str, model: str | None = None) -> str:
+    def embed_texts(
+        self, texts: list[str], embedding_model: str | None = None
+    ) -> list[list[float]]:
+        return [self.embed_text(text, embedding_model) for text in texts]
+
+    def generate_response(
+        self, prompt: str, model: str | None = None, cacheable_prefix: str | None = None
+    ) -> str:
         raise NotImplementedError
 
 
@@ -13,7 +30,14 @@ class NoCallLlmClient:
     def embed_text(self, text: str, embedding_model: str | None = None) -> list[float]:
         return [1.0, 0.0]
 
-    def generate_response(self, prompt: str, model: str | None = None) -> str:
+    def embed_texts(
+        self, texts: list[str], embedding_model: str | None = None
+    ) -> list[list[float]]:
+        return [self.embed_text(text, embedding_model) for text in texts]
+
+    def generate_response(
+        self, prompt: str, model: str | None = None, cacheable_prefix: str | None = None
+    ) -> str:
         raise AssertionError(
             "generate_response should not be called when no chunks are returned."
         )
@@ -30,12 +54,110 @@ class FakeVectorStoreClient(VectorStoreClient):
 
     def store(
         self,
-        indexed_chunks: list[IndexedChunk],
+        indexed_chunks: Iterable[IndexedChunk],
         dataset: str,
         embedding_model: str,
         docs_count: int,
     ) -> None:
         pass
 
-    def query(self, dataset: str, query_embedding: list[float]) -> list[ScoredChunk]:
+    def query(
+        self,
+        dataset: str,
+        embedding_model: str,
+        query_embedding: list[float],
+        limit: int,
+        query_filter: QueryFilter | None = None,
+        score_threshold: float | None = None,
+    ) -> list[ScoredChunk]:
         return self._scored_chunks
+
+    def get_index_version(self, dataset: str, embedding_model: str) -> str | None:
+        return "fake-index-version"
+
+    def warm_up(self, dataset: str, embedding_model: str) -> DatasetStats:
+        return DatasetStats(
+            chunk_count=len(self._scored_chunks), index_version="fake-index-version"
+        )
+
+    def get_dataset_info(self, dataset: str) -> DatasetInfo | None:
+        return None
+
+    def list_datasets(self) -> list[DatasetInfo]:
+        return []
+
+
+class DatasetVectorStoreClient(FakeVectorStoreClient):
+    """Fake VectorStoreClient returning different ScoredChunks for each dataset.
+
+    With a barrier, every query waits for the others, so queries only complete if
+    they run concurrently. Datasets listed in embedding_models report that model
+    in their metadata.
+    """
+
+    def __init__(
+        self,
+        scored_chunks_by_dataset: dict[str, list[ScoredChunk]],
+        barrier: threading.Barrier | None = None,
+        embedding_models: dict[str, str] | None = None,
+    ) -> None:
+        super().__init__()
+        self.scored_chunks_by_dataset = scored_chunks_by_dataset
+        self.barrier = barrier
+        self.embedding_models = embedding_models or {}
+        self.queries: list[tuple[str, str]] = []
+
+    def query(
+        self,
+        dataset: str,
+        embedding_model: str,
+        query_embedding: list[float],
+        limit: int,
+        query_filter: QueryFilter | None = None,
+        score_threshold: float | None = None,
+    ) -> list[ScoredChunk]:
+        self.queries.append((dataset, embedding_model))
+        if self.barrier is not None:
+            self.barrier.wait()
+        return self.scored_chunks_by_dataset[dataset][:limit]
+
+    def get_index_version(self, dataset: str, embedding_model: str) -> str | None:
+        return f"{dataset}-version"
+
+    def get_dataset_info(self, dataset: str) -> DatasetInfo | None:
+        if dataset not in self.embedding_models:
+            return None
+        return DatasetInfo(
+            dataset=dataset,
+            embedding_model=self.embedding_models[dataset],
+            docs_count=1,
+            chunk_count=len(self.scored_chunks_by_dataset[dataset]),
+        )
+
+
+class CountingLlmClient:
+    """Fake LLM client that records how often each method is called."""
+
+    def __init__(self, embedding: list[float] | None = None) -> None:
+        self.embedding = embedding or [1.0, 0.0]
+        self.embed_calls = 0
+        self.embed_batches: list[list[str]] = []
+        self.embed_batch_models: list[str | None] = []
+        self.generate_calls = 0
+
+    def embed_text(self, text: str, embedding_model: str | None = None) -> list[float]:
+        self.embed_calls += 1
+        return self.embedding
+
+    def embed_texts(
+        self, texts: list[str], embedding_model: str | None = None
+    ) -> list[list[float]]:
+        self.embed_batches.append(texts)
+        self.embed_batch_models.append(embedding_model)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def generate_response(
+        self, prompt: str, model: str | None = None, cacheable_prefix: str | None = None
+    ) -> str:
+        self.generate_calls += 1
+        return f"answer {self.generate_calls}"
@@ -0,0 +1,71 @@
+import pytest
+
+from llm_lab.llm.circuit_breaker import CircuitBreaker, CircuitState
+from llm_lab.llm.errors import LlmUnavailableError
+from llm_lab.observability.metrics import (
+    llm_circuit_rejections_counter,
+    llm_circuit_state_gauge,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures_and_rejects_calls(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10)
+        rejections_before = llm_circuit_rejections_counter.value
+
+        breaker.before_call()
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert llm_circuit_state_gauge.value == CircuitState.OPEN
+        with pytest.raises(LlmUnavailableError):
+            breaker.before_call()
+        assert llm_circuit_rejections_counter.value == rejections_before + 1
+
+    def test_success_resets_failure_count(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_lets_one_probe_through(self) -> None:
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 10
+        breaker.before_call()
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        with pytest.raises(LlmUnavailableError):
+            breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        breaker.before_call()
+
+    def test_failed_probe_reopens_circuit(self) -> None:
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 10
+        breaker.before_call()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        clock.now = 15
+        with pytest.raises(LlmUnavailableError):
+            breaker.before_call()
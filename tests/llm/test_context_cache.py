@@ -0,0 +1,88 @@
+from llm_lab.llm.context_cache import ContextCacheRegistry
+from llm_lab.observability.metrics import llm_context_cache_hits_counter
+
+PREFIX = "You are a helpful assistant. " * 10
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeProvider:
+    """Local stand-in for the provider's cache API."""
+
+    def __init__(self) -> None:
+        self.created: list[int] = []
+        self.deleted: list[str] = []
+
+    def create(self, ttl_seconds: int) -> str:
+        self.created.append(ttl_seconds)
+        return f"cachedContents/{len(self.created)}"
+
+    def delete(self, name: str) -> None:
+        self.deleted.append(name)
+
+
+def _handle(
+    registry: ContextCacheRegistry, provider: FakeProvider, prefix: str = PREFIX
+) -> str | None:
+    return registry.handle_for("model", prefix, provider.create, provider.delete)
+
+
+class TestContextCacheRegistry:
+    def test_registers_prefix_once_it_repeats_and_reuses_handle(self) -> None:
+        registry = ContextCacheRegistry(ttl_seconds=300, min_tokens=1)
+        provider = FakeProvider()
+        hits_before = llm_context_cache_hits_counter.value
+
+        assert _handle(registry, provider) is None
+        assert _handle(registry, provider) == "cachedContents/1"
+        assert _handle(registry, provider) == "cachedContents/1"
+
+        assert provider.created == [300]
+        assert llm_context_cache_hits_counter.value == hits_before + 1
+
+    def test_short_prefixes_are_not_cached(self) -> None:
+        registry = ContextCacheRegistry(min_tokens=10_000)
+        provider = FakeProvider()
+
+        for _ in range(3):
+            assert _handle(registry, provider) is None
+        assert provider.created == []
+        assert len(registry) == 0
+
+    def test_expired_handle_is_registered_again(self) -> None:
+        clock = FakeClock()
+        registry = ContextCacheRegistry(ttl_seconds=300, min_tokens=1, clock=clock)
+        provider = FakeProvider()
+        _handle(registry, provider)
+        _handle(registry, provider)
+
+        clock.now = 300
+        assert _handle(registry, provider) is None
+        assert _handle(registry, provider) == "cachedContents/2"
+
+    def test_evicted_handles_are_deleted_from_provider(self) -> None:
+        registry = ContextCacheRegistry(max_entries=1, min_tokens=1)
+        provider = FakeProvider()
+        _handle(registry, provider)
+        _handle(registry, provider)
+
+        _handle(registry, provider, "Another prefix " * 10)
+
+        assert provider.deleted == ["cachedContents/1"]
+        assert len(registry) == 1
+
+    def test_invalidate_forgets_handle(self) -> None:
+        registry = ContextCacheRegistry(min_tokens=1)
+        provider = FakeProvider()
+        _handle(registry, provider)
+        _handle(registry, provider)
+
+        registry.invalidate("model", PREFIX)
+
+        assert _handle(registry, provider) is None
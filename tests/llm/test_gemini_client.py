@@ -0,0 +1,281 @@
+import time
+from typing import Any
+
+import pytest
+from google.genai.errors import ClientError, ServerError
+from pytest_mock import MockerFixture
+
+import llm_lab.llm.gemini_client as gemini_client
+from llm_lab.llm.circuit_breaker import CircuitBreaker, CircuitState
+from llm_lab.llm.context_cache import ContextCacheRegistry
+from llm_lab.llm.errors import LlmInvalidRequestError, LlmUnavailableError
+from llm_lab.llm.gemini_client import GeminiClient
+from llm_lab.llm.rate_limit import TokenBucket
+from llm_lab.llm.retry import RetryPolicy
+from llm_lab.observability.deadline import DeadlineExceededError, deadline
+
+
+def _error_json(code: int, status: str, details: list[Any] | None = None) -> Any:
+    return {
+        "error": {
+            "code": code,
+            "message": status,
+            "status": status,
+            "details": details or [],
+        }
+    }
+
+
+@pytest.fixture
+def sleeps(mocker: MockerFixture) -> list[float]:
+    recorded: list[float] = []
+    mocker.patch.object(gemini_client.time, "sleep", side_effect=recorded.append)
+    return recorded
+
+
+def _client(mocker: MockerFixture, **kwargs: Any) -> GeminiClient:
+    client = GeminiClient("dummy-key", "model", "embedding-model", **kwargs)
+    client.client = mocker.MagicMock()
+    return client
+
+
+class TestGeminiClientRetries:
+    def test_retries_rate_limit_honoring_retry_delay(
+        self, mocker: MockerFixture, sleeps: list[float]
+    ) -> None:
+        client = _client(mocker)
+        rate_limited = ClientError(
+            429,
+            _error_json(
+                429,
+                "RESOURCE_EXHAUSTED",
+                [
+                    {
+                        "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                        "retryDelay": "7s",
+                    }
+                ],
+            ),
+        )
+        client.client.models.generate_content.side_effect = [
+            rate_limited,
+            mocker.MagicMock(text="answer"),
+        ]
+
+        assert client.generate_response("prompt") == "answer"
+        assert sleeps == [7.0]
+
+    def test_raises_unavailable_after_exhausting_retries(
+        self, mocker: MockerFixture, sleeps: list[float]
+    ) -> None:
+        client = _client(mocker, retry_policy=RetryPolicy(max_retries=2))
+        client.client.models.generate_content.side_effect = ServerError(
+            503, _error_json(503, "UNAVAILABLE")
+        )
+
+        with pytest.raises(LlmUnavailableError):
+            client.generate_response("prompt")
+        assert client.client.models.generate_content.call_count == 3
+        assert len(sleeps) == 2
+        assert all(0 <= delay <= 2.0 for delay in sleeps)
+
+    def test_does_not_retry_invalid_requests(
+        self, mocker: MockerFixture, sleeps: list[float]
+    ) -> None:
+        client = _client(mocker)
+        client.client.models.embed_content.side_effect = ClientError(
+            400, _error_json(400, "INVALID_ARGUMENT")
+        )
+
+        with pytest.raises(LlmInvalidRequestError):
+            client.embed_text("text")
+        assert client.client.models.embed_content.call_count == 1
+        assert sleeps == []
+
+    def test_each_attempt_acquires_from_its_rate_limiter(
+        self, mocker: MockerFixture, sleeps: list[float]
+    ) -> None:
+        embed_limiter = mocker.MagicMock(spec=TokenBucket)
+        generate_limiter = mocker.MagicMock(spec=TokenBucket)
+        client = _client(
+            mocker,
+            embed_rate_limiter=embed_limiter,
+            generate_rate_limiter=generate_limiter,
+        )
+        client.client.models.embed_content.side_effect = [
+            ServerError(500, _error_json(500, "INTERNAL")),
+            mocker.MagicMock(embeddings=[mocker.MagicMock(values=[1.0, 0.0])]),
+        ]
+
+        assert client.embed_text("text") == [1.0, 0.0]
+        assert embed_limiter.acquire.call_count == 2
+        generate_limiter.acquire.assert_not_called()
+
+
+class TestGeminiClientCircuitBreaker:
+    def test_open_circuit_fails_fast_without_calling_gemini(
+        self, mocker: MockerFixture, sleeps: list[float]
+    ) -> None:
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        client = _client(
+            mocker, retry_policy=RetryPolicy(max_retries=5), circuit_breaker=breaker
+        )
+        client.client.models.generate_content.side_effect = ServerError(
+            503, _error_json(503, "UNAVAILABLE")
+        )
+
+        with pytest.raises(LlmUnavailableError, match="not sending requests"):
+            client.generate_response("prompt")
+        assert client.client.models.generate_content.call_count == 2
+
+        with pytest.raises(LlmUnavailableError, match="not sending requests"):
+            client.generate_response("prompt")
+        assert client.client.models.generate_content.call_count == 2
+
+    def test_invalid_requests_do_not_open_circuit(
+        self, mocker: MockerFixture, sleeps: list[float]
+    ) -> None:
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = _client(mocker, circuit_breaker=breaker)
+        client.client.models.embed_content.side_effect = ClientError(
+            400, _error_json(400, "INVALID_ARGUMENT")
+        )
+
+        with pytest.raises(LlmInvalidRequestError):
+            client.embed_text("text")
+        assert breaker.state == CircuitState.CLOSED
+
+
+class TestGeminiClientDeadline:
+    def test_request_timeout_is_the_remaining_budget(
+        self, mocker: MockerFixture
+    ) -> None:
+        client = _client(mocker)
+        client.client.models.generate_content.return_value = mocker.MagicMock(
+            text="answer"
+        )
+
+        with deadline(2):
+            client.generate_response("prompt")
+
+        config = client.client.models.generate_content.call_args.kwargs["config"]
+        assert 0 < config.http_options.timeout <= 2000
+
+    def test_spent_budget_fails_without_calling_gemini(
+        self, mocker: MockerFixture
+    ) -> None:
+        client = _client(mocker)
+
+        with deadline(0), pytest.raises(DeadlineExceededError) as exc_info:
+            client.embed_text("text")
+        assert exc_info.value.stage == "embed"
+        client.client.models.embed_content.assert_not_called()
+
+    def test_does_not_back_off_past_the_deadline(
+        self, mocker: MockerFixture, sleeps: list[float]
+    ) -> None:
+        client = _client(mocker)
+        client.client.models.generate_content.side_effect = ClientError(
+            429,
+            _error_json(
+                429,
+                "RESOURCE_EXHAUSTED",
+                [
+                    {
+                        "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                        "retryDelay": "20s",
+                    }
+                ],
+            ),
+        )
+
+        with deadline(5), pytest.raises(DeadlineExceededError) as exc_info:
+            client.generate_response("prompt")
+        assert exc_info.value.stage == "generate"
+        assert client.client.models.generate_content.call_count == 1
+        assert sleeps == []
+
+    def test_timed_out_request_does_not_count_against_circuit(
+        self, mocker: MockerFixture
+    ) -> None:
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = _client(mocker, circuit_breaker=breaker)
+
+        def slow_request(**kwargs: Any) -> Any:
+            time.sleep(0.02)
+            raise TimeoutError("read timed out")
+
+        client.client.models.generate_content.side_effect = slow_request
+
+        with deadline(0.01), pytest.raises(DeadlineExceededError):
+            client.generate_response("prompt")
+        assert breaker.state == CircuitState.CLOSED
+
+
+class TestGeminiClientContextCache:
+    PREFIX = "Context:\nhot chunk\n\n"
+    PROMPT = PREFIX + "Question: q\nAnswer:"
+
+    def _cached_client(self, mocker: MockerFixture) -> GeminiClient:
+        client = _client(mocker, context_cache=ContextCacheRegistry(min_tokens=1))
+        client.client.models.generate_content.return_value = mocker.MagicMock(
+            text="answer"
+        )
+        client.client.caches.create.return_value.name = "cachedContents/1"
+        return client
+
+    def test_repeated_prefix_is_cached_and_referenced(
+        self, mocker: MockerFixture
+    ) -> None:
+        client = self._cached_client(mocker)
+        generate = client.client.models.generate_content
+
+        client.generate_response(self.PROMPT, cacheable_prefix=self.PREFIX)
+        assert generate.call_args.kwargs["contents"] == self.PROMPT
+        assert generate.call_args.kwargs["config"].cached_content is None
+
+        for _ in range(2):
+            assert (
+                client.generate_response(self.PROMPT, cacheable_prefix=self.PREFIX)
+                == "answer"
+            )
+            assert generate.call_args.kwargs["contents"] == "Question: q\nAnswer:"
+            assert generate.call_args.kwargs["config"].cached_content == (
+                "cachedContents/1"
+            )
+
+        client.client.caches.create.assert_called_once()
+        config = client.client.caches.create.call_args.kwargs["config"]
+        assert config.contents[0].parts[0].text == self.PREFIX
+
+    def test_falls_back_to_full_prompt_when_cache_is_gone(
+        self, mocker: MockerFixture
+    ) -> None:
+        client = self._cached_client(mocker)
+        client.generate_response(self.PROMPT, cacheable_prefix=self.PREFIX)
+        client.client.models.generate_content.side_effect = [
+            ClientError(403, _error_json(403, "PERMISSION_DENIED")),
+            mocker.MagicMock(text="answer"),
+        ]
+
+        assert (
+            client.generate_response(self.PROMPT, cacheable_prefix=self.PREFIX)
+            == "answer"
+        )
+        kwargs = client.client.models.generate_content.call_args.kwargs
+        assert kwargs["contents"] == self.PROMPT
+        assert kwargs["config"].cached_content is None
+
+    def test_cache_creation_failure_sends_full_prompt(
+        self, mocker: MockerFixture
+    ) -> None:
+        client = self._cached_client(mocker)
+        client.client.caches.create.side_effect = ClientError(
+            400, _error_json(400, "INVALID_ARGUMENT")
+        )
+
+        for _ in range(2):
+            client.generate_response(self.PROMPT, cacheable_prefix=self.PREFIX)
+
+        kwargs = client.client.models.generate_content.call_args.kwargs
+        assert kwargs["contents"] == self.PROMPT
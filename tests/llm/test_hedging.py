@@ -0,0 +1,89 @@
+import threading
+
+from llm_lab.llm.hedging import Hedger, LatencyTracker
+from llm_lab.observability.metrics import (
+    llm_hedge_wins_counter,
+    llm_hedged_requests_counter,
+)
+
+
+def _warm_tracker(latency: float) -> LatencyTracker:
+    tracker = LatencyTracker(min_samples=5)
+    for _ in range(5):
+        tracker.record(latency)
+    return tracker
+
+
+class TestLatencyTracker:
+    def test_percentile_requires_min_samples(self) -> None:
+        tracker = LatencyTracker(min_samples=3)
+        tracker.record(1.0)
+        tracker.record(2.0)
+        assert tracker.percentile(50) is None
+
+        tracker.record(3.0)
+        assert tracker.percentile(50) == 2.0
+
+
+class TestHedger:
+    def test_fast_call_is_not_hedged(self) -> None:
+        hedger = Hedger(percentile=50, latency_tracker=_warm_tracker(1.0))
+        calls = []
+        hedged_before = llm_hedged_requests_counter.value
+
+        assert hedger.call(lambda: calls.append(1) or "result") == "result"
+        assert calls == [1]
+        assert llm_hedged_requests_counter.value == hedged_before
+
+    def test_slow_call_is_hedged_and_fastest_result_wins(self) -> None:
+        hedger = Hedger(percentile=50, latency_tracker=_warm_tracker(0.01))
+        release_original = threading.Event()
+        calls = 0
+        lock = threading.Lock()
+        hedged_before = llm_hedged_requests_counter.value
+        wins_before = llm_hedge_wins_counter.value
+
+        def request() -> str:
+            nonlocal calls
+            with lock:
+                calls += 1
+                call_number = calls
+            if call_number == 1:
+                release_original.wait(timeout=5)
+                return "original"
+            return "hedge"
+
+        try:
+            assert hedger.call(request) == "hedge"
+        finally:
+            release_original.set()
+        assert calls == 2
+        assert llm_hedged_requests_counter.value == hedged_before + 1
+        assert llm_hedge_wins_counter.value == wins_before + 1
+
+    def test_hedges_are_capped_by_max_outstanding(self) -> None:
+        hedger = Hedger(
+            percentile=50, max_outstanding=1, latency_tracker=_warm_tracker(0.01)
+        )
+        hedger._hedge_slots.acquire()
+        calls = []
+
+        assert hedger.call(lambda: calls.append(1) or "result") == "result"
+        assert calls == [1]
+
+    def test_failed_hedge_falls_back_to_original(self) -> None:
+        hedger = Hedger(percentile=50, latency_tracker=_warm_tracker(0.01))
+        calls = 0
+        lock = threading.Lock()
+
+        def request() -> str:
+            nonlocal calls
+            with lock:
+                calls += 1
+                call_number = calls
+            if call_number == 2:
+                raise RuntimeError("hedge failed")
+            threading.Event().wait(0.1)
+            return "original"
+
+        assert hedger.call(request) == "original"
@@ -0,0 +1,102 @@
+import pytest
+
+from llm_lab.llm.rate_limit import TokenBucket, shared_token_bucket
+from llm_lab.llm.retry import RetryPolicy, retry_after_seconds
+from llm_lab.observability.deadline import DeadlineExceededError, deadline
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket:
+    def test_allows_burst_then_paces_to_rate(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(2.0, capacity=2, clock=clock, sleep=clock.sleep)
+
+        for _ in range(4):
+            bucket.acquire("embed")
+
+        assert clock.sleeps == pytest.approx([0.5, 0.5])
+
+    def test_refills_while_idle_up_to_capacity(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(1.0, capacity=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire("embed")
+
+        clock.now += 10
+        bucket.acquire("embed")
+        bucket.acquire("embed")
+
+        assert clock.sleeps == pytest.approx([1.0])
+
+    def test_raises_instead_of_waiting_past_the_deadline(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(1.0, capacity=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire("embed")
+
+        with deadline(0.5), pytest.raises(DeadlineExceededError) as exc_info:
+            bucket.acquire("embed")
+
+        assert exc_info.value.stage == "embed"
+        assert clock.sleeps == []
+        # The tokens of the failed call are given back.
+        clock.now += 1
+        bucket.acquire("embed")
+        assert clock.sleeps == []
+
+    def test_waits_when_the_deadline_leaves_time(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(2.0, capacity=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire("embed")
+
+        with deadline(5):
+            bucket.acquire("embed")
+
+        assert clock.sleeps == pytest.approx([0.5])
+
+    def test_shared_buckets_are_reused_per_name_and_rate(self) -> None:
+        assert shared_token_bucket("embed", 5.0) is shared_token_bucket("embed", 5.0)
+        assert shared_token_bucket("embed", 5.0) is not shared_token_bucket(
+            "generate", 5.0
+        )
+
+    def test_rejects_non_positive_rate(self) -> None:
+        with pytest.raises(ValueError):
+            TokenBucket(0)
+
+
+class TestRetryPolicy:
+    def test_backoff_is_jittered_below_exponential_ceiling(self) -> None:
+        policy = RetryPolicy(initial_backoff_seconds=1, max_backoff_seconds=5)
+        for attempt, ceiling in [(0, 1), (1, 2), (2, 4), (5, 5)]:
+            assert 0 <= policy.backoff_seconds(attempt) <= ceiling
+
+    def test_server_hint_takes_precedence_up_to_max_backoff(self) -> None:
+        policy = RetryPolicy(max_backoff_seconds=10)
+        assert policy.backoff_seconds(0, retry_after=3) == 3
+        assert policy.backoff_seconds(0, retry_after=60) == 10
+
+    def test_retry_after_reads_header_then_retry_info(self) -> None:
+        retry_info = {
+            "error": {
+                "details": [
+                    {
+                        "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                        "retryDelay": "12.5s",
+                    }
+                ]
+            }
+        }
+        assert retry_after_seconds({"retry-after": "4"}, retry_info) == 4
+        assert retry_after_seconds(None, retry_info) == 12.5
+        assert retry_after_seconds({}, {"error": {"details": []}}) is None
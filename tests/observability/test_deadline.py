@@ -0,0 +1,38 @@
+import time
+
+import pytest
+
+from llm_lab.observability.context import timeout_stage_context_var
+from llm_lab.observability.deadline import (
+    DeadlineExceededError,
+    check_deadline,
+    deadline,
+    remaining_seconds,
+)
+
+
+class TestDeadline:
+    def test_no_deadline_by_default(self) -> None:
+        assert remaining_seconds() is None
+        assert check_deadline("embed") is None
+
+    def test_remaining_budget_is_bounded_by_timeout(self) -> None:
+        with deadline(10):
+            remaining = check_deadline("embed")
+            assert remaining is not None
+            assert 0 < remaining <= 10
+        assert remaining_seconds() is None
+
+    def test_nested_deadline_never_extends_outer_one(self) -> None:
+        with deadline(1), deadline(10):
+            remaining = remaining_seconds()
+            assert remaining is not None
+            assert remaining <= 1
+
+    def test_spent_budget_raises_and_records_stage(self) -> None:
+        with deadline(0.001):
+            time.sleep(0.01)
+            with pytest.raises(DeadlineExceededError) as exc_info:
+                check_deadline("retrieve")
+        assert exc_info.value.stage == "retrieve"
+        assert timeout_stage_context_var.get() == "retrieve"
@@ -0,0 +1,74 @@
+import pytest
+
+from llm_lab.retrieval.deduplication import (
+    DuplicateDetector,
+    find_duplicates,
+    max_hamming_distance,
+    normalize_text,
+    simhash,
+)
+
+POD_TEXT = (
+    "Kubernetes pods are the smallest deployable units of computing that you can "
+    "create and manage in Kubernetes. A pod is a group of one or more containers, "
+    "with shared storage and network resources, and a specification for how to run "
+    "the containers."
+)
+DUCK_TEXT = (
+    "Ducks are aquatic birds found in both fresh water and sea water. They are "
+    "omnivorous and eat plants, insects, and small fish."
+)
+
+
+class TestDeduplication:
+    def test_normalize_text_ignores_case_punctuation_and_whitespace(self) -> None:
+        assert normalize_text("## Hello,\n\n  *World*!") == "hello world"
+
+    def test_simhash_of_near_duplicates_differs_in_few_bits(self) -> None:
+        pod = simhash(normalize_text(POD_TEXT))
+        near = simhash(normalize_text(POD_TEXT.replace("smallest", "tiniest")))
+        duck = simhash(normalize_text(DUCK_TEXT))
+
+        assert (pod ^ near).bit_count() <= max_hamming_distance(0.9)
+        assert (pod ^ duck).bit_count() > max_hamming_distance(0.9)
+
+    @pytest.mark.parametrize(
+        ("threshold", "distance"), [(1.0, 0), (0.9, 6), (0.75, 16), (0.5, 32)]
+    )
+    def test_max_hamming_distance(self, threshold: float, distance: int) -> None:
+        assert max_hamming_distance(threshold) == distance
+
+    def test_find_duplicates_keeps_first_chunk_of_each_group(self) -> None:
+        groups = find_duplicates(
+            [
+                ("a.md#chunk-0", POD_TEXT),
+                ("b.md#chunk-0", DUCK_TEXT),
+                ("c.md#chunk-3", POD_TEXT.upper()),
+                ("d.md#chunk-1", POD_TEXT.replace("smallest", "tiniest")),
+            ],
+            similarity_threshold=0.9,
+        )
+
+        assert groups.duplicate_of == {
+            "c.md#chunk-3": "a.md#chunk-0",
+            "d.md#chunk-1": "a.md#chunk-0",
+        }
+        assert groups.alternate_sources == {
+            "a.md#chunk-0": ["c.md#chunk-3", "d.md#chunk-1"]
+        }
+        assert (groups.exact_count, groups.near_count) == (1, 1)
+
+    def test_threshold_of_one_keeps_near_duplicates(self) -> None:
+        detector = DuplicateDetector(similarity_threshold=1.0)
+
+        assert detector.add("a", POD_TEXT) is None
+        assert detector.add("b", POD_TEXT.replace("smallest", "tiniest")) is None
+        assert detector.add("c", f"  {POD_TEXT}\n") == "a"
+
+    def test_without_threshold_only_exact_duplicates_are_found(self) -> None:
+        detector = DuplicateDetector()
+
+        assert detector.add("a", POD_TEXT) is None
+        assert detector.add("b", POD_TEXT.replace("smallest", "tiniest")) is None
+        assert detector.add("c", POD_TEXT.upper()) == "a"
+        assert (detector.groups.exact_count, detector.groups.near_count) == (1, 0)
@@ -0,0 +1,157 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from llm_lab.observability.deadline import EMBED_STAGE, check_deadline, deadline
+from llm_lab.retrieval.embedding_batcher import EmbeddingBatcher
+from tests.fakes import CountingLlmClient
+
+
+class BlockingLlmClient(CountingLlmClient):
+    """Fake LLM client whose first embed_texts call blocks until released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.first_call_started = threading.Event()
+        self.release_first_call = threading.Event()
+
+    def embed_texts(
+        self, texts: list[str], embedding_model: str | None = None
+    ) -> list[list[float]]:
+        if not self.first_call_started.is_set():
+            self.first_call_started.set()
+            self.release_first_call.wait(timeout=5)
+        return super().embed_texts(texts, embedding_model)
+
+
+class SlowBatchLlmClient(BlockingLlmClient):
+    """Fake LLM client whose later calls take 0.3s, bounded by the context deadline."""
+
+    def embed_texts(
+        self, texts: list[str], embedding_model: str | None = None
+    ) -> list[list[float]]:
+        if self.first_call_started.is_set():
+            time.sleep(0.3)
+            check_deadline(EMBED_STAGE)
+        return super().embed_texts(texts, embedding_model)
+
+
+def _embed_within(
+    batcher: EmbeddingBatcher, text: str, timeout_seconds: float
+) -> list[float]:
+    with deadline(timeout_seconds):
+        return batcher.embed(text, "model")
+
+
+def _wait_for_queue(batcher: EmbeddingBatcher, size: int) -> None:
+    deadline = time.monotonic() + 5
+    while len(batcher._queue) < size and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class TestEmbeddingBatcher:
+    def test_lone_request_is_not_delayed_by_window(self) -> None:
+        llm_client = CountingLlmClient()
+        batcher = EmbeddingBatcher(llm_client, window_ms=5000)
+
+        start = time.monotonic()
+        embedding = batcher.embed("abc", "model")
+
+        assert time.monotonic() - start < 1
+        assert embedding == [3.0, 1.0]
+        assert llm_client.embed_batches == [["abc"]]
+
+    def test_requests_queued_under_load_share_one_call(self) -> None:
+        llm_client = BlockingLlmClient()
+        batcher = EmbeddingBatcher(llm_client, window_ms=5000)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(batcher.embed, "a", "model")
+            llm_client.first_call_started.wait(timeout=5)
+            queued = [
+                executor.submit(batcher.embed, text, "model") for text in ("bb", "ccc")
+            ]
+            _wait_for_queue(batcher, 2)
+            llm_client.release_first_call.set()
+
+            assert first.result(timeout=5) == [1.0, 1.0]
+            assert [f.result(timeout=5) for f in queued] == [[2.0, 1.0], [3.0, 1.0]]
+        assert llm_client.embed_batches[0] == ["a"]
+        assert sorted(llm_client.embed_batches[1]) == ["bb", "ccc"]
+
+    def test_batches_are_capped_at_max_batch_size(self) -> None:
+        llm_client = BlockingLlmClient()
+        batcher = EmbeddingBatcher(llm_client, window_ms=5000, max_batch_size=2)
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            first = executor.submit(batcher.embed, "a", "model")
+            llm_client.first_call_started.wait(timeout=5)
+            queued = [executor.submit(batcher.embed, "b", "model") for _ in range(5)]
+            # A full batch is flushed without waiting for the in-flight call.
+            deadline = time.monotonic() + 5
+            while not llm_client.embed_batches and time.monotonic() < deadline:
+                time.sleep(0.001)
+            assert llm_client.embed_batches[0] == ["b", "b"]
+            llm_client.release_first_call.set()
+            first.result(timeout=5)
+            for future in queued:
+                future.result(timeout=5)
+
+        batch_sizes = [len(batch) for batch in llm_client.embed_batches]
+        assert sum(batch_sizes) == 6
+        assert max(batch_sizes) == 2
+
+    def test_texts_are_only_batched_with_texts_for_the_same_model(self) -> None:
+        llm_client = BlockingLlmClient()
+        batcher = EmbeddingBatcher(llm_client, window_ms=5000)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(batcher.embed, "a", "model")
+            llm_client.first_call_started.wait(timeout=5)
+            queued = [
+                executor.submit(batcher.embed, text, model)
+                for text, model in (("bb", "other-model"), ("ccc", "model"))
+            ]
+            _wait_for_queue(batcher, 2)
+            llm_client.release_first_call.set()
+
+            first.result(timeout=5)
+            assert [f.result(timeout=5) for f in queued] == [[2.0, 1.0], [3.0, 1.0]]
+        assert sorted(
+            zip(llm_client.embed_batch_models, llm_client.embed_batches, strict=True)
+        ) == [
+            ("model", ["a"]),
+            ("model", ["ccc"]),
+            ("other-model", ["bb"]),
+        ]
+
+    def test_short_deadline_of_leader_does_not_fail_the_batch(self) -> None:
+        llm_client = SlowBatchLlmClient()
+        batcher = EmbeddingBatcher(llm_client, window_ms=5000, max_batch_size=2)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            first = executor.submit(batcher.embed, "a", "model")
+            llm_client.first_call_started.wait(timeout=5)
+            leader = executor.submit(_embed_within, batcher, "bb", 0.1)
+            _wait_for_queue(batcher, 1)
+            follower = executor.submit(_embed_within, batcher, "ccc", 10)
+
+            assert follower.result(timeout=5) == [3.0, 1.0]
+            llm_client.release_first_call.set()
+            first.result(timeout=5)
+            leader.result(timeout=5)
+        assert sorted(llm_client.embed_batches[0]) == ["bb", "ccc"]
+
+    def test_errors_are_raised_in_every_caller_of_the_batch(self) -> None:
+        llm_client = CountingLlmClient()
+        batcher = EmbeddingBatcher(llm_client)
+
+        def fail(texts: list[str], embedding_model: str | None = None) -> None:
+            raise RuntimeError("boom")
+
+        llm_client.embed_texts = fail  # type: ignore[method-assign, assignment]
+
+        with pytest.raises(RuntimeError, match="boom"):
+            batcher.embed("a", "model")
+
+    def test_rejects_invalid_batch_size(self) -> None:
+        with pytest.raises(ValueError):
+            EmbeddingBatcher(CountingLlmClient(), max_batch_size=0)
@@ -5,8 +5,8 @@ from _pytest.monkeypatch import MonkeyPatch
 
 import llm_lab.retrieval.indexing as indexing
 from llm_lab.retrieval.indexing import Indexer, _create_chunks
-from llm_lab.retrieval.types import ChunkingConfig
-from tests.fakes import FakeLlmClient
+from llm_lab.retrieval.types import ChunkingConfig, DeduplicationConfig, IndexingStats
+from tests.fakes import CountingLlmClient, FakeLlmClient
 
 
 class TestChunking:
@@ -69,7 +69,7 @@ class TestIndexer:
 
         indexed_chunks, docs_count = indexer.run(fake_llm_client)
         assert docs_count == 1
-        assert len(indexed_chunks) == 1
+        assert len(list(indexed_chunks)) == 1
 
     def test_indexer_no_markdown_files_returns_error(
         self,
@@ -95,3 +95,117 @@ class TestIndexer:
         assert (
             str(excinfo.value) == f"No Markdown files found in directory {source_dir}"
         )
+
+    def test_indexer_streams_chunks_embedded_in_batches(
+        self, tmp_path: Path, monkeypatch: MonkeyPatch
+    ) -> None:
+        source_dir = tmp_path / "source"
+        source_dir.mkdir()
+        for name in ("a", "b"):
+            (source_dir / f"{name}.md").write_text("One. Two. Three.", encoding="utf-8")
+        monkeypatch.setattr(indexing, "BASE_DIR", tmp_path)
+        llm_client = CountingLlmClient()
+        indexer = Indexer(
+            source_dir=source_dir,
+            chunking_config=ChunkingConfig(chunk_size=6, chunk_separator=" "),
+            embedding_model="models/embedding-001",
+            dataset="test_dataset",
+        )
+
+        stream = indexer.iter_indexed_chunks(
+            llm_client, sorted(indexer.load_docs()), batch_size=4
+        )
+        first = next(stream)
+
+        assert llm_client.embed_batches == [["One.", "Two.", "Three.", "One."]]
+        rest = list(stream)
+        assert [chunk.source for chunk in [first, *rest]] == [
+            "source/a.md#chunk-0",
+            "source/a.md#chunk-1",
+            "source/a.md#chunk-2",
+            "source/b.md#chunk-0",
+            "source/b.md#chunk-1",
+            "source/b.md#chunk-2",
+        ]
+        assert llm_client.embed_batches[1] == ["Two.", "Three."]
+
+    def test_indexer_embeds_duplicated_chunks_once(
+        self, tmp_path: Path, monkeypatch: MonkeyPatch
+    ) -> None:
+        source_dir = tmp_path / "source"
+        source_dir.mkdir()
+        (source_dir / "a.md").write_text(
+            "Shared disclaimer.\n\nAbout ducks.", encoding="utf-8"
+        )
+        (source_dir / "b.md").write_text(
+            "SHARED  disclaimer!\n\nAbout geese.", encoding="utf-8"
+        )
+        monkeypatch.setattr(indexing, "BASE_DIR", tmp_path)
+        llm_client = CountingLlmClient()
+        indexer = Indexer(
+            source_dir=source_dir,
+            chunking_config=ChunkingConfig(chunk_size=20, chunk_separator="\n\n"),
+            embedding_model="models/embedding-001",
+            dataset="test_dataset",
+            deduplication_config=DeduplicationConfig(),
+        )
+
+        indexed_chunks = list(
+            indexer.iter_indexed_chunks(llm_client, sorted(indexer.load_docs()))
+        )
+
+        assert llm_client.embed_batches == [
+            ["Shared disclaimer.", "About ducks.", "About geese."]
+        ]
+        assert indexed_chunks[0].alternate_sources == ["source/b.md#chunk-0"]
+        assert [chunk.source for chunk in indexed_chunks[1:]] == [
+            "source/a.md#chunk-1",
+            "source/b.md#chunk-1",
+        ]
+        assert indexer.stats == IndexingStats(
+            docs_count=2,
+            chunks_count=4,
+            exact_duplicates=1,
+            embedded_chunks=3,
+            skipped_chars=len("SHARED  disclaimer!"),
+        )
+
+    @pytest.mark.parametrize(
+        ("near_duplicates", "embedded_chunks"), [(False, 2), (True, 1)]
+    )
+    def test_indexer_only_skips_near_duplicates_when_asked_to(
+        self,
+        tmp_path: Path,
+        monkeypatch: MonkeyPatch,
+        near_duplicates: bool,
+        embedded_chunks: int,
+    ) -> None:
+        source_dir = tmp_path / "source"
+        source_dir.mkdir()
+        text = (
+            "Kubernetes pods are the smallest deployable units of computing that you "
+            "can create and manage in Kubernetes. A pod is a group of one or more "
+            "containers, with shared storage and network resources, and a "
+            "specification for how to run the containers."
+        )
+        (source_dir / "a.md").write_text(text, encoding="utf-8")
+        (source_dir / "b.md").write_text(
+            text.replace("smallest", "tiniest"), encoding="utf-8"
+        )
+        monkeypatch.setattr(indexing, "BASE_DIR", tmp_path)
+        indexer = Indexer(
+            source_dir=source_dir,
+            chunking_config=ChunkingConfig(chunk_size=1000, chunk_separator="\n\n"),
+            embedding_model="models/embedding-001",
+            dataset="test_dataset",
+            deduplication_config=DeduplicationConfig(near_duplicates=near_duplicates),
+        )
+
+        indexed_chunks = list(
+            indexer.iter_indexed_chunks(
+                CountingLlmClient(), sorted(indexer.load_docs())
+            )
+        )
+
+        assert len(indexed_chunks) == embedded_chunks
+        assert indexer.stats.near_duplicates == 2 - embedded_chunks
@@ -1,6 +1,27 @@
+import threading
+import typing
+
+import pytest
+
+from llm_lab.observability.context import dataset_retrieve_ms_context_var
+from llm_lab.retrieval.embedding_batcher import EmbeddingBatcher
 from llm_lab.retrieval.retriever import Retriever
 from llm_lab.vector_store.types import IndexedChunk, ScoredChunk
-from tests.fakes import FakeLlmClient, FakeVectorStoreClient
+from tests.fakes import (
+    CountingLlmClient,
+    DatasetVectorStoreClient,
+    FakeLlmClient,
+    FakeVectorStoreClient,
+)
+
+
+def _scored(source: str, score: float) -> ScoredChunk:
+    return ScoredChunk(
+        score=score,
+        indexed_chunk=IndexedChunk(
+            text=source, doc_path=source, source=source, chunk_id=0
+        ),
+    )
 
 
 class TestRetriever:
@@ -43,3 +64,158 @@ class TestRetriever:
         assert "high similarity" in texts
         assert "medium similarity" in texts
         assert "low similarity" not in texts
+
+    def test_embed_query_uses_embedding_batcher(self) -> None:
+        llm_client = CountingLlmClient()
+        retriever = Retriever(
+            llm_client,
+            FakeVectorStoreClient(),
+            EmbeddingBatcher(llm_client),
+        )
+
+        assert retriever.embed_query("query", "model") == [5.0, 1.0]
+        assert llm_client.embed_batches == [["query"]]
+        assert llm_client.embed_calls == 0
+
+    def test_search_datasets_embeds_once_and_queries_datasets_concurrently(
+        self,
+    ) -> None:
+        llm_client = CountingLlmClient()
+        vector_store = DatasetVectorStoreClient(
+            {
+                "a": [_scored("a.md", 0.9), _scored("a2.md", 0.8)],
+                "b": [_scored("b.md", 0.75)],
+            },
+            barrier=threading.Barrier(2, timeout=5),
+        )
+        retriever = Retriever(llm_client, vector_store)
+
+        result = retriever.search_datasets(["a", "b"], "query", top_k=3)
+
+        assert llm_client.embed_calls == 1
+        assert sorted(vector_store.queries) == [
+            ("a", "gemini-embedding-001"),
+            ("b", "gemini-embedding-001"),
+        ]
+        assert [(sc.dataset, sc.indexed_chunk.source) for sc in result] == [
+            ("a", "a.md"),
+            ("a", "a2.md"),
+            ("b", "b.md"),
+        ]
+        assert [sc.score for sc in result] == [0.9, 0.8, 0.75]
+        assert set(
+            typing.cast(dict[str, float], dataset_retrieve_ms_context_var.get())
+        ) == {
+            "a",
+            "b",
+        }
+
+    def test_search_embeds_with_model_of_dataset(self) -> None:
+        llm_client = CountingLlmClient()
+        vector_store = DatasetVectorStoreClient(
+            {"a": [_scored("a.md", 0.9)], "b": [_scored("b.md", 0.8)]},
+            embedding_models={"a": "text-embedding-004"},
+        )
+        retriever = Retriever(
+            llm_client,
+            vector_store,
+            EmbeddingBatcher(llm_client),
+        )
+
+        retriever.search("a", "query", top_k=1)
+        retriever.search_datasets(["a", "b"], "query", top_k=1)
+
+        assert vector_store.queries[0] == ("a", "text-embedding-004")
+        assert sorted(vector_store.queries[1:]) == [
+            ("a", "text-embedding-004"),
+            ("b", "gemini-embedding-001"),
+        ]
+        # Every query embedding is batched, under the dataset's model.
+        assert llm_client.embed_calls == 0
+        assert llm_client.embed_batch_models == [
+            "text-embedding-004",
+            "text-embedding-004",
+            "gemini-embedding-001",
+        ]
+
+    def test_datasets_without_metadata_use_default_embedding_model(self) -> None:
+        vector_store = DatasetVectorStoreClient({"a": [_scored("a.md", 0.9)]})
+        retriever = Retriever(
+            CountingLlmClient(),
+            vector_store,
+            default_embedding_model="text-embedding-004",
+        )
+
+        retriever.search("a", "query", top_k=1)
+
+        assert vector_store.queries == [("a", "text-embedding-004")]
+
+    def test_search_datasets_merges_raw_scores_into_top_k(self) -> None:
+        vector_store = DatasetVectorStoreClient(
+            {
+                "a": [
+                    _scored("a1.md", 0.95),
+                    _scored("a2.md", 0.9),
+                    _scored("a3.md", 0.75),
+                ],
+                "b": [
+                    _scored("b1.md", 0.8),
+                    _scored("b2.md", 0.79),
+                    _scored("b3.md", 0.6),
+                ],
+            }
+        )
+        retriever = Retriever(CountingLlmClient(), vector_store)
+
+        result = retriever.search_datasets(["a", "b"], "query", top_k=4)
+
+        # b3 falls below the similarity threshold.
+        assert [sc.indexed_chunk.source for sc in result] == [
+            "a1.md",
+            "a2.md",
+            "b1.md",
+            "b2.md",
+        ]
+        assert [sc.score for sc in result] == [0.95, 0.9, 0.8, 0.79]
+
+    @pytest.mark.parametrize(
+        ("scored_chunks_by_dataset", "expected"),
+        [
+            pytest.param(
+                {
+                    "a": [_scored("a1.md", 0.95), _scored("a2.md", 0.94)],
+                    "b": [_scored("b1.md", 0.72)],
+                },
+                [("a1.md", 0.95), ("a2.md", 0.94)],
+                id="single-candidate",
+            ),
+            pytest.param(
+                {
+                    "a": [_scored("a1.md", 0.8), _scored("a2.md", 0.8)],
+                    "b": [_scored("b1.md", 0.9), _scored("b2.md", 0.75)],
+                },
+                [("b1.md", 0.9), ("a1.md", 0.8)],
+                id="tied-scores",
+            ),
+            pytest.param(
+                {
+                    "a": [_scored("a1.md", 0.95), _scored("a2.md", 0.94)],
+                    "b": [_scored("b1.md", 0.75), _scored("b2.md", 0.71)],
+                },
+                [("a1.md", 0.95), ("a2.md", 0.94)],
+                id="lopsided",
+            ),
+        ],
+    )
+    def test_search_datasets_ranks_all_datasets_on_one_scale(
+        self,
+        scored_chunks_by_dataset: dict[str, list[ScoredChunk]],
+        expected: list[tuple[str, float]],
+    ) -> None:
+        retriever = Retriever(
+            CountingLlmClient(), DatasetVectorStoreClient(scored_chunks_by_dataset)
+        )
+
+        result = retriever.search_datasets(["a", "b"], "query", top_k=2)
+
+        assert [(sc.indexed_chunk.source, sc.score) for sc in result] == expected
@@ -0,0 +1,116 @@
+import os
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from llm_lab.vector_store.file.catalog import DatasetCatalog
+from llm_lab.vector_store.file.types import ManifestFile
+
+
+class CountingManifestLoader:
+    def __init__(self) -> None:
+        self.loads = 0
+
+    def __call__(self, manifest_path: Path) -> ManifestFile:
+        self.loads += 1
+        return ManifestFile.model_validate_json(
+            manifest_path.read_text(encoding="utf-8")
+        )
+
+
+def _publish(
+    dest_dir: Path, dataset: str, embedding_model: str, total_chunks: int = 2
+) -> None:
+    dataset_dir = dest_dir / dataset
+    dataset_dir.mkdir(exist_ok=True)
+    manifest_path = dataset_dir / "manifest.json"
+    manifest_path.write_text(
+        ManifestFile(
+            dataset=dataset,
+            embedding_model=embedding_model,
+            created_at=datetime(2026, 1, 1, tzinfo=UTC),
+            total_docs=1,
+            total_chunks=total_chunks,
+            dimension=3,
+            index_files=[],
+        ).model_dump_json(),
+        encoding="utf-8",
+    )
+    # Give every version a distinct mtime, however coarse the filesystem clock is.
+    mtime_ns = time.time_ns() + total_chunks * 1_000_000_000
+    os.utime(manifest_path, ns=(mtime_ns, mtime_ns))
+
+
+class TestDatasetCatalog:
+    def test_reads_manifest_once_and_checks_it_only_after_interval(
+        self, tmp_path: Path
+    ) -> None:
+        now = [0.0]
+        loader = CountingManifestLoader()
+        catalog = DatasetCatalog(tmp_path, loader, 10, clock=lambda: now[0])
+        _publish(tmp_path, "ducks", "model-a")
+
+        info = catalog.get("ducks")
+        assert info is not None
+        assert (info.embedding_model, info.dimension, info.chunk_count) == (
+            "model-a",
+            3,
+            2,
+        )
+        assert info.index_version == "2026-01-01T00:00:00+00:00"
+
+        _publish(tmp_path, "ducks", "model-b", total_chunks=5)
+        assert catalog.get("ducks") == info
+        assert loader.loads == 1
+
+        now[0] = 11.0
+        refreshed = catalog.get("ducks")
+        assert refreshed is not None
+        assert (refreshed.embedding_model, refreshed.chunk_count) == ("model-b", 5)
+        assert loader.loads == 2
+
+    def test_unchanged_manifest_is_not_reread(self, tmp_path: Path) -> None:
+        now = [0.0]
+        loader = CountingManifestLoader()
+        catalog = DatasetCatalog(tmp_path, loader, 10, clock=lambda: now[0])
+        _publish(tmp_path, "ducks", "model-a")
+
+        catalog.get("ducks")
+        now[0] = 11.0
+        catalog.get("ducks")
+
+        assert loader.loads == 1
+
+    def test_missing_dataset_is_none(self, tmp_path: Path) -> None:
+        catalog = DatasetCatalog(tmp_path, CountingManifestLoader(), 10)
+        assert catalog.get("geese") is None
+
+    def test_lists_datasets_skipping_malformed_manifests(
+        self, tmp_path: Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        def load(manifest_path: Path) -> ManifestFile:
+            try:
+                return CountingManifestLoader()(manifest_path)
+            except Exception as err:
+                raise ValueError(str(err)) from err
+
+        _publish(tmp_path, "geese", "model-b")
+        _publish(tmp_path, "ducks", "model-a")
+        (tmp_path / "broken").mkdir()
+        (tmp_path / "broken" / "manifest.json").write_text("{", encoding="utf-8")
+        catalog = DatasetCatalog(tmp_path, load, 10)
+
+        assert [info.dataset for info in catalog.list()] == ["ducks", "geese"]
+        assert "Skipping dataset broken" in caplog.text
+
+    def test_invalidate_rescans_directory(self, tmp_path: Path) -> None:
+        catalog = DatasetCatalog(tmp_path, CountingManifestLoader(), 10)
+        assert catalog.list() == []
+
+        _publish(tmp_path, "ducks", "model-a")
+        assert catalog.list() == []
+        catalog.invalidate("ducks")
+
+        assert [info.dataset for info in catalog.list()] == ["ducks"]
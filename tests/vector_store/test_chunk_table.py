@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import numpy as np
+
+from llm_lab.vector_store.file.chunk_table import ChunkTable, ChunkTableWriter
+from llm_lab.vector_store.file.types import ManifestDocRange
+from llm_lab.vector_store.types import IndexedChunk
+
+CHUNKS = [
+    IndexedChunk(text="Première partie", doc_path="a.md", source="a.md#1", chunk_id=0),
+    IndexedChunk(text="", doc_path="a.md", source="a.md#2", chunk_id=1),
+    IndexedChunk(
+        text="第二部分 🚀",
+        doc_path="b.md",
+        source="b.md",
+        chunk_id=7,
+        alternate_sources=["c.md", "d.md#2"],
+    ),
+]
+DOC_RANGES = [
+    ManifestDocRange(doc_path="a.md", start_row=0, end_row=2),
+    ManifestDocRange(doc_path="b.md", start_row=2, end_row=3),
+]
+
+
+class TestChunkTable:
+    def test_from_chunks_round_trips_rows(self) -> None:
+        table = ChunkTable.from_chunks(CHUNKS, DOC_RANGES)
+
+        assert len(table) == 3
+        assert [table.chunk(row) for row in range(len(table))] == CHUNKS
+
+    def test_written_table_maps_files_read_only(self, tmp_path: Path) -> None:
+        with ChunkTableWriter(tmp_path) as writer:
+            for chunk in CHUNKS:
+                writer.add(chunk)
+
+        table = ChunkTable.map(tmp_path, DOC_RANGES)
+
+        assert [table.chunk(row) for row in range(len(table))] == CHUNKS
+        assert isinstance(table.texts.data, np.memmap)
+        assert table.nbytes == ChunkTable.from_chunks(CHUNKS, DOC_RANGES).nbytes
+
+    def test_maps_empty_table(self, tmp_path: Path) -> None:
+        with ChunkTableWriter(tmp_path):
+            pass
+
+        table = ChunkTable.map(tmp_path, [])
+
+        assert len(table) == 0
+
+    def test_doc_path_looks_up_doc_range(self) -> None:
+        table = ChunkTable.from_chunks(CHUNKS, DOC_RANGES)
+
+        assert [table.doc_path(row) for row in range(3)] == ["a.md", "a.md", "b.md"]
+
+    def test_maps_table_without_alternate_sources(self, tmp_path: Path) -> None:
+        with ChunkTableWriter(tmp_path) as writer:
+            for chunk in CHUNKS:
+                writer.add(chunk)
+        (tmp_path / "alternate_sources.utf8").unlink()
+        (tmp_path / "alternate_sources.offsets").unlink()
+
+        table = ChunkTable.map(tmp_path, DOC_RANGES)
+
+        assert table.chunk(2).alternate_sources == []
+        assert table.chunk(2).source == "b.md"
@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from llm_lab.observability.metrics import file_store_loaded_versions_gauge
+from llm_lab.vector_store.file.dataset_cache import DatasetCache
+
+
+class VersionedLoader:
+    """Loads the content of manifest.json, optionally blocking until released."""
+
+    def __init__(self) -> None:
+        self.loads = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, dataset_dir: Path) -> str:
+        self.loads += 1
+        self.release.wait(timeout=5)
+        return (dataset_dir / "manifest.json").read_text(encoding="utf-8")
+
+
+def _publish(dataset_dir: Path, content: str) -> None:
+    dataset_dir.mkdir(exist_ok=True)
+    manifest_path = dataset_dir / "manifest.json"
+    manifest_path.write_text(content, encoding="utf-8")
+    # Give every version a distinct mtime, however coarse the filesystem clock is.
+    mtime_ns = time.time_ns() + len(content) * 1_000_000_000
+    os.utime(manifest_path, ns=(mtime_ns, mtime_ns))
+
+
+def _read(cache: DatasetCache[str], dataset_dir: Path) -> str:
+    with cache.lease(dataset_dir) as dataset:
+        return dataset
+
+
+def _wait_for(cache: DatasetCache[str], dataset_dir: Path, expected: str) -> None:
+    deadline = time.monotonic() + 5
+    while _read(cache, dataset_dir) != expected:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+class TestDatasetCache:
+    def test_loads_once_and_checks_manifest_only_after_interval(
+        self, tmp_path: Path
+    ) -> None:
+        now = [0.0]
+        loader = VersionedLoader()
+        cache = DatasetCache(loader, reload_interval_seconds=10, clock=lambda: now[0])
+        _publish(tmp_path, "v1")
+
+        assert _read(cache, tmp_path) == "v1"
+        _publish(tmp_path, "v22")
+        assert _read(cache, tmp_path) == "v1"
+        assert loader.loads == 1
+
+        now[0] = 10.0
+        _wait_for(cache, tmp_path, "v22")
+
+    def test_serves_loaded_version_while_new_one_loads_in_background(
+        self, tmp_path: Path
+    ) -> None:
+        loader = VersionedLoader()
+        cache = DatasetCache(loader, reload_interval_seconds=0)
+        _publish(tmp_path, "v1")
+        _read(cache, tmp_path)
+
+        loader.release.clear()
+        _publish(tmp_path, "v22")
+        assert _read(cache, tmp_path) == "v1"
+        assert _read(cache, tmp_path) == "v1"
+
+        loader.release.set()
+        _wait_for(cache, tmp_path, "v22")
+        assert loader.loads == 2
+
+    def test_superseded_version_is_retired_after_its_last_lease(
+        self, tmp_path: Path
+    ) -> None:
+        cache = DatasetCache(VersionedLoader(), reload_interval_seconds=60)
+        _publish(tmp_path, "v1")
+        loaded_before = file_store_loaded_versions_gauge.value
+
+        with cache.lease(tmp_path) as dataset:
+            _publish(tmp_path, "v22")
+            assert cache.reload(tmp_path) == "v22"
+            assert dataset == "v1"
+            assert file_store_loaded_versions_gauge.value == loaded_before + 2
+        assert file_store_loaded_versions_gauge.value == loaded_before + 1
+
+        cache.discard(tmp_path)
+        assert file_store_loaded_versions_gauge.value == loaded_before
+
+    def test_failed_reload_keeps_serving_loaded_version(self, tmp_path: Path) -> None:
+        cache = DatasetCache(VersionedLoader(), reload_interval_seconds=60)
+        _publish(tmp_path, "v1")
+        _read(cache, tmp_path)
+
+        (tmp_path / "manifest.json").unlink()
+        with pytest.raises(FileNotFoundError):
+            cache.reload(tmp_path)
+
+        assert _read(cache, tmp_path) == "v1"
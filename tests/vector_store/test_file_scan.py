@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from llm_lab.vector_store.file.scan import ParallelScanner, normalize_rows
+
+
+@pytest.fixture
+def vectors() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return normalize_rows(rng.standard_normal((1000, 8)))
+
+
+def _exact_top_k(
+    vectors: np.ndarray, query: list[float], limit: int
+) -> list[tuple[float, int]]:
+    scores = vectors @ normalize_rows(query)[0]
+    rows = sorted(range(len(scores)), key=lambda row: -scores[row])[:limit]
+    return [(float(scores[row]), row) for row in rows]
+
+
+class TestParallelScanner:
+    @pytest.mark.parametrize("workers", [1, 2, 4])
+    def test_top_k_matches_exact_scan(self, vectors: np.ndarray, workers: int) -> None:
+        scanner = ParallelScanner(workers=workers, shard_rows=64)
+        query = [0.5, -1.0, 0.0, 2.0, 0.1, 0.0, -0.3, 1.0]
+        hits = scanner.top_k(vectors, query, 10)
+        expected = _exact_top_k(vectors, query, 10)
+        assert [row for _, row in hits] == [row for _, row in expected]
+        assert [score for score, _ in hits] == pytest.approx(
+            [score for score, _ in expected], rel=1e-5
+        )
+
+    def test_top_k_only_scores_row_ranges(self, vectors: np.ndarray) -> None:
+        scanner = ParallelScanner(workers=2, shard_rows=16)
+        hits = scanner.top_k(vectors, [1.0] * 8, 1000, [(10, 20), (500, 503)])
+        assert sorted(row for _, row in hits) == [*range(10, 20), 500, 501, 502]
+
+    def test_scores_are_cosine_similarities(self) -> None:
+        scanner = ParallelScanner()
+        hits = scanner.top_k(normalize_rows([[2.0, 0.0], [0.0, 5.0]]), [1.0, 0.0], 2)
+        assert hits == [(pytest.approx(1.0), 0), (pytest.approx(0.0), 1)]
+
+    def test_zero_vectors_score_zero(self) -> None:
+        scanner = ParallelScanner()
+        hits = scanner.top_k(normalize_rows([[0.0, 0.0], [3.0, 4.0]]), [0.0, 1.0], 2)
+        assert hits == [(pytest.approx(0.8), 1), (0.0, 0)]
+
+    def test_top_k_rejects_mismatched_query_length(self, vectors: np.ndarray) -> None:
+        with pytest.raises(ValueError, match="same length"):
+            ParallelScanner().top_k(vectors, [1.0, 0.0], 1)
+
+    def test_top_k_raises_when_timeout_is_spent(self, vectors: np.ndarray) -> None:
+        scanner = ParallelScanner(shard_rows=64)
+        with pytest.raises(TimeoutError):
+            scanner.top_k(vectors, [1.0] * 8, 10, timeout=0)
+
+    def test_rejects_invalid_worker_count(self) -> None:
+        with pytest.raises(ValueError):
+            ParallelScanner(workers=0)
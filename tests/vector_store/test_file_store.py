@@ -1,9 +1,27 @@
 import json
+import os
+import time
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from pydantic import ValidationError
+from pytest_mock import MockerFixture
 
-from llm_lab.vector_store.file.file_store import FileStoreClient
+import llm_lab.retrieval.indexing as indexing
+from llm_lab.config.variables import FILE_STORE_STALE_BUILD_SECONDS
+from llm_lab.retrieval.indexing import Indexer
+from llm_lab.retrieval.types import ChunkingConfig, DeduplicationConfig
+from llm_lab.vector_store.file.file_store import (
+    FileStoreClient,
+    _write_text_atomically,
+)
+from llm_lab.vector_store.file.types import IndexFile
+from llm_lab.vector_store.types import IndexedChunk, QueryFilter
+from tests.fakes import CountingLlmClient
 
 
 class TestFileStoreClient:
@@ -46,3 +64,384 @@ class TestFileStoreClient:
         client = FileStoreClient(dest_dir=tmp_path)
         with pytest.raises(ValueError, match="malformed"):
             client.get_embedding_model(dataset)
+
+    def test_store_writes_index_files_while_consuming_stream(
+        self, tmp_path: Path
+    ) -> None:
+        dataset_dir = tmp_path / "test_dataset"
+        written_before_last_chunk: list[str] = []
+
+        def stream() -> Iterator[IndexedChunk]:
+            for row in range(25):
+                if row == 24:
+                    written_before_last_chunk.extend(
+                        p.name for p in dataset_dir.glob(".indexes-*/*")
+                    )
+                    assert not (dataset_dir / "manifest.json").exists()
+                yield _make_chunk(f"docs/{row // 10}.md", row % 10, [1.0, 0.0])
+
+        client = FileStoreClient(dest_dir=tmp_path, shard_max_chunks=10)
+        client.store(stream(), "test_dataset", "fake-embedding-model", docs_count=3)
+
+        assert "index-0000.json" in written_before_last_chunk
+        manifest = _read_manifest(tmp_path)
+        assert manifest["total_chunks"] == 25
+        assert [f["num_chunks"] for f in manifest["index_files"]] == [10, 10, 5]
+        assert len(client.query("test_dataset", "fake", [1.0, 0.0], 100)) == 25
+
+    def test_store_cuts_index_files_by_size_and_writes_compact_json(
+        self, tmp_path: Path
+    ) -> None:
+        chunks = [_make_chunk("docs/a.md", i, [1.0, 0.0]) for i in range(6)]
+        chunk_size = len(chunks[0].model_dump_json(exclude={"embedding"}))
+        client = FileStoreClient(
+            dest_dir=tmp_path, shard_max_chunks=100, shard_max_bytes=chunk_size * 2 + 2
+        )
+        client.store(chunks, "test_dataset", "fake-embedding-model", docs_count=1)
+
+        manifest = _read_manifest(tmp_path)
+        assert [f["num_chunks"] for f in manifest["index_files"]] == [2, 2, 2]
+        index_file = (
+            tmp_path / "test_dataset" / manifest["index_dir"] / "index-0000.json"
+        ).read_text(encoding="utf-8")
+        assert "\n" not in index_file
+        assert IndexFile.model_validate_json(index_file).chunks == [
+            chunk.model_copy(update={"embedding": []}) for chunk in chunks[:2]
+        ]
+
+    def test_store_writes_normalized_vectors_that_queries_map(
+        self, tmp_path: Path
+    ) -> None:
+        chunks = [
+            _make_chunk("docs/a.md", 0, [3.0, 4.0]),
+            _make_chunk("docs/a.md", 1, [0.0, 2.0]),
+        ]
+        client = FileStoreClient(dest_dir=tmp_path, shard_max_chunks=1)
+        client.store(chunks, "test_dataset", "fake-embedding-model", docs_count=1)
+
+        manifest = _read_manifest(tmp_path)
+        assert manifest["dimension"] == 2
+        vectors_path = tmp_path / "test_dataset" / manifest["index_dir"] / "vectors.f32"
+        assert np.fromfile(vectors_path, dtype="<f4").tolist() == pytest.approx(
+            [0.6, 0.8, 0.0, 1.0]
+        )
+        loaded = client.datasets.reload(tmp_path / "test_dataset")
+        assert isinstance(loaded.vectors, np.memmap)
+        scored_chunks = client.query("test_dataset", "m", [0.0, 1.0], 2)
+        assert [sc.score for sc in scored_chunks] == pytest.approx([1.0, 0.8])
+
+    def test_store_writes_chunk_table_that_queries_map(self, tmp_path: Path) -> None:
+        chunks = [
+            _make_chunk("docs/a.md", 0, [1.0, 0.0]),
+            _make_chunk("docs/b.md", 0, [0.0, 1.0]),
+        ]
+        client = FileStoreClient(dest_dir=tmp_path)
+        client.store(chunks, "test_dataset", "fake-embedding-model", docs_count=2)
+
+        assert _read_manifest(tmp_path)["chunk_table"] is True
+        loaded = client.datasets.reload(tmp_path / "test_dataset")
+        assert isinstance(loaded.table.texts.data, np.memmap)
+        scored_chunks = client.query("test_dataset", "m", [0.0, 1.0], 1)
+        assert scored_chunks[0].indexed_chunk == chunks[1].model_copy(
+            update={"embedding": []}
+        )
+
+    def test_store_rejects_embeddings_of_different_dimensions(
+        self, tmp_path: Path
+    ) -> None:
+        chunks = [
+            _make_chunk("docs/a.md", 0, [1.0, 0.0]),
+            _make_chunk("docs/a.md", 1, [1.0, 0.0, 0.0]),
+        ]
+        client = FileStoreClient(dest_dir=tmp_path)
+        with pytest.raises(ValueError, match="3 dimensions, expected 2"):
+            client.store(chunks, "test_dataset", "fake-embedding-model", docs_count=1)
+        assert list((tmp_path / "test_dataset").iterdir()) == []
+
+    def test_store_publishes_new_index_and_keeps_only_the_previous_one(
+        self, tmp_path: Path
+    ) -> None:
+        client = FileStoreClient(dest_dir=tmp_path)
+        index_dirs = []
+        for doc_path in ("docs/oldest.md", "docs/old.md", "docs/new.md"):
+            client.store([_make_chunk(doc_path, 0, [1.0, 0.0])], "test_dataset", "m", 1)
+            index_dirs.append(_read_manifest(tmp_path)["index_dir"])
+
+        assert sorted(p.name for p in (tmp_path / "test_dataset").iterdir()) == [
+            index_dirs[1],
+            index_dirs[2],
+            "manifest.json",
+        ]
+        [scored_chunk] = client.query("test_dataset", "m", [1.0, 0.0], 10)
+        assert scored_chunk.indexed_chunk.doc_path == "docs/new.md"
+
+    def test_failed_store_keeps_previous_index(self, tmp_path: Path) -> None:
+        client = FileStoreClient(dest_dir=tmp_path, shard_max_chunks=1)
+        client.store(
+            [_make_chunk("docs/old.md", 0, [1.0, 0.0])], "test_dataset", "m", 1
+        )
+        manifest_before = _read_manifest(tmp_path)
+
+        def failing_stream() -> Iterator[IndexedChunk]:
+            yield _make_chunk("docs/new.md", 0, [1.0, 0.0])
+            yield _make_chunk("docs/new.md", 1, [1.0, 0.0])
+            raise RuntimeError("embedding failed")
+
+        with pytest.raises(RuntimeError):
+            client.store(failing_stream(), "test_dataset", "m", 1)
+
+        assert _read_manifest(tmp_path) == manifest_before
+        assert sorted(p.name for p in (tmp_path / "test_dataset").iterdir()) == [
+            manifest_before["index_dir"],
+            "manifest.json",
+        ]
+        [scored_chunk] = client.query("test_dataset", "m", [1.0, 0.0], 10)
+        assert scored_chunk.indexed_chunk.doc_path == "docs/old.md"
+
+    def test_store_keeps_concurrent_builds_and_removes_abandoned_ones(
+        self, tmp_path: Path
+    ) -> None:
+        dataset_dir = tmp_path / "test_dataset"
+        running_build = dataset_dir / ".indexes-running"
+        abandoned_build = dataset_dir / ".indexes-abandoned"
+        for build_dir in (running_build, abandoned_build):
+            build_dir.mkdir(parents=True)
+            (build_dir / "vectors.f32").write_bytes(b"")
+        long_ago = time.time() - 2 * FILE_STORE_STALE_BUILD_SECONDS
+        for path in (abandoned_build / "vectors.f32", abandoned_build):
+            os.utime(path, (long_ago, long_ago))
+
+        client = FileStoreClient(dest_dir=tmp_path)
+        client.store([_make_chunk("docs/a.md", 0, [1.0, 0.0])], "test_dataset", "m", 1)
+
+        assert running_build.exists()
+        assert not abandoned_build.exists()
+
+    def test_query_reads_datasets_stored_before_versioned_index_dirs(
+        self, tmp_path: Path
+    ) -> None:
+        chunk = _make_chunk("docs/a.md", 0, [1.0, 0.0])
+        index_dir = tmp_path / "test_dataset" / "indexes"
+        index_dir.mkdir(parents=True)
+        (index_dir / "index-0000.json").write_text(
+            IndexFile(index_id="index-0000", chunks=[chunk]).model_dump_json(indent=2)
+        )
+        manifest = {
+            "dataset": "test_dataset",
+            "embedding_model": "m",
+            "created_at": "2026-01-01T00:00:00Z",
+            "total_docs": 1,
+            "total_chunks": 1,
+            "index_files": [
+                {"index_id": "index-0000", "path": "index-0000.json", "num_chunks": 1}
+            ],
+        }
+        (tmp_path / "test_dataset" / "manifest.json").write_text(json.dumps(manifest))
+
+        client = FileStoreClient(dest_dir=tmp_path)
+        [scored_chunk] = client.query("test_dataset", "m", [1.0, 0.0], 10)
+        assert scored_chunk.indexed_chunk.source == chunk.source
+
+    def test_atomic_writes_use_a_temp_file_of_their_own(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        replace = mocker.spy(os, "replace")
+        path = tmp_path / "manifest.json"
+
+        _write_text_atomically(path, "first")
+        _write_text_atomically(path, "second")
+
+        first_tmp, second_tmp = (Path(call.args[0]) for call in replace.call_args_list)
+        assert first_tmp != second_tmp
+        assert first_tmp.parent == second_tmp.parent == tmp_path
+        assert path.read_text(encoding="utf-8") == "second"
+        assert [child.name for child in tmp_path.iterdir()] == ["manifest.json"]
+
+
+def _read_manifest(dest_dir: Path) -> dict[str, Any]:
+    return json.loads(
+        (dest_dir / "test_dataset" / "manifest.json").read_text(encoding="utf-8")
+    )
+
+
+def _make_chunk(doc_path: str, chunk_id: int, embedding: list[float]) -> IndexedChunk:
+    return IndexedChunk(
+        text=f"{doc_path} chunk {chunk_id}",
+        doc_path=doc_path,
+        source=f"{doc_path}#chunk-{chunk_id}",
+        embedding=embedding,
+        chunk_id=chunk_id,
+    )
+
+
+class TestFileStoreQueryFilter:
+    @pytest.fixture
+    def client(self, tmp_path: Path) -> FileStoreClient:
+        chunks = [
+            _make_chunk("docs/a.md", 0, [1.0, 0.0]),
+            _make_chunk("docs/a.md", 1, [0.9, 0.1]),
+            _make_chunk("docs/nested/b.md", 0, [0.8, 0.2]),
+            _make_chunk("docs/nested/b.md", 1, [0.7, 0.3]),
+            _make_chunk("docs/nested/b.md", 2, [0.6, 0.4]),
+            _make_chunk("other/c.md", 0, [0.5, 0.5]),
+        ]
+        client = FileStoreClient(dest_dir=tmp_path)
+        client.store(chunks, "test_dataset", "fake-embedding-model", docs_count=3)
+        return client
+
+    def _query_sources(
+        self, client: FileStoreClient, query_filter: QueryFilter | None
+    ) -> list[str]:
+        scored_chunks = client.query(
+            "test_dataset", "fake-embedding-model", [1.0, 0.0], 10, query_filter
+        )
+        return [sc.indexed_chunk.source for sc in scored_chunks]
+
+    def test_store_records_doc_ranges_in_manifest(
+        self, client: FileStoreClient, tmp_path: Path
+    ) -> None:
+        manifest = json.loads(
+            (tmp_path / "test_dataset" / "manifest.json").read_text(encoding="utf-8")
+        )
+        assert [
+            (r["doc_path"], r["start_row"], r["end_row"])
+            for r in manifest["doc_ranges"]
+        ] == [
+            ("docs/a.md", 0, 2),
+            ("docs/nested/b.md", 2, 5),
+            ("other/c.md", 5, 6),
+        ]
+        # Chunk id bounds are searched in the chunk table, not derived from here.
+        assert all("first_chunk_id" not in r for r in manifest["doc_ranges"])
+
+    def test_query_without_filter_returns_sorted_limited_results(
+        self, client: FileStoreClient
+    ) -> None:
+        scored_chunks = client.query(
+            "test_dataset", "fake-embedding-model", [1.0, 0.0], 2
+        )
+        assert [sc.indexed_chunk.source for sc in scored_chunks] == [
+            "docs/a.md#chunk-0",
+            "docs/a.md#chunk-1",
+        ]
+
+    def test_query_filters_by_doc_paths(self, client: FileStoreClient) -> None:
+        sources = self._query_sources(client, QueryFilter(doc_paths=["other/c.md"]))
+        assert sources == ["other/c.md#chunk-0"]
+
+    def test_query_filters_by_prefix_and_glob(self, client: FileStoreClient) -> None:
+        assert (
+            len(self._query_sources(client, QueryFilter(doc_path_prefix="docs/"))) == 5
+        )
+        assert self._query_sources(
+            client, QueryFilter(doc_path_glob="docs/nested/*.md", chunk_id_min=2)
+        ) == ["docs/nested/b.md#chunk-2"]
+
+    def test_query_filters_by_chunk_id_range(self, client: FileStoreClient) -> None:
+        sources = self._query_sources(
+            client, QueryFilter(chunk_id_min=1, chunk_id_max=1)
+        )
+        assert sources == ["docs/a.md#chunk-1", "docs/nested/b.md#chunk-1"]
+
+    def test_query_filters_by_chunk_id_after_duplicates_were_dropped(
+        self, tmp_path: Path, monkeypatch: MonkeyPatch
+    ) -> None:
+        source_dir = tmp_path / "source"
+        source_dir.mkdir()
+        (source_dir / "a.md").write_text(
+            "Ducks.\n\nGeese.\n\nDucks.\n\nSwans.\n\nHerons.", encoding="utf-8"
+        )
+        monkeypatch.setattr(indexing, "BASE_DIR", tmp_path)
+        indexer = Indexer(
+            source_dir=source_dir,
+            chunking_config=ChunkingConfig(chunk_size=10, chunk_separator="\n\n"),
+            embedding_model="fake-embedding-model",
+            dataset="test_dataset",
+            deduplication_config=DeduplicationConfig(),
+        )
+        indexed_chunks, docs_count = indexer.run(CountingLlmClient())
+        client = FileStoreClient(dest_dir=tmp_path / "indexes")
+        client.store(indexed_chunks, "test_dataset", "fake-embedding-model", docs_count)
+
+        # The duplicate chunk 2 is not stored, leaving chunk ids 0, 1, 3 and 4.
+        assert self._query_sources(
+            client, QueryFilter(chunk_id_min=3, chunk_id_max=3)
+        ) == ["source/a.md#chunk-3"]
+        assert self._query_sources(client, QueryFilter(chunk_id_min=4)) == [
+            "source/a.md#chunk-4"
+        ]
+        assert (
+            self._query_sources(client, QueryFilter(chunk_id_min=2, chunk_id_max=2))
+            == []
+        )
+
+    def test_query_filter_without_matches_returns_empty(
+        self, client: FileStoreClient
+    ) -> None:
+        assert self._query_sources(client, QueryFilter(doc_paths=["missing.md"])) == []
+
+    def test_query_filter_rejects_inverted_chunk_id_range(self) -> None:
+        with pytest.raises(ValidationError):
+            QueryFilter(chunk_id_min=3, chunk_id_max=1)
+
+
+class TestFileStoreParallelScan:
+    def _store(self, client: FileStoreClient, embeddings: list[list[float]]) -> None:
+        chunks = [
+            _make_chunk(f"docs/{row // 3}.md", row % 3, embedding)
+            for row, embedding in enumerate(embeddings)
+        ]
+        client.store(chunks, "test_dataset", "fake-embedding-model", docs_count=1)
+
+    def test_parallel_scan_matches_single_worker(self, tmp_path: Path) -> None:
+        embeddings = [[float(row % 7), float(row % 5), 1.0] for row in range(50)]
+        single = FileStoreClient(dest_dir=tmp_path)
+        parallel = FileStoreClient(dest_dir=tmp_path, scan_workers=4)
+        self._store(single, embeddings)
+
+        query = [1.0, 2.0, 0.5]
+        query_filter = QueryFilter(doc_path_prefix="docs/1", chunk_id_max=1)
+        for args in ((query, 10), (query, 10, query_filter)):
+            expected = single.query("test_dataset", "fake-embedding-model", *args)
+            actual = parallel.query("test_dataset", "fake-embedding-model", *args)
+            assert [sc.indexed_chunk.source for sc in actual] == [
+                sc.indexed_chunk.source for sc in expected
+            ]
+
+    def test_index_version_changes_when_dataset_is_reindexed(
+        self, tmp_path: Path
+    ) -> None:
+        client = FileStoreClient(dest_dir=tmp_path)
+        self._store(client, [[1.0, 0.0]])
+        version = client.get_index_version("test_dataset", "fake-embedding-model")
+
+        self._store(client, [[1.0, 0.0]])
+
+        assert client.get_index_version("test_dataset", "fake-embedding-model") != (
+            version
+        )
+
+    def test_query_reloads_dataset_after_store(self, tmp_path: Path) -> None:
+        client = FileStoreClient(dest_dir=tmp_path)
+        self._store(client, [[1.0, 0.0], [0.0, 1.0]])
+        client.query("test_dataset", "fake-embedding-model", [1.0, 0.0], 1)
+
+        self._store(client, [[0.0, 1.0], [1.0, 0.0], [1.0, 0.1]])
+        scored_chunks = client.query(
+            "test_dataset", "fake-embedding-model", [1.0, 0.0], 1
+        )
+        assert scored_chunks[0].indexed_chunk.source == "docs/0.md#chunk-1"
+
+    def test_query_applies_score_threshold(self, tmp_path: Path) -> None:
+        client = FileStoreClient(dest_dir=tmp_path)
+        self._store(client, [[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]])
+        scored_chunks = client.query(
+            "test_dataset", "fake-embedding-model", [1.0, 0.0], 3, score_threshold=0.5
+        )
+        assert [sc.score for sc in scored_chunks] == pytest.approx([1.0])
+
+    def test_query_rejects_mismatched_embedding_length(self, tmp_path: Path) -> None:
+        client = FileStoreClient(dest_dir=tmp_path)
+        self._store(client, [[1.0, 0.0]])
+        with pytest.raises(ValueError, match="same length"):
+            client.query("test_dataset", "fake-embedding-model", [1.0, 0.0, 0.0], 1)
@@ -0,0 +1,480 @@
+from collections.abc import Generator, Iterator
+
+import pytest
+from pytest_mock import MockerFixture
+from qdrant_client import QdrantClient, models
+
+import llm_lab.vector_store.qdrant as qdrant
+from llm_lab.config.settings import QdrantQuantization, QdrantTenantMode
+from llm_lab.vector_store.qdrant import (
+    QdrantCollectionConfig,
+    QdrantSearchConfig,
+    QdrantStoreClient,
+    _build_query_filter,
+    _build_search_params,
+    _create_collection,
+    _resolve_doc_paths,
+    _resolve_vector_size,
+)
+from llm_lab.vector_store.types import (
+    DocPathFilterLimitError,
+    IndexedChunk,
+    QueryFilter,
+)
+
+COLLECTION_NAME = "test-collection"
+
+
+@pytest.fixture
+def qdrant_client() -> Generator[QdrantClient]:
+    client = QdrantClient(location=":memory:")
+    client.create_collection(
+        COLLECTION_NAME,
+        vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE),
+    )
+    client.upsert(
+        COLLECTION_NAME,
+        points=[
+            models.PointStruct(
+                id=point_id,
+                vector=[1.0, float(point_id)],
+                payload={
+                    "dataset": "test_dataset",
+                    "doc_path": doc_path,
+                    "chunk_id": 0,
+                },
+            )
+            for point_id, doc_path in enumerate(
+                ["docs/a.md", "docs/nested/b.md", "other/c.md"]
+            )
+        ],
+    )
+    yield client
+    client.close()
+
+
+def _doc_path_condition(payload_filter: models.Filter) -> models.FieldCondition:
+    assert isinstance(payload_filter.must, list)
+    conditions = [
+        c
+        for c in payload_filter.must
+        if isinstance(c, models.FieldCondition) and c.key == "doc_path"
+    ]
+    assert len(conditions) == 1
+    return conditions[0]
+
+
+class TestBuildQueryFilter:
+    def test_without_filter_only_matches_dataset(self) -> None:
+        payload_filter = _build_query_filter("test_dataset", None)
+        assert payload_filter == models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="dataset", match=models.MatchValue(value="test_dataset")
+                )
+            ]
+        )
+
+    def test_glob_is_resolved_to_matching_doc_paths(
+        self, qdrant_client: QdrantClient
+    ) -> None:
+        query_filter = QueryFilter(doc_path_glob="docs/*")
+        doc_paths = _resolve_doc_paths(
+            qdrant_client, COLLECTION_NAME, "test_dataset", query_filter
+        )
+        payload_filter = _build_query_filter("test_dataset", query_filter, doc_paths)
+        assert payload_filter is not None
+        match = _doc_path_condition(payload_filter).match
+        assert isinstance(match, models.MatchAny)
+        assert sorted(match.any) == ["docs/a.md", "docs/nested/b.md"]
+
+    def test_chunk_id_range_becomes_range_condition(self) -> None:
+        payload_filter = _build_query_filter(
+            "test_dataset",
+            QueryFilter(doc_paths=["other/c.md"], chunk_id_min=1, chunk_id_max=4),
+        )
+        assert payload_filter is not None
+        assert isinstance(payload_filter.must, list)
+        assert (
+            models.FieldCondition(key="chunk_id", range=models.Range(gte=1, lte=4))
+            in payload_filter.must
+        )
+
+    def test_prefix_without_matches_returns_none(
+        self, qdrant_client: QdrantClient
+    ) -> None:
+        query_filter = QueryFilter(doc_path_prefix="missing/")
+        doc_paths = _resolve_doc_paths(
+            qdrant_client, COLLECTION_NAME, "test_dataset", query_filter
+        )
+        payload_filter = _build_query_filter("test_dataset", query_filter, doc_paths)
+        assert payload_filter is None
+
+    def test_prefix_fails_when_dataset_has_more_doc_paths_than_the_cap(
+        self, qdrant_client: QdrantClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(qdrant, "MAX_FILTER_DOC_PATHS", 2)
+        with pytest.raises(DocPathFilterLimitError, match="more than 2 documents"):
+            _resolve_doc_paths(
+                qdrant_client,
+                COLLECTION_NAME,
+                "test_dataset",
+                QueryFilter(doc_path_prefix="docs/"),
+            )
+
+    def test_prefix_resolves_every_doc_path_up_to_the_cap(
+        self, qdrant_client: QdrantClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(qdrant, "MAX_FILTER_DOC_PATHS", 3)
+        doc_paths = _resolve_doc_paths(
+            qdrant_client,
+            COLLECTION_NAME,
+            "test_dataset",
+            QueryFilter(doc_path_prefix="docs/"),
+        )
+        assert sorted(doc_paths) == ["docs/a.md", "docs/nested/b.md"]
+
+
+class TestCreateCollection:
+    def test_creates_collection_with_given_vector_size(self) -> None:
+        client = QdrantClient(location=":memory:")
+        _create_collection(client, COLLECTION_NAME, 16)
+        vectors = client.get_collection(COLLECTION_NAME).config.params.vectors
+        assert isinstance(vectors, models.VectorParams)
+        assert vectors.size == 16
+        client.close()
+
+    def test_applies_collection_config(self, mocker: MockerFixture) -> None:
+        client = QdrantClient(location=":memory:")
+        create_collection = mocker.spy(client, "create_collection")
+        collection_config = QdrantCollectionConfig(
+            quantization=QdrantQuantization.SCALAR,
+            on_disk_vectors=True,
+            hnsw_m=32,
+            hnsw_ef_construct=200,
+        )
+
+        _create_collection(
+            client,
+            COLLECTION_NAME,
+            16,
+            collection_config,
+            QdrantTenantMode.COLLECTION,
+        )
+
+        kwargs = create_collection.call_args.kwargs
+        assert kwargs["vectors_config"].on_disk is True
+        assert kwargs["hnsw_config"] == models.HnswConfigDiff(m=32, ef_construct=200)
+        assert isinstance(kwargs["quantization_config"], models.ScalarQuantization)
+        client.close()
+
+    def test_payload_tenant_mode_builds_per_dataset_graphs(
+        self, mocker: MockerFixture
+    ) -> None:
+        client = QdrantClient(location=":memory:")
+        create_collection = mocker.spy(client, "create_collection")
+        create_payload_index = mocker.spy(client, "create_payload_index")
+
+        _create_collection(client, COLLECTION_NAME, 16)
+
+        assert create_collection.call_args.kwargs[
+            "hnsw_config"
+        ] == models.HnswConfigDiff(m=0, payload_m=16)
+        dataset_index = create_payload_index.call_args_list[0].kwargs
+        assert dataset_index["field_name"] == "dataset"
+        assert dataset_index["field_schema"].is_tenant is True
+        client.close()
+
+
+class TestResolveVectorSize:
+    def test_uses_first_embedding(self) -> None:
+        chunk = next(_stream_chunks(1))
+        assert _resolve_vector_size("unknown-model", chunk) == 3072
+
+    def test_falls_back_to_model_metadata(self) -> None:
+        assert _resolve_vector_size("text-embedding-004", None) == 768
+
+    def test_raises_for_unknown_model_without_embedding(self) -> None:
+        with pytest.raises(ValueError, match="Unknown vector size"):
+            _resolve_vector_size("unknown-model", None)
+
+
+class TestBuildSearchParams:
+    def test_returns_none_by_default(self) -> None:
+        assert _build_search_params(QdrantSearchConfig()) is None
+
+    def test_builds_hnsw_and_quantization_params(self) -> None:
+        search_params = _build_search_params(
+            QdrantSearchConfig(hnsw_ef=128, oversampling=2.0, rescore=True)
+        )
+        assert search_params == models.SearchParams(
+            hnsw_ef=128,
+            quantization=models.QuantizationSearchParams(
+                oversampling=2.0, rescore=True
+            ),
+        )
+
+
+def _stream_chunks(count: int) -> Iterator[IndexedChunk]:
+    for chunk_id in range(count):
+        yield IndexedChunk(
+            text=f"chunk {chunk_id}",
+            doc_path="docs/a.md",
+            source=f"docs/a.md#chunk-{chunk_id}",
+            embedding=[1.0, float(chunk_id)] + [0.0] * 3070,
+            chunk_id=chunk_id,
+        )
+
+
+class TestQdrantStoreClientStore:
+    def test_store_uploads_streamed_chunks_in_batches(self) -> None:
+        client = QdrantClient(location=":memory:")
+        store = QdrantStoreClient(client, upload_batch_size=3, upload_workers=2)
+        progress: list[int] = []
+
+        store.store(
+            _stream_chunks(10),
+            "test_dataset",
+            "gemini-embedding-001",
+            docs_count=1,
+            progress_callback=progress.append,
+        )
+
+        assert client.count("gemini-embedding-001").count == 10
+        assert sorted(progress) == progress
+        assert progress[-1] == 10
+        assert len(progress) == 4
+
+    def test_store_sizes_collection_from_first_embedding(self) -> None:
+        client = QdrantClient(location=":memory:")
+        store = QdrantStoreClient(client)
+        chunk = IndexedChunk(
+            text="chunk",
+            doc_path="docs/a.md",
+            source="docs/a.md#chunk-0",
+            embedding=[1.0, 0.0, 0.0],
+            chunk_id=0,
+        )
+
+        store.store([chunk], "test_dataset", "custom-model", 1)
+
+        vectors = client.get_collection("custom-model").config.params.vectors
+        assert isinstance(vectors, models.VectorParams)
+        assert vectors.size == 3
+
+    def test_store_is_idempotent(self) -> None:
+        client = QdrantClient(location=":memory:")
+        store = QdrantStoreClient(client, upload_batch_size=4)
+
+        store.store(_stream_chunks(6), "test_dataset", "gemini-embedding-001", 1)
+        store.store(_stream_chunks(6), "test_dataset", "gemini-embedding-001", 1)
+
+        assert client.count("gemini-embedding-001").count == 6
+
+    def test_store_retries_failed_batches(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(qdrant, "QDRANT_UPLOAD_RETRY_BACKOFF_SECONDS", 0)
+        client = QdrantClient(location=":memory:")
+        upsert = mocker.patch.object(
+            client,
+            "upsert",
+            side_effect=[ConnectionError("boom"), mocker.DEFAULT],
+        )
+        store = QdrantStoreClient(client, upload_batch_size=4)
+
+        store.store(_stream_chunks(2), "test_dataset", "gemini-embedding-001", 1)
+
+        assert upsert.call_count == 2
+
+    def test_store_raises_after_exhausting_retries(self, mocker: MockerFixture) -> None:
+        mocker.patch.object(qdrant, "QDRANT_UPLOAD_RETRY_BACKOFF_SECONDS", 0)
+        client = QdrantClient(location=":memory:")
+        mocker.patch.object(client, "upsert", side_effect=ConnectionError("boom"))
+        store = QdrantStoreClient(client, upload_batch_size=4, upload_max_retries=1)
+
+        with pytest.raises(RuntimeError, match="Failed to upsert 2 points"):
+            store.store(_stream_chunks(2), "test_dataset", "gemini-embedding-001", 1)
+
+    def test_store_records_new_index_version_per_dataset(self) -> None:
+        client = QdrantClient(location=":memory:")
+        store = QdrantStoreClient(client)
+
+        store.store(_stream_chunks(2), "test_dataset", "gemini-embedding-001", 1)
+        store.store(_stream_chunks(2), "other_dataset", "gemini-embedding-001", 1)
+        version = store.get_index_version("test_dataset", "gemini-embedding-001")
+        other_version = store.get_index_version("other_dataset", "gemini-embedding-001")
+        store.store(_stream_chunks(2), "test_dataset", "gemini-embedding-001", 1)
+
+        assert version is not None
+        assert store.get_index_version("test_dataset", "gemini-embedding-001") not in (
+            None,
+            version,
+        )
+        assert (
+            store.get_index_version("other_dataset", "gemini-embedding-001")
+            == other_version
+        )
+
+    def test_warm_up_counts_only_the_datasets_points(self) -> None:
+        client = QdrantClient(location=":memory:")
+        store = QdrantStoreClient(client)
+        store.store(_stream_chunks(3), "test_dataset", "gemini-embedding-001", 1)
+        store.store(_stream_chunks(2), "other_dataset", "gemini-embedding-001", 1)
+
+        stats = store.warm_up("test_dataset", "gemini-embedding-001")
+
+        assert stats.chunk_count == 3
+        assert stats.memory_bytes is None
+        assert stats.index_version == store.get_index_version(
+            "test_dataset", "gemini-embedding-001"
+        )
+
+
+class TestQdrantStoreClientQuery:
+    def test_query_returns_payload_without_vectors(self) -> None:
+        client = QdrantClient(location=":memory:")
+        store = QdrantStoreClient(client)
+        store.store(_stream_chunks(5), "test_dataset", "gemini-embedding-001", 1)
+
+        scored_chunks = store.query(
+            "test_dataset",
+            "gemini-embedding-001",
+            [1.0, 0.0] + [0.0] * 3070,
+            limit=2,
+        )
+
+        assert [sc.indexed_chunk.chunk_id for sc in scored_chunks] == [0, 1]
+        assert all(sc.indexed_chunk.embedding == [] for sc in scored_chunks)
+
+    def test_query_returns_alternate_sources(self) -> None:
+        client = QdrantClient(location=":memory:")
+        store = QdrantStoreClient(client)
+        chunk = next(_stream_chunks(1)).model_copy(
+            update={"alternate_sources": ["docs/b.md#chunk-0"]}
+        )
+        store.store([chunk], "test_dataset", "gemini-embedding-001", 2)
+
+        scored_chunks = store.query(
+            "test_dataset", "gemini-embedding-001", chunk.embedding, limit=1
+        )
+
+        assert scored_chunks[0].indexed_chunk.alternate_sources == ["docs/b.md#chunk-0"]
+
+    def test_query_pushes_score_threshold_down(self) -> None:
+        client = QdrantClient(location=":memory:")
+        store = QdrantStoreClient(client)
+        store.store(_stream_chunks(5), "test_dataset", "gemini-embedding-001", 1)
+
+        scored_chunks = store.query(
+            "test_dataset",
+            "gemini-embedding-001",
+            [1.0, 0.0] + [0.0] * 3070,
+            limit=5,
+            score_threshold=0.7,
+        )
+
+        assert [sc.indexed_chunk.chunk_id for sc in scored_chunks] == [0, 1]
+
+    def test_query_checks_collection_existence_once(
+        self, mocker: MockerFixture
+    ) -> None:
+        client = QdrantClient(location=":memory:")
+        _create_collection(client, "gemini-embedding-001", 3072)
+        collection_exists = mocker.spy(client, "collection_exists")
+        store = QdrantStoreClient(client)
+        query_embedding = [1.0] * 3072
+
+        store.query("test_dataset", "gemini-embedding-001", query_embedding, 3)
+        store.query("test_dataset", "gemini-embedding-001", query_embedding, 3)
+
+        assert collection_exists.call_count == 1
+
+    def test_query_raises_for_missing_collection(self) -> None:
+        store = QdrantStoreClient(QdrantClient(location=":memory:"))
+        with pytest.raises(ValueError, match="does not exist"):
+            store.query("test_dataset", "gemini-embedding-001", [1.0], 3)
+
+
+class TestTenantRouting:
+    def test_collection_mode_stores_each_dataset_in_its_own_collection(
+        self,
+    ) -> None:
+        client = QdrantClient(location=":memory:")
+        store = QdrantStoreClient(client, tenant_mode=QdrantTenantMode.COLLECTION)
+
+        store.store(_stream_chunks(3), "dataset-a", "gemini-embedding-001", 1)
+        store.store(_stream_chunks(2), "dataset-b", "gemini-embedding-001", 1)
+
+        assert client.count("gemini-embedding-001-dataset-a").count == 3
+        assert client.count("gemini-embedding-001-dataset-b").count == 2
+        scored_chunks = store.query(
+            "dataset-b", "gemini-embedding-001", [1.0] + [0.0] * 3071, limit=5
+        )
+        assert len(scored_chunks) == 2
+
+    def test_shard_key_mode_routes_by_dataset(self, mocker: MockerFixture) -> None:
+        client = mocker.MagicMock(spec=QdrantClient)
+        client.collection_exists.return_value = False
+        client.list_shard_keys.return_value = models.ShardKeysResponse(shard_keys=[])
+        store = QdrantStoreClient(client, tenant_mode=QdrantTenantMode.SHARD_KEY)
+
+        store.store(_stream_chunks(2), "dataset-a", "gemini-embedding-001", 1)
+
+        assert (
+            client.create_collection.call_args.kwargs["sharding_method"]
+            == models.ShardingMethod.CUSTOM
+        )
+        client.create_shard_key.assert_called_once_with(
+            "gemini-embedding-001-sharded", "dataset-a"
+        )
+        assert client.upsert.call_args.kwargs["shard_key_selector"] == "dataset-a"
+
+        client.query_points.return_value.points = []
+        store.query("dataset-a", "gemini-embedding-001", [1.0], limit=3)
+        assert client.query_points.call_args.kwargs["shard_key_selector"] == "dataset-a"
+
+
+class TestMigrate:
+    def test_migrates_shared_collection_to_per_dataset_collections(self) -> None:
+        client = QdrantClient(location=":memory:")
+        QdrantStoreClient(client).store(
+            _stream_chunks(4), "dataset-a", "gemini-embedding-001", 1
+        )
+        target = QdrantStoreClient(
+            client, upload_batch_size=3, tenant_mode=QdrantTenantMode.COLLECTION
+        )
+        progress: list[tuple[str, int]] = []
+
+        migrated = target.migrate(
+            "gemini-embedding-001",
+            QdrantTenantMode.PAYLOAD,
+            delete_source=True,
+            progress_callback=lambda dataset, uploaded: progress.append(
+                (dataset, uploaded)
+            ),
+        )
+
+        assert migrated == ["dataset-a"]
+        assert client.count("gemini-embedding-001-dataset-a").count == 4
+        assert client.count("gemini-embedding-001").count == 0
+        assert progress[-1] == ("dataset-a", 4)
+
+    def test_payload_to_payload_migration_updates_index_in_place(
+        self, mocker: MockerFixture
+    ) -> None:
+        client = mocker.MagicMock(spec=QdrantClient)
+        store = QdrantStoreClient(client)
+
+        assert store.migrate("gemini-embedding-001", QdrantTenantMode.PAYLOAD) == []
+
+        assert (
+            client.create_payload_index.call_args.kwargs["field_schema"].is_tenant
+            is True
+        )
+        assert client.update_collection.call_args.kwargs[
+            "hnsw_config"
+        ] == models.HnswConfigDiff(m=0, payload_m=16)
+
+    def test_collection_source_requires_explicit_datasets(self) -> None:
+        store = QdrantStoreClient(QdrantClient(location=":memory:"))
+        with pytest.raises(ValueError, match="listed explicitly"):
+            store.migrate("gemini-embedding-001", QdrantTenantMode.COLLECTION)